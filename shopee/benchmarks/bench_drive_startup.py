@@ -0,0 +1,81 @@
+"""
+Benchmark: Google Drive client startup, synchronous refresh + discovery fetch
+vs local discovery document + lazy service + background token refresh
+
+The OAuth token endpoint and the discovery service are served by a local stub
+that adds a fixed latency per request to stand in for the network.
+
+Usage:
+    python benchmarks/bench_drive_startup.py [latency_seconds] [runs]
+"""
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from google.auth.transport.requests import Request  # noqa: E402
+from google.oauth2.credentials import Credentials  # noqa: E402
+from googleapiclient.discovery import build  # noqa: E402
+
+from drive_service import TokenRefresher, load_discovery_document  # noqa: E402
+from fake_drive import StubGoogleServer  # noqa: E402
+from storage import DriveStorage  # noqa: E402
+
+
+def expired_creds(stub):
+    """Credentials as loaded from a token.json saved more than an hour ago"""
+    return Credentials(
+        token="stale", refresh_token="refresh", token_uri=stub.token_uri,
+        client_id="client", client_secret="secret",
+        expiry=datetime.utcnow() - timedelta(minutes=5),
+    )
+
+
+def legacy_startup(stub):
+    """The previous get_gdrive_service: refresh, then fetch and parse the discovery document"""
+    creds = expired_creds(stub)
+    creds.refresh(Request())
+    return build("drive", "v3", credentials=creds, discoveryServiceUrl=stub.discovery_url,
+                 static_discovery=False, cache_discovery=False)
+
+
+def lazy_startup(stub):
+    creds = expired_creds(stub)
+    # What run_workflow does: the storage hands each upload thread a lazy service
+    service = DriveStorage(creds, 'folder').service
+    refresher = TokenRefresher(creds, token_path=None).start()
+    return service, refresher
+
+
+def main():
+    latency = float(sys.argv[1]) if len(sys.argv) > 1 else 0.1
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    results = {}
+    with StubGoogleServer(latency=latency) as stub:
+        for name, startup in (("legacy", legacy_startup), ("lazy", lazy_startup)):
+            times = []
+            for _ in range(runs):
+                load_discovery_document.cache_clear()
+                start = time.perf_counter()
+                result = startup(stub)
+                times.append(time.perf_counter() - start)
+                if name == "lazy":
+                    # Let the background refresh finish before the next run
+                    result[1].stop()
+            results[name] = times
+
+    print("\n" + "=" * 70)
+    print(f"DRIVE CLIENT STARTUP ({runs} runs, {latency * 1000:.0f} ms per network request)")
+    print("=" * 70)
+    for name, times in results.items():
+        print(f"{name:<8} median: {statistics.median(times) * 1000:8.1f} ms   "
+              f"max: {max(times) * 1000:8.1f} ms")
+    print("\nlazy: the service is built from the local discovery document on the first "
+          "upload and the token is refreshed in the background.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+Benchmark: the whole main() workflow, offline
+
+A local fake Seller Centre (login redirect, "Perlu Dikirim" list, order
+search, order detail with chat) and a local Google API stub (OAuth token,
+Drive uploads and permissions) stand in for the network, each with a fixed
+latency per request. main() runs headless in a child process, in a fresh
+working directory per run, for N orders.
+
+Reports orders/minute, p50/p95 per stage (from run_metrics.jsonl) and the
+peak RSS of the largest process (Python, the Playwright driver or Chromium).
+Add --output to append the results, with the git commit, to a JSONL file
+so runs on different commits can be compared.
+
+Usage:
+    python benchmarks/bench_end_to_end.py [--orders 20] [--latency 0.05] [--runs 1]
+        [--tabs 1] [--share-mode file] [--output bench_end_to_end.jsonl]
+"""
+import argparse
+import configparser
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+SHOPEE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SHOPEE_DIR)
+
+from fake_drive import StubGoogleServer  # noqa: E402
+from fake_seller_centre import FakeSellerCentre  # noqa: E402
+from timing import percentile  # noqa: E402
+
+STAGES = ('start_browser', 'login', 'get_orders_to_ship', 'navigate', 'capture', 'compress', 'upload',
+          'upload_wait', 'share_batch', 'report')
+
+RUN_MAIN = "import sys, shopee_automation; sys.exit(shopee_automation.main([]))"
+
+
+def write_workdir(workdir, seller_centre, google, args):
+    """config.ini, token.json and discovery document for one run"""
+    config = configparser.ConfigParser(interpolation=None)
+    config.optionxform = str
+    config.read_dict({
+        'SHOPEE': {'USERNAME': 'bench', 'PASSWORD': 'bench', 'LOGIN_URL': seller_centre.login_url},
+        'BROWSER': {'HEADLESS': 'true', 'VIEWPORT_WIDTH': '1280', 'VIEWPORT_HEIGHT': '720'},
+        'SESSION': {'PROBE_URL': seller_centre.probe_url},
+        'GOOGLE_DRIVE': {
+            'FOLDER_ID': 'bench-folder',
+            'SHARE_MODE': args.share_mode,
+            'DISCOVERY_DOCUMENT': 'discovery.json',
+        },
+        'STORAGE': {'BACKEND': 'drive'},
+        'UPLOAD': {'WORKERS': str(args.upload_workers), 'MANIFEST': 'upload_manifest.jsonl'},
+        'SCREENSHOT': {
+            'CAPTURE_MODE': 'elements',
+            'ORDER_HEADER_SELECTOR': '[data-testid=order-header]',
+            'CHAT_PANEL_SELECTOR': '[data-testid=chat-panel]',
+        },
+        'ORDERS': {'AUTO_EXTRACT': 'true', 'LIST_URL': seller_centre.orders_url},
+        'NAVIGATION': {
+            'AUTO_NAVIGATE': 'true',
+            'ORDER_DETAIL_URL': seller_centre.order_detail_url,
+            'ORDER_SEARCH_URL': seller_centre.order_search_url,
+            'CHAT_BUTTON_SELECTOR': '.chat-button',
+            'CONCURRENT_TABS': str(args.tabs),
+            'MAX_REQUESTS_PER_SECOND': '100',
+        },
+        'METRICS': {'JSONL': 'run_metrics.jsonl'},
+    })
+    with open(os.path.join(workdir, 'config.ini'), 'w') as f:
+        config.write(f)
+    with open(os.path.join(workdir, 'token.json'), 'w') as f:
+        json.dump({
+            'token': 'bench-token', 'refresh_token': 'bench-refresh', 'token_uri': google.token_uri,
+            'client_id': 'bench', 'client_secret': 'bench', 'expiry': '2099-01-01T00:00:00Z',
+        }, f)
+    with open(os.path.join(workdir, 'discovery.json'), 'w') as f:
+        json.dump(google.discovery_document(), f)
+
+
+def run_once(args):
+    """One cold run of main(); returns the measurements"""
+    workdir = tempfile.mkdtemp(prefix="bench_end_to_end_")
+    try:
+        with FakeSellerCentre(orders=args.orders, latency=args.latency) as seller_centre, \
+                StubGoogleServer(latency=args.latency) as google:
+            write_workdir(workdir, seller_centre, google, args)
+            env = dict(os.environ, PYTHONPATH=SHOPEE_DIR + os.pathsep + os.environ.get('PYTHONPATH', ''))
+            with open(os.path.join(workdir, 'main.log'), 'w') as log:
+                start = time.perf_counter()
+                process = subprocess.Popen([sys.executable, '-c', RUN_MAIN], cwd=workdir, env=env,
+                                           stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT)
+                # wait4 reports the peak RSS of this child (and what it reaped) only
+                _, status, usage = os.wait4(process.pid, 0)
+                process.returncode = os.waitstatus_to_exitcode(status)
+                elapsed = time.perf_counter() - start
+            uploads = len(google.uploads)
+
+        spans = []
+        metrics_path = os.path.join(workdir, 'run_metrics.jsonl')
+        if os.path.exists(metrics_path):
+            with open(metrics_path) as f:
+                spans = [json.loads(line) for line in f]
+        reported = sum(span.get('rows', 0) for span in spans if span['step'] == 'report')
+        if process.returncode or not reported:
+            with open(os.path.join(workdir, 'main.log')) as f:
+                tail = f.read().splitlines()[-30:]
+            print(f"✗ main() exited with {process.returncode}, {reported} orders reported:\n  " + "\n  ".join(tail))
+
+        # ru_maxrss is in KB on Linux and in bytes on macOS
+        peak_rss_mb = usage.ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+        stages = {}
+        for span in spans:
+            stages.setdefault(span['step'], []).append(span['seconds'])
+        return {
+            'seconds': elapsed,
+            'orders_reported': reported,
+            'uploads': uploads,
+            'orders_per_minute': reported / elapsed * 60,
+            'peak_rss_mb': peak_rss_mb,
+            'stages': stages,
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=SHOPEE_DIR,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=SHOPEE_DIR,
+                               capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ('-dirty' if dirty else '')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark of main()")
+    parser.add_argument('--orders', type=int, default=20, help="orders in the fake 'Perlu Dikirim' list")
+    parser.add_argument('--latency', type=float, default=0.05, help="seconds per request of the fake servers")
+    parser.add_argument('--runs', type=int, default=1, help="cold runs (the median is reported)")
+    parser.add_argument('--tabs', type=int, default=1, help="CONCURRENT_TABS")
+    parser.add_argument('--upload-workers', type=int, default=3, help="[UPLOAD] WORKERS")
+    parser.add_argument('--share-mode', default='file', choices=('file', 'folder'), help="SHARE_MODE")
+    parser.add_argument('--output', help="append the results as one JSON line to this file")
+    args = parser.parse_args()
+
+    runs = [run_once(args) for _ in range(args.runs)]
+    stages = {}
+    for run in runs:
+        for name, values in run['stages'].items():
+            stages.setdefault(name, []).extend(values)
+
+    result = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'orders': args.orders,
+        'latency': args.latency,
+        'tabs': args.tabs,
+        'upload_workers': args.upload_workers,
+        'share_mode': args.share_mode,
+        'runs': args.runs,
+        'seconds': statistics.median(run['seconds'] for run in runs),
+        'orders_per_minute': statistics.median(run['orders_per_minute'] for run in runs),
+        'orders_reported': min(run['orders_reported'] for run in runs),
+        'peak_rss_mb': max(run['peak_rss_mb'] for run in runs),
+        'stages': {
+            name: {'count': len(values), 'p50': percentile(values, 0.5), 'p95': percentile(values, 0.95)}
+            for name, values in stages.items()
+        },
+    }
+
+    print("\n" + "=" * 70)
+    print(f"END TO END: {args.orders} ORDERS, {args.latency * 1000:.0f} ms PER REQUEST, "
+          f"{args.tabs} TAB(S), {args.runs} RUN(S)  [{result['commit'] or 'no git'}]")
+    print("=" * 70)
+    print(f"orders reported: {result['orders_reported']}/{args.orders}   "
+          f"time: {result['seconds']:.1f} s   {result['orders_per_minute']:.1f} orders/min   "
+          f"peak RSS: {result['peak_rss_mb']:.0f} MB")
+    print(f"\n{'Stage':<22}{'Count':>7}{'p50 (s)':>10}{'p95 (s)':>10}")
+    ordered = [name for name in STAGES if name in stages] + sorted(set(stages) - set(STAGES))
+    for name in ordered:
+        stage = result['stages'][name]
+        print(f"{name:<22}{stage['count']:>7}{stage['p50']:>10.3f}{stage['p95']:>10.3f}")
+
+    if args.output:
+        with open(args.output, 'a') as f:
+            f.write(json.dumps(result) + '\n')
+        print(f"\nResults appended to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
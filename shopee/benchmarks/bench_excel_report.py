@@ -0,0 +1,119 @@
+"""
+Benchmark: append to a large Shopee report. load_workbook, streaming into a
+single file, and streaming with the report split into parts of MAX_ROWS rows
+(the default)
+
+Wall time is measured in its own run without tracemalloc, which slows
+openpyxl down several times; peak memory comes from a second run.
+
+Usage:
+    python benchmarks/bench_excel_report.py [existing_rows] [new_rows] [max_rows]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import openpyxl  # noqa: E402
+from excel_report import create_excel_report  # noqa: E402
+from report_index import DEFAULT_MAX_ROWS, index_path, part_path, report_parts  # noqa: E402
+
+
+def legacy_append(order_data, output_file):
+    """The original implementation: load the whole workbook and append in place"""
+    wb = openpyxl.load_workbook(output_file)
+    ws = wb.active
+    next_row = ws.max_row + 1
+    current_no = next_row - 1
+    for data in order_data:
+        ws[f'A{next_row}'] = current_no
+        ws[f'B{next_row}'] = data['order_number']
+        ws[f'C{next_row}'] = data['gdrive_link']
+        next_row += 1
+        current_no += 1
+    wb.save(output_file)
+
+
+def copy_report(source, target):
+    """Replace target with a copy of a report, all its parts and its index"""
+    for path in report_parts(target) + [index_path(target)]:
+        if os.path.exists(path):
+            os.remove(path)
+    for number, path in enumerate(report_parts(source), 1):
+        # copy2 keeps the modification time, so the copied index stays in sync
+        shutil.copy2(path, part_path(target, number))
+    if os.path.exists(index_path(source)):
+        shutil.copy(index_path(source), index_path(target))
+
+
+def measure(fn, source, target, order_data):
+    """(wall time without tracing, peak traced Python memory), each on a fresh copy"""
+    copy_report(source, target)
+    start = time.perf_counter()
+    fn(order_data, target)
+    elapsed = time.perf_counter() - start
+
+    copy_report(source, target)
+    tracemalloc.start()
+    fn(order_data, target)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def orders(start, count):
+    return [
+        {'order_number': f"2504{i:010d}", 'gdrive_link': f"https://drive.google.com/file/d/{i:033d}/view"}
+        for i in range(start, start + count)
+    ]
+
+
+def main():
+    existing = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    new = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    max_rows = int(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_MAX_ROWS
+    workdir = tempfile.mkdtemp(prefix="bench_excel_")
+    try:
+        single = os.path.join(workdir, "single.xlsx")
+        split = os.path.join(workdir, "split.xlsx")
+        # Worst case for parts: the new rows just fit into the last part,
+        # which is rewritten with max_rows - new rows already in it
+        worst = os.path.join(workdir, "worst.xlsx")
+        worst_rows = existing // max_rows * max_rows + max(max_rows - new, 0)
+        print(f"Creating reports with {existing} rows...")
+        create_excel_report(orders(0, existing), single, max_rows=existing + new)
+        create_excel_report(orders(0, existing), split, max_rows=max_rows)
+        create_excel_report(orders(0, worst_rows), worst, max_rows=max_rows)
+        print(f"Single file: {os.path.getsize(single) / 1024 / 1024:.1f} MB, "
+              f"split: {len(report_parts(split))} files of up to {max_rows} rows\n")
+
+        def append_in_parts(data, target):
+            create_excel_report(data, target, max_rows=max_rows)
+
+        strategies = (
+            ("load_workbook", single, legacy_append),
+            ("streaming, one file", single,
+             lambda data, target: create_excel_report(data, target, max_rows=existing + new)),
+            (f"parts of {max_rows}", split, append_in_parts),
+            (f"parts, worst case ({worst_rows} rows)", worst, append_in_parts),
+        )
+        results = {}
+        for number, (name, source, fn) in enumerate(strategies):
+            target = os.path.join(workdir, f"target{number}.xlsx")
+            results[name] = measure(fn, source, target, orders(worst_rows + existing, new))
+
+        print("\n" + "=" * 90)
+        print(f"APPEND {new} ROWS TO {existing} EXISTING ROWS")
+        print("=" * 90)
+        for name, (elapsed, peak) in results.items():
+            print(f"{name:<36} time: {elapsed:7.2f} s   peak Python memory: {peak / 1024 / 1024:8.1f} MB")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark: screenshot size and encode time per output format
+
+Generates chat-like sample screenshots (visible area and full page) and
+compresses them with every supported format.
+
+Usage:
+    python benchmarks/bench_image_pipeline.py
+"""
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw  # noqa: E402
+from image_pipeline import compress_screenshot  # noqa: E402
+
+SETTINGS = [
+    ("png (optimized)", 'png', None, None),
+    ("webp q80", 'webp', 80, None),
+    ("webp q80 1280px", 'webp', 80, 1280),
+    ("jpeg q80", 'jpeg', 80, None),
+    ("jpeg q80 1280px", 'jpeg', 80, 1280),
+]
+
+
+def make_sample(path, width, height, seed=0):
+    """Draw a Seller Centre-like page: sidebar, header and chat bubbles with text"""
+    rng = random.Random(seed)
+    image = Image.new("RGB", (width, height), (245, 245, 245))
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((0, 0, width, 64), fill=(238, 77, 45))
+    draw.rectangle((0, 64, 240, height), fill=(255, 255, 255))
+    for y in range(90, height - 40, 48):
+        buyer = rng.random() < 0.5
+        x0 = 1300 if buyer else 1500
+        draw.rounded_rectangle((x0, y, x0 + 380, y + 36), 8, fill=(255, 255, 255) if buyer else (255, 237, 230))
+        draw.text((x0 + 12, y + 10), "".join(rng.choice("abcdefghij klmnop") for _ in range(40)), fill=(30, 30, 30))
+        draw.text((280, y + 10), f"Pesanan {rng.randrange(10**14):014d}  Rp{rng.randrange(10**6):,}", fill=(60, 60, 60))
+    image.save(path)
+
+
+def main():
+    workdir = tempfile.mkdtemp(prefix="bench_images_")
+    try:
+        samples = {
+            "visible 1920x1080": (1920, 1080),
+            "full page 1920x6000": (1920, 6000),
+        }
+        for label, (width, height) in samples.items():
+            source = os.path.join(workdir, f"sample_{width}x{height}.png")
+            make_sample(source, width, height)
+            original = os.path.getsize(source)
+
+            print("\n" + "=" * 70)
+            print(f"{label}: original PNG {original / 1024:.0f} KB")
+            print("=" * 70)
+            for name, fmt, quality, max_width in SETTINGS:
+                copy = os.path.join(workdir, f"{name.replace(' ', '_')}_{width}x{height}.png")
+                shutil.copy(source, copy)
+                start = time.perf_counter()
+                output = compress_screenshot(copy, fmt, quality or 80, max_width)
+                elapsed = time.perf_counter() - start
+                size = os.path.getsize(output)
+                print(f"{name:<18} {size / 1024:8.0f} KB  {original / size:5.1f}x smaller  {elapsed * 1000:7.0f} ms")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
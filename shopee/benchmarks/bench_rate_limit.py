@@ -0,0 +1,84 @@
+"""
+Benchmark: uploads against a rate-limited Drive (offline)
+
+The fake Drive answers 429 (Retry-After: 1) to calls over its per-second
+quota. Compares the old behavior (no retries: the order is dropped), retries
+alone, and retries with the shared adaptive rate limiter.
+
+Usage:
+    python benchmarks/bench_rate_limit.py [files] [quota_per_second] [workers]
+"""
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import drive_service  # noqa: E402
+from fake_drive import FakeDriveService  # noqa: E402
+from retry import AdaptiveRateLimiter, Retrier  # noqa: E402
+from shopee_automation import make_uploader  # noqa: E402
+from storage import DriveStorage  # noqa: E402
+from upload_pipeline import UploadPipeline  # noqa: E402
+
+
+def make_screenshots(folder, count):
+    paths = {}
+    for i in range(count):
+        order_number = f"2504{i:010d}"
+        paths[order_number] = os.path.join(folder, f"{order_number}.png")
+        with open(paths[order_number], 'wb') as f:
+            f.write(os.urandom(50 * 1024))
+    return paths
+
+
+def run(files, quota, workers, retrier):
+    drive = FakeDriveService(latency=0.02, quota_per_second=quota)
+    drive_service.build_drive_service = lambda *args, **kwargs: drive
+    storage = DriveStorage(None, 'folder', share=True, retrier=retrier)
+    pipeline = UploadPipeline(make_uploader(storage), workers=workers, queue_size=len(files))
+    start = time.perf_counter()
+    # The per-file ✓/✗ lines would drown the results
+    with contextlib.redirect_stdout(io.StringIO()):
+        pipeline.start()
+        for order_number, path in files.items():
+            pipeline.submit(order_number, path)
+        results = pipeline.join()
+    elapsed = time.perf_counter() - start
+    uploaded = sum(1 for entry in results if entry['result'])
+    return uploaded, elapsed, retrier.retries, len(drive.failures)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    quota = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else 6
+    workdir = tempfile.mkdtemp(prefix="bench_rate_limit_")
+    try:
+        files = make_screenshots(workdir, count)
+        strategies = {
+            "no retries": Retrier(max_attempts=1),
+            "retries": Retrier(max_attempts=8, max_delay=8),
+            "retries + limiter": Retrier(
+                max_attempts=8, max_delay=8,
+                limiter=AdaptiveRateLimiter(requests_per_second=quota, max_concurrency=workers),
+            ),
+        }
+        results = {name: run(files, quota, workers, retrier) for name, retrier in strategies.items()}
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print("\n" + "=" * 78)
+    print(f"UPLOAD {count} FILES, {workers} WORKERS, DRIVE QUOTA {quota} CALLS/S (3 calls per file)")
+    print("=" * 78)
+    for name, (uploaded, elapsed, retries, throttled) in results.items():
+        print(f"{name:<18} uploaded: {uploaded:4d}/{count}   lost: {count - uploaded:4d}   "
+              f"{uploaded / elapsed * 60:7.0f} files/min   retries: {retries:4d}   429s: {throttled:4d}")
+
+
+if __name__ == "__main__":
+    main()
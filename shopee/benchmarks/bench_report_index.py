@@ -0,0 +1,75 @@
+"""
+Benchmark: is an order already in the report? Workbook scan vs sidecar index
+
+Measures, for a report of N rows, looking up a batch of orders (half of them
+present) by scanning the workbook, by the index on first use (built from the
+report once) and by the index afterwards.
+
+Usage:
+    python benchmarks/bench_report_index.py [existing_rows] [lookups]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from excel_report import create_excel_report, iter_report_rows  # noqa: E402
+from report_index import ReportIndex, index_path  # noqa: E402
+
+
+def orders(start, count):
+    return [
+        {'order_number': f"2504{i:010d}", 'gdrive_link': f"https://drive.google.com/file/d/{i:033d}/view"}
+        for i in range(start, start + count)
+    ]
+
+
+def scan_known(report_file, order_numbers):
+    """Without an index: read every row of the report"""
+    wanted = set(order_numbers)
+    return {order_number: link for _, order_number, link in iter_report_rows(report_file) if order_number in wanted}
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    existing = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    lookups = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    workdir = tempfile.mkdtemp(prefix="bench_report_index_")
+    try:
+        report = os.path.join(workdir, "report.xlsx")
+        print(f"Creating report with {existing} rows...")
+        create_excel_report(orders(0, existing), report)
+        # Start without the index written alongside, to time building it
+        os.remove(index_path(report))
+
+        # Half of the lookups are in the report, half are new orders
+        numbers = [data['order_number'] for data in orders(existing - lookups // 2, lookups)]
+        scan_seconds, scanned = timed(scan_known, report, numbers)
+        index = ReportIndex(report)
+        cold_seconds, cold = timed(index.known, numbers)
+        warm_seconds, warm = timed(index.known, numbers)
+        single_seconds, _ = timed(index.known, numbers[:1])
+        index.close()
+        assert scanned == cold == warm
+
+        print("\n" + "=" * 70)
+        print(f"LOOK UP {lookups} ORDERS IN A REPORT OF {existing} ROWS ({len(warm)} FOUND)")
+        print("=" * 70)
+        print(f"{'workbook scan':<22} {scan_seconds * 1000:10.1f} ms")
+        print(f"{'index, first use':<22} {cold_seconds * 1000:10.1f} ms   (builds the index once)")
+        print(f"{'index':<22} {warm_seconds * 1000:10.1f} ms")
+        print(f"{'index, one order':<22} {single_seconds * 1000:10.3f} ms")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark: upload screenshots to each storage backend (offline)
+
+Google Drive and S3 are in-memory stand-ins with a fixed latency per API call;
+the local backend writes to a temporary folder.
+
+Usage:
+    python benchmarks/bench_storage.py [files] [latency_seconds] [workers]
+"""
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import drive_service  # noqa: E402
+from fake_drive import FakeDriveService  # noqa: E402
+from fake_s3 import FakeS3Client  # noqa: E402
+from shopee_automation import make_uploader  # noqa: E402
+from storage import DriveStorage, LocalStorage, S3Storage  # noqa: E402
+from upload_pipeline import UploadPipeline  # noqa: E402
+
+
+def make_screenshots(folder, count, size=200 * 1024):
+    paths = {}
+    for i in range(count):
+        order_number = f"2504{i:010d}"
+        path = os.path.join(folder, f"{order_number}.png")
+        with open(path, 'wb') as f:
+            f.write(os.urandom(size))
+        paths[order_number] = path
+    return paths
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+    workdir = tempfile.mkdtemp(prefix="bench_storage_")
+    try:
+        files = make_screenshots(workdir, count)
+        drive = FakeDriveService(latency=latency)
+        drive_service.build_drive_service = lambda *args, **kwargs: drive
+        backends = {
+            "drive": DriveStorage(None, 'folder', share=True),
+            "drive (batch share)": DriveStorage(None, 'folder', share=False),
+            "s3": S3Storage("evidence", client=FakeS3Client(latency=latency)),
+            "local": LocalStorage(os.path.join(workdir, "evidence")),
+        }
+
+        results = {}
+        for name, storage in backends.items():
+            pipeline = UploadPipeline(make_uploader(storage), workers=workers, queue_size=count)
+            start = time.perf_counter()
+            # The per-file ✓/✗ lines would drown the results
+            with contextlib.redirect_stdout(io.StringIO()):
+                pipeline.start()
+                for order_number, path in files.items():
+                    pipeline.submit(order_number, path)
+                uploaded = pipeline.join()
+            if storage.share_required and not storage.share_on_upload:
+                storage.share({entry['order_number']: entry['result']['id'] for entry in uploaded})
+            storage.close()
+            results[name] = time.perf_counter() - start
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print("\n" + "=" * 70)
+    print(f"UPLOAD {count} SCREENSHOTS ({workers} workers, {latency * 1000:.0f} ms per API call)")
+    print("=" * 70)
+    for name, elapsed in results.items():
+        print(f"{name:<20} {elapsed:7.2f} s   {count / elapsed * 60:8.0f} files/min")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,30 +4,55 @@ Check if Chrome debugging port is accessible
 import requests
 import json
 
+# Port start_chrome.py opens for remote debugging
+DEBUGGING_PORT = 9222
+
+
+def get_debugging_info(endpoint, timeout=2):
+    """
+    Read /json/version of a Chrome remote debugging endpoint
+    
+    Args:
+        endpoint: Base URL, e.g. http://127.0.0.1:9222
+        timeout: Seconds to wait for an answer
+        
+    Returns:
+        dict: Browser version info (with 'webSocketDebuggerUrl'), or None if not reachable
+    """
+    try:
+        response = requests.get(f"{endpoint.rstrip('/')}/json/version", timeout=timeout)
+        if response.status_code == 200:
+            return response.json()
+    except (requests.exceptions.RequestException, ValueError):
+        pass
+    return None
+
+
+def find_debugging_endpoint(port=DEBUGGING_PORT, timeout=2):
+    """Base URL of the first local address where Chrome answers on the debugging port, or None"""
+    for host in ("127.0.0.1", "localhost"):
+        endpoint = f"http://{host}:{port}"
+        if get_debugging_info(endpoint, timeout):
+            return endpoint
+    return None
+
+
 def check_debugging_port():
     """Check if Chrome is listening on debugging port"""
     print("Checking Chrome debugging port...")
     print("="*70)
     
-    urls = [
-        "http://127.0.0.1:9222/json/version",
-        "http://localhost:9222/json/version"
-    ]
-    
-    for url in urls:
-        try:
-            print(f"\nTrying: {url}")
-            response = requests.get(url, timeout=2)
-            if response.status_code == 200:
-                data = response.json()
-                print(f"✓ SUCCESS! Chrome is running with debugging")
-                print(f"  Browser: {data.get('Browser', 'Unknown')}")
-                print(f"  WebSocket: {data.get('webSocketDebuggerUrl', 'N/A')}")
-                return True
-        except requests.exceptions.ConnectionError:
-            print(f"  ✗ Connection refused - Chrome not listening here")
-        except Exception as e:
-            print(f"  ✗ Error: {e}")
+    for host in ("127.0.0.1", "localhost"):
+        endpoint = f"http://{host}:{DEBUGGING_PORT}"
+        print(f"\nTrying: {endpoint}/json/version")
+        data = get_debugging_info(endpoint)
+        if data:
+            print(f"✓ SUCCESS! Chrome is running with debugging")
+            print(f"  Browser: {data.get('Browser', 'Unknown')}")
+            print(f"  WebSocket: {data.get('webSocketDebuggerUrl', 'N/A')}")
+            print(f"\nSet CDP_URL={endpoint} in [BROWSER] of config.ini to reuse this Chrome")
+            return True
+        print(f"  ✗ Connection refused - Chrome not listening here")
     
     print("\n" + "="*70)
     print("✗ Chrome debugging port is NOT accessible!")
@@ -0,0 +1,65 @@
+"""
+Shared pytest fixtures. Browser tests run against local HTML fixtures and
+are skipped when Playwright's Chromium is not installed.
+"""
+import functools
+import pathlib
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+FIXTURES = pathlib.Path(__file__).parent / "fixtures"
+
+
+def fixture_url(name):
+    """file:// URL of an HTML fixture"""
+    return (FIXTURES / name).as_uri()
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def do_GET(self):
+        # ?delay=<ms> slows the response down to simulate a slow page
+        delay = parse_qs(urlparse(self.path).query).get('delay')
+        if delay:
+            time.sleep(int(delay[0]) / 1000)
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope="session")
+def fixture_server():
+    """Serve the fixtures folder over HTTP (fetch() does not work on file://)"""
+    handler = functools.partial(_QuietHandler, directory=str(FIXTURES))
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(scope="session")
+def chromium():
+    sync_api = pytest.importorskip("playwright.sync_api")
+    playwright = sync_api.sync_playwright().start()
+    try:
+        browser = playwright.chromium.launch()
+    except sync_api.Error as e:
+        playwright.stop()
+        pytest.skip(f"Chromium not available: {str(e).splitlines()[0]}")
+    yield browser
+    browser.close()
+    playwright.stop()
+
+
+@pytest.fixture
+def page(chromium):
+    context = chromium.new_context(viewport={'width': 1280, 'height': 720})
+    page = context.new_page()
+    yield page
+    context.close()
@@ -0,0 +1,419 @@
+"""
+Resident worker: keeps the browser session and the storage connection warm
+and processes orders submitted through the day from a local SQLite queue.
+
+    python daemon.py                     run the worker
+    python daemon.py submit SN1 SN2 ...  queue orders ('-' reads them from stdin)
+    python daemon.py status              show the queue depth
+
+While the worker runs, http://127.0.0.1:<PORT>/health and /metrics report
+its state, and POST /orders queues orders (JSON {"orders": [...]} or one
+order number per line).
+"""
+import argparse
+import configparser
+import json
+import signal
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from job_queue import STATUSES, JobQueue
+from timing import StepTimer
+
+# Spans (and recent durations per step) kept in memory for the metrics export
+DAEMON_MAX_SPANS = 10000
+
+
+class ShopeeBatchProcessor:
+    def __init__(self, config, timer=None, report_file='shopee_report.xlsx', screenshots_folder='screenshots'):
+        """
+        Capture, upload and report batches of orders with one long-lived
+        browser, storage backend and upload pipeline
+
+        Args:
+            config: ConfigParser from load_config()
+            timer: StepTimer shared with the daemon
+            report_file: Excel report the orders are appended to
+            screenshots_folder: Folder to save screenshots
+        """
+        self.config = config
+        self.timer = timer or StepTimer()
+        self.report_file = report_file
+        self.screenshots_folder = screenshots_folder
+        self.ready = False
+        self.app = None
+        self.shopee = None
+        self.pipeline = None
+        self.compressor = None
+        self.storage = None
+        self.token_refresher = None
+        self.report_index = None
+        self.crop_boxes = {}
+
+    def start(self):
+        """Connect to the storage, start the browser and the upload workers"""
+        # Deferred: the Google client libraries are only needed by the worker
+        import shopee_automation as app
+        from report_index import ReportIndex
+        from upload_manifest import UploadManifest
+        from upload_pipeline import UploadPipeline
+
+        self.app = app
+        config = self.config
+        self.share_mode = config.get('GOOGLE_DRIVE', 'SHARE_MODE', fallback='file').strip().lower()
+        if self.share_mode not in ('file', 'batch', 'folder'):
+            print(f"⚠ Unknown SHARE_MODE '{self.share_mode}', using 'file'")
+            self.share_mode = 'file'
+
+        with self.timer.step('drive_connect'):
+            self.storage = app.make_storage_backend(config, self.timer)
+        if isinstance(self.storage, app.DriveStorage):
+            # A long-lived worker outlives the hour an access token is valid
+            self.token_refresher = app.TokenRefresher(self.storage.creds).start()
+        self.share_mode = app.apply_share_mode(self.storage, self.share_mode)
+
+        self.manifest = UploadManifest(config.get('UPLOAD', 'MANIFEST', fallback='upload_manifest.jsonl'))
+        self.report_index = ReportIndex(self.report_file)
+        self.resource_filter = app.make_resource_filter(config)
+        self.shopee = app.make_shopee_automation(config, self.timer, self.resource_filter)
+        self.shopee.start_browser()
+        if not self.shopee.login():
+            raise RuntimeError("Login failed")
+
+        self.compressor = app.make_screenshot_compressor(config)
+        upload = app.make_uploader(
+            self.storage, manifest=self.manifest,
+            check_existing=config.getboolean('STORAGE', 'CHECK_EXISTING', fallback=False),
+            timer=self.timer,
+        )
+
+        def compress_and_upload(order_number, file_path):
+            with self.timer.step('compress', order=order_number):
+                file_path = self.compressor.process(file_path, self.crop_boxes.pop(order_number, None))
+            return upload(order_number, file_path)
+
+        self.pipeline = UploadPipeline(
+            compress_and_upload,
+            workers=config.getint('UPLOAD', 'WORKERS', fallback=3),
+            queue_size=config.getint('UPLOAD', 'QUEUE_SIZE', fallback=10),
+        ).start()
+        self.ready = True
+
+    def __call__(self, order_numbers, stop_event):
+        """
+        Process one batch
+
+        Args:
+            order_numbers: Orders to capture and upload
+            stop_event: threading.Event; once set, no further order is started
+
+        Returns:
+            dict: Order number -> evidence link (None if it failed) for every
+                order that was attempted, or found in the report already
+        """
+        # Orders already in the report keep their link and are not captured again
+        results = self.report_index.known(order_numbers)
+        order_numbers = [o for o in order_numbers if o not in results]
+        if not order_numbers:
+            return results
+        if not self.shopee.login():
+            raise RuntimeError("Login failed")
+        self.manifest.start_run(order_numbers)
+
+        attempted = []
+        for order_number in order_numbers:
+            if stop_event.is_set():
+                break
+            attempted.append(order_number)
+            screenshot_path = self.shopee.take_chat_screenshot(order_number, self.screenshots_folder)
+            if screenshot_path:
+                if self.shopee.last_capture_box:
+                    self.crop_boxes[order_number] = self.shopee.last_capture_box
+                self.pipeline.submit(order_number, screenshot_path)
+
+        with self.timer.step('upload_wait'):
+            self.pipeline.drain()
+        share_errors = {}
+        if self.share_mode != 'folder':
+            share_errors = self.app.share_unshared_uploads(self.storage, self.manifest, attempted, self.timer)
+
+        order_data = []
+        for order_number in attempted:
+            entry = self.manifest.run_upload(order_number)
+            if entry and order_number not in share_errors:
+                results[order_number] = entry['link']
+                order_data.append({'order_number': order_number, 'gdrive_link': entry['link']})
+            else:
+                results[order_number] = None
+
+        if order_data:
+            from excel_report import create_excel_report
+            from report_index import DEFAULT_MAX_ROWS
+            max_rows = self.config.getint('REPORT', 'MAX_ROWS', fallback=DEFAULT_MAX_ROWS)
+            with self.timer.step('report'):
+                create_excel_report(order_data, self.report_file, self.report_index, max_rows)
+            self.manifest.mark_reported(self.report_file, [data['order_number'] for data in order_data])
+        return results
+
+    def close(self):
+        """Finish pending uploads and close the browser"""
+        self.ready = False
+        if self.pipeline:
+            self.pipeline.join()
+        if self.compressor:
+            self.compressor.close()
+        if self.shopee:
+            self.shopee.close_browser()
+        if self.token_refresher:
+            self.token_refresher.stop()
+        if self.storage:
+            self.storage.close()
+        if self.report_index:
+            self.report_index.close()
+
+
+class ShopeeDaemon:
+    def __init__(self, queue, process_batch, batch_size=20, poll_interval=5.0,
+                 host='127.0.0.1', port=8765, timer=None, max_attempts=3):
+        """
+        Initialize the worker
+
+        Args:
+            queue: JobQueue to take orders from
+            process_batch: Callable(order_numbers, stop_event) returning a dict
+                order number -> link or None (see ShopeeBatchProcessor)
+            batch_size: Maximum orders per batch
+            poll_interval: Seconds between queue checks while idle
+            host: Address of the health/metrics endpoint (localhost only by default)
+            port: Port of the endpoint (0 = any free port)
+            timer: StepTimer whose step durations are exported in /metrics
+            max_attempts: Failed batches an order may be part of before it
+                is marked failed instead of queued again
+        """
+        self.queue = queue
+        self.process_batch = process_batch
+        self.batch_size = max(1, int(batch_size))
+        self.poll_interval = poll_interval
+        self.host = host
+        self.port = port
+        self.timer = timer
+        self.max_attempts = max(1, int(max_attempts))
+        self.status = 'starting'
+        self.started_at = time.time()
+        self.batches = 0
+        self.processed = {'done': 0, 'failed': 0}
+        self.current_batch = 0
+        self.last_batch_at = None
+        self._stop = threading.Event()
+        self._server = None
+
+    def serve_http(self):
+        """Start the health/metrics endpoint in a background thread"""
+        self._server = ThreadingHTTPServer((self.host, self.port), _DaemonHandler)
+        self._server.worker = self
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, name='daemon-http', daemon=True).start()
+        print(f"✓ Health endpoint: http://{self.host}:{self.port}/health")
+
+    def run(self):
+        """Process queued orders until stop() (or SIGTERM/SIGINT) is received"""
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, lambda *_: self.stop())
+            signal.signal(signal.SIGINT, lambda *_: self.stop())
+
+        requeued = self.queue.requeue_running()
+        if requeued:
+            print(f"⚠ {requeued} orders left running by the previous worker were queued again")
+        if self._server is None:
+            self.serve_http()
+        self.status = 'ok'
+        try:
+            while not self._stop.is_set():
+                jobs = self.queue.claim(self.batch_size)
+                if not jobs:
+                    self._stop.wait(self.poll_interval)
+                    continue
+                self._run_batch(jobs)
+        finally:
+            self.status = 'stopping'
+            self._server.shutdown()
+            self._server.server_close()
+            print("✓ Worker stopped")
+
+    def stop(self):
+        """Finish the order in progress, then stop (unstarted orders stay queued)"""
+        if not self._stop.is_set():
+            print("\n⚠ Stopping after the current order...")
+        self._stop.set()
+
+    def _run_batch(self, jobs):
+        # Deferred: submit/status must not load Playwright
+        from shopee_module import InteractionRequired
+
+        order_numbers = [order_number for _, order_number in jobs]
+        print(f"\n→ Batch of {len(jobs)} orders")
+        self.current_batch = len(jobs)
+        try:
+            results = self.process_batch(order_numbers, self._stop)
+        except InteractionRequired as e:
+            print(f"✗ {e}")
+            self.queue.release([job_id for job_id, _ in jobs])
+            self.stop()
+            return
+        except Exception as e:
+            print(f"✗ Batch failed: {e}")
+            failed = self.queue.retry([job_id for job_id, _ in jobs], f"batch failed: {e}", self.max_attempts)
+            if failed:
+                print(f"✗ {failed} orders failed {self.max_attempts} times, not retried")
+                self.processed['failed'] += failed
+            # Do not spin on a persistent error (e.g. Drive unreachable)
+            self._stop.wait(self.poll_interval)
+            return
+        finally:
+            self.current_batch = 0
+
+        not_started = []
+        for job_id, order_number in jobs:
+            if order_number not in results:
+                not_started.append(job_id)
+            elif results[order_number]:
+                self.queue.finish(job_id, link=results[order_number])
+                self.processed['done'] += 1
+            else:
+                self.queue.finish(job_id, error='screenshot or upload failed')
+                self.processed['failed'] += 1
+        self.queue.release(not_started)
+        self.batches += 1
+        self.last_batch_at = time.time()
+        print(f"✓ Batch finished: {sum(1 for r in results.values() if r)}/{len(jobs)} orders uploaded")
+
+    def health(self):
+        """State for the /health endpoint"""
+        return {
+            'status': self.status,
+            'uptime_seconds': round(time.time() - self.started_at, 1),
+            'current_batch': self.current_batch,
+            'last_batch_at': self.last_batch_at,
+            'queue': self.queue.depth(),
+        }
+
+    def metrics(self):
+        """Prometheus text exposition for the /metrics endpoint"""
+        lines = [
+            '# HELP shopee_jobs Jobs in the queue per status',
+            '# TYPE shopee_jobs gauge',
+        ]
+        depth = self.queue.depth()
+        lines += [f'shopee_jobs{{status="{status}"}} {depth[status]}' for status in STATUSES]
+        lines += [
+            '# TYPE shopee_daemon_uptime_seconds gauge',
+            f'shopee_daemon_uptime_seconds {time.time() - self.started_at:.1f}',
+            '# TYPE shopee_daemon_batches_total counter',
+            f'shopee_daemon_batches_total {self.batches}',
+            '# TYPE shopee_daemon_orders_total counter',
+        ]
+        lines += [f'shopee_daemon_orders_total{{result="{result}"}} {n}' for result, n in self.processed.items()]
+        if self.timer:
+            lines += self.timer.prometheus_lines()
+        return '\n'.join(lines) + '\n'
+
+
+class _DaemonHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        worker = self.server.worker
+        if self.path == '/health':
+            health = worker.health()
+            self._send(200 if health['status'] == 'ok' else 503, json.dumps(health), 'application/json')
+        elif self.path == '/metrics':
+            self._send(200, worker.metrics(), 'text/plain; version=0.0.4')
+        else:
+            self._send(404, json.dumps({'error': 'not found'}), 'application/json')
+
+    def do_POST(self):
+        if self.path != '/orders':
+            self._send(404, json.dumps({'error': 'not found'}), 'application/json')
+            return
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0))).decode('utf-8')
+        try:
+            orders = json.loads(body)['orders'] if body.lstrip().startswith('{') else body.splitlines()
+        except (ValueError, KeyError, TypeError):
+            self._send(400, json.dumps({'error': 'expected {"orders": [...]} or one order per line'}),
+                       'application/json')
+            return
+        queue = self.server.worker.queue
+        added = queue.submit(orders)
+        self._send(202, json.dumps({'added': added, 'queued': queue.depth()['queued']}), 'application/json')
+
+    def _send(self, status, body, content_type):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resident Shopee screenshot worker")
+    subcommands = parser.add_subparsers(dest='command')
+    submit = subcommands.add_parser('submit', help="queue order numbers")
+    submit.add_argument('orders', nargs='+', help="order numbers, or - to read them from stdin")
+    subcommands.add_parser('status', help="show the queue depth")
+    args = parser.parse_args(argv)
+
+    config = configparser.ConfigParser()
+    config.read('config.ini')
+    queue = JobQueue(config.get('DAEMON', 'QUEUE', fallback='jobs.sqlite3'))
+
+    if args.command == 'submit':
+        orders = sys.stdin.read().split() if args.orders == ['-'] else args.orders
+        added = queue.submit(orders)
+        print(f"✓ {added} orders queued ({queue.depth()['queued']} waiting)")
+        return 0
+    if args.command == 'status':
+        for status, count in queue.depth().items():
+            print(f"{status:<10}{count:>6}")
+        return 0
+
+    from shopee_module import InteractionRequired
+
+    print("\n" + "="*70)
+    print("SHOPEE AUTOMATION - WORKER")
+    print("="*70)
+    timer = StepTimer(max_spans=DAEMON_MAX_SPANS)
+    processor = ShopeeBatchProcessor(
+        config, timer,
+        report_file=config.get('DAEMON', 'REPORT', fallback='shopee_report.xlsx'),
+    )
+    daemon = ShopeeDaemon(
+        queue, processor,
+        batch_size=config.getint('DAEMON', 'BATCH_SIZE', fallback=20),
+        poll_interval=config.getfloat('DAEMON', 'POLL_SECONDS', fallback=5),
+        port=config.getint('DAEMON', 'PORT', fallback=8765),
+        timer=timer,
+        max_attempts=config.getint('DAEMON', 'MAX_ATTEMPTS', fallback=3),
+    )
+    try:
+        daemon.serve_http()
+        processor.start()
+        daemon.run()
+    except InteractionRequired as e:
+        print(f"\n✗ {e}")
+        return 2
+    finally:
+        processor.close()
+        queue.close()
+        timer.print_summary()
+        # close() clears ready; app is set once start() got going
+        if processor.app:
+            processor.app.export_run_metrics(config, timer)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
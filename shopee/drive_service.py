@@ -0,0 +1,152 @@
+"""
+Google Drive client setup without network round-trips at startup.
+The discovery document is read from a local file once per process, services
+are built on first use, and the OAuth token is refreshed ahead of expiry in a
+background thread instead of synchronously before the run starts.
+"""
+import functools
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime
+
+DRIVE_API = ('drive', 'v3')
+
+# Refresh the access token this many seconds before it expires
+DEFAULT_REFRESH_MARGIN = 300
+
+
+@functools.lru_cache(maxsize=None)
+def load_discovery_document(path=None):
+    """
+    Drive v3 discovery document, parsed once per process
+
+    Args:
+        path: Local copy of the discovery JSON. None uses the static copy
+            shipped with google-api-python-client.
+
+    Returns:
+        dict: Parsed discovery document
+    """
+    if path:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    from googleapiclient.discovery_cache import get_static_doc
+    text = get_static_doc(*DRIVE_API)
+    if text is None:
+        raise RuntimeError("google-api-python-client has no static Drive v3 discovery document; "
+                           "set DISCOVERY_DOCUMENT in [GOOGLE_DRIVE]")
+    return json.loads(text)
+
+
+def build_drive_service(creds, discovery_path=None):
+    """Drive service built from the local discovery document (no network)"""
+    from googleapiclient.discovery import build_from_document
+    return build_from_document(load_discovery_document(discovery_path), credentials=creds)
+
+
+class LazyDriveService:
+    def __init__(self, creds, discovery_path=None):
+        """
+        Drive service proxy that is built on first use
+
+        Args:
+            creds: Google OAuth credentials
+            discovery_path: Optional local discovery document (see load_discovery_document)
+        """
+        self.creds = creds
+        self.discovery_path = discovery_path
+        self._service = None
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        # Only called for attributes not set in __init__, i.e. the API resources
+        if self._service is None:
+            with self._lock:
+                if self._service is None:
+                    self._service = build_drive_service(self.creds, self.discovery_path)
+        return getattr(self._service, name)
+
+    def close(self):
+        """Close the HTTP connection of the service, if it was built"""
+        with self._lock:
+            service, self._service = self._service, None
+        if service is not None and hasattr(service, 'close'):
+            service.close()
+
+
+class TokenRefresher:
+    def __init__(self, creds, token_path='token.json', margin=DEFAULT_REFRESH_MARGIN, request=None):
+        """
+        Refresh OAuth credentials in the background ahead of expiry
+
+        Args:
+            creds: google.oauth2.credentials.Credentials with a refresh token
+            token_path: File the refreshed token is saved to (None = don't save)
+            margin: Seconds before expiry to refresh
+            request: google.auth transport Request (a requests-based one if None)
+        """
+        self.creds = creds
+        self.token_path = token_path
+        self.margin = margin
+        self.request = request
+        self.refreshes = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def seconds_until_refresh(self, now=None):
+        """Seconds until the next refresh is due (0 = now), None if the token never expires"""
+        if not self.creds.token:
+            return 0
+        if self.creds.expiry is None:
+            return None
+        now = now or datetime.utcnow()
+        return max(0.0, (self.creds.expiry - now).total_seconds() - self.margin)
+
+    def refresh_now(self):
+        """Refresh the access token and save it"""
+        if self.request is None:
+            from google.auth.transport.requests import Request
+            self.request = Request()
+        self.creds.refresh(self.request)
+        self.refreshes += 1
+        if self.token_path:
+            # Written next to the file and renamed: shops running in parallel
+            # processes (multi_shop.py) share token.json and may refresh at once
+            folder = os.path.dirname(os.path.abspath(self.token_path))
+            fd, tmp_path = tempfile.mkstemp(dir=folder, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w') as token:
+                    token.write(self.creds.to_json())
+                os.replace(tmp_path, self.token_path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+
+    def start(self):
+        """Start the background thread (no-op without a refresh token)"""
+        if not getattr(self.creds, 'refresh_token', None) or self._thread:
+            return self
+        self._thread = threading.Thread(target=self._run, name='token-refresh', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        while True:
+            wait = self.seconds_until_refresh()
+            if wait is None or self._stop.wait(wait):
+                return
+            try:
+                self.refresh_now()
+            except Exception as e:
+                # The next API call refreshes on its own if this keeps failing
+                print(f"⚠ Could not refresh the Google token: {e}")
+                if self._stop.wait(60):
+                    return
@@ -0,0 +1,253 @@
+"""
+Excel report writer for the Shopee CS template (No, OrderSN, Bukti).
+A report file holds at most max_rows orders; later orders go to numbered
+part files (shopee_report_part2.xlsx, ...), so an append only ever rewrites
+the last, bounded part. Rows are streamed with openpyxl's read-only/write-only
+modes, so the part being rewritten is never held in memory either. Orders
+already in the report are looked up in its sidecar index (report_index.py)
+and are not written twice.
+"""
+import copy
+import os
+import tempfile
+
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Font
+
+from report_index import DEFAULT_MAX_ROWS, ReportIndex, part_path, report_parts
+
+HEADERS = [
+    "No",
+    "OrderSN/ Nomor Pesanan",
+    "Bukti pembeli sudah menerima pesanan\n- Screenshot yang menunjukkan pembeli sudah mengonfirmasi menerima produk non fisik. Screenshot harus dari Chat di Shopee, screenshot dari platform lain (cth Whatsapp) tidak akan diproses\n- Masukkan foto kedalam google drive dan salin ulang link kedalam kolom dibawah ini\n- Pastikan google drive tidak terkunci sehingga dapat diakses oleh Tim Shopee",
+]
+
+COLUMN_WIDTHS = {'A': 5, 'B': 20, 'C': 100}
+HEADER_HEIGHT = 80
+
+
+def iter_report_rows(report_file):
+    """
+    Stream the data rows of an existing report.
+
+    Rows without an OrderSN (e.g. trailing formatted but empty rows) are skipped.
+
+    Args:
+        report_file: Path to the Excel report
+
+    Yields:
+        tuple: (no, order_number, link) for every data row
+    """
+    wb = load_workbook(report_file, read_only=True)
+    try:
+        ws = wb.active
+        for row in ws.iter_rows(min_row=2, max_col=3, values_only=True):
+            row = tuple(row) + (None,) * (3 - len(row))
+            if row[1] is None or str(row[1]).strip() == '':
+                continue
+            yield row
+    finally:
+        wb.close()
+
+
+def _new_report_sheet(title="Sheet1", header=True):
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title)
+
+    # Column widths and header height must be set before any row is written
+    for column, width in COLUMN_WIDTHS.items():
+        ws.column_dimensions[column].width = width
+    ws.row_dimensions[1].height = HEADER_HEIGHT
+
+    # Add headers (Row 1) - matching Shopee template, bold and wrapped
+    if header:
+        ws.append([_header_cell(ws, value) for value in HEADERS])
+    return wb, ws
+
+
+def _header_cell(ws, value):
+    cell = WriteOnlyCell(ws, value=value)
+    cell.font = Font(bold=True)
+    cell.alignment = Alignment(wrap_text=True, vertical='top')
+    return cell
+
+
+def _copied_row(ws, row):
+    """
+    Values of a read-only row for ws.append(), with the cell styles copied
+    (only for rows that have any, which the rows written here do not)
+    """
+    if not any(getattr(cell, 'has_style', False) for cell in row):
+        return [cell.value for cell in row]
+    cells = []
+    for source in row:
+        cell = WriteOnlyCell(ws, value=source.value)
+        if getattr(source, 'has_style', False):
+            for attribute in ('font', 'fill', 'border', 'alignment', 'protection'):
+                setattr(cell, attribute, copy.copy(getattr(source, attribute)))
+            cell.number_format = source.number_format
+        cells.append(cell)
+    return cells
+
+
+def _stream_existing_rows(report_file, ws):
+    """
+    Copy every row of a single-sheet report into ws (all columns, with their
+    cell styles), skipping rows without any value
+
+    Returns:
+        int: Number of data rows, i.e. rows after the header with an OrderSN
+    """
+    src = load_workbook(report_file, read_only=True)
+    try:
+        count = 0
+        for number, row in enumerate(src.active.iter_rows(), 1):
+            if all(cell.value is None for cell in row):
+                continue
+            ws.append(_copied_row(ws, row))
+            if number > 1 and len(row) > 1 and row[1].value is not None and str(row[1].value).strip():
+                count += 1
+        return count
+    finally:
+        src.close()
+
+
+def _report_layout(report_file):
+    """(sheet names, title of the active sheet) of an existing report"""
+    wb = load_workbook(report_file, read_only=True)
+    try:
+        return wb.sheetnames, wb.active.title
+    finally:
+        wb.close()
+
+
+def _append_in_place(report_file, rows):
+    """
+    Load the whole workbook and add rows after the last row with an OrderSN
+    of the active sheet; used when other sheets have to be kept
+
+    Returns:
+        openpyxl.Workbook: The workbook, to be saved by the caller
+    """
+    wb = load_workbook(report_file)
+    ws = wb.active
+    last = 1
+    for number, (order_number,) in enumerate(ws.iter_rows(min_row=2, min_col=2, max_col=2, values_only=True), 2):
+        if order_number is not None and str(order_number).strip():
+            last = number
+    for offset, row in enumerate(rows, 1):
+        for column, value in enumerate(row, 1):
+            ws.cell(last + offset, column, value)
+    return wb
+
+
+def _write_part(path, rows):
+    """
+    Append rows to one report file, creating it if needed, and replace the
+    file atomically
+
+    Args:
+        path: Report file (part)
+        rows: (no, order_number, link) tuples
+    """
+    if os.path.exists(path):
+        print(f"File '{path}' sudah ada, akan menambahkan data baru...")
+        sheets, title = _report_layout(path)
+        if len(sheets) > 1:
+            print(f"⚠ {path} berisi {len(sheets)} sheet, workbook dimuat utuh agar sheet lain tidak hilang")
+            wb, ws = _append_in_place(path, rows), None
+        else:
+            wb, ws = _new_report_sheet(title, header=False)
+            _stream_existing_rows(path, ws)
+    else:
+        print(f"Membuat file Excel baru: {path}")
+        wb, ws = _new_report_sheet()
+    if ws is not None:
+        for row in rows:
+            ws.append(list(row))
+
+    # Write next to the target and swap, so a crash never leaves a half-written report
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(suffix='.xlsx', dir=directory)
+    os.close(fd)
+    try:
+        wb.save(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def create_excel_report(order_data, output_file='shopee_report.xlsx', index=None, max_rows=DEFAULT_MAX_ROWS):
+    """
+    Creates an Excel report with order numbers and Google Drive links.
+    Format follows Shopee CS template with 3 columns: No, OrderSN, Bukti
+    If the file exists, it will append new data. Otherwise, create new file.
+
+    Every file holds at most max_rows orders. When the last file is full,
+    new orders go to the next part (output_file with _part2, _part3, ...
+    before the extension), which starts with its own header and numbering,
+    so the cost of an append does not grow with the size of the report.
+
+    Appending rewrites the last part row by row into a temporary file and
+    then replaces it, so memory use stays flat. The sheet name, extra columns
+    and cell styles of the existing rows are kept; rows without any value
+    are dropped, and column widths other than A-C, merged cells, comments and
+    conditional formatting are not carried over. A workbook with more than
+    one sheet is instead loaded whole and appended to in place (slower, but
+    its other sheets are kept).
+    
+    Orders already in the report, and repeats within order_data, are
+    skipped instead of getting a second row; the report's ReportIndex is
+    updated with the rows written.
+
+    Args:
+        order_data: List of dictionaries with 'order_number' and 'gdrive_link'
+        output_file: Name of the output Excel file (the first part)
+        index: ReportIndex of output_file (opened and closed here if None)
+        max_rows: Orders per file before the next part is started
+
+    Returns:
+        str: Path to the Excel file the last rows were written to
+    """
+    if index is None:
+        index = ReportIndex(output_file)
+        try:
+            return create_excel_report(order_data, output_file, index, max_rows)
+        finally:
+            index.close()
+
+    known = index.known(data['order_number'] for data in order_data)
+    new_data = []
+    for data in order_data:
+        if data['order_number'] not in known:
+            known[data['order_number']] = data['gdrive_link']
+            new_data.append(data)
+    skipped = len(order_data) - len(new_data)
+    if skipped:
+        print(f"⚠ {skipped} pesanan sudah ada di laporan, dilewati")
+    if not new_data and os.path.exists(output_file):
+        print(f"✓ Tidak ada data baru untuk {output_file}")
+        return output_file
+
+    max_rows = max(1, int(max_rows))
+    counts = index.part_rows()
+    number = max(len(report_parts(output_file)), 1)
+    written = output_file
+    while new_data or not os.path.exists(output_file):
+        filled = counts[number - 1] if number <= len(counts) else 0
+        if filled >= max_rows:
+            number += 1
+            continue
+        chunk, new_data = new_data[:max_rows - filled], new_data[max_rows - filled:]
+        # Add new data with sequential numbering within the part
+        rows = [(filled + no, data['order_number'], data['gdrive_link']) for no, data in enumerate(chunk, 1)]
+        written = part_path(output_file, number)
+        _write_part(written, rows)
+        index.record(rows, number)
+        counts = index.part_rows()
+        print(f"✓ Menambahkan {len(rows)} data baru")
+        print(f"✓ Excel report created/updated: {written}")
+    return written
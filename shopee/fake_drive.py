@@ -0,0 +1,389 @@
+"""
+In-memory stand-in for the Google Drive v3 service used by the tests.
+Mimics the service.files().create(...).execute() call chain with optional latency.
+Resumable uploads are received chunk by chunk through next_chunk(), and errors
+can be injected per call or produced by a requests-per-second quota.
+StubGoogleServer serves the OAuth token endpoint, the discovery document, the
+Drive upload endpoints (multipart and resumable) and permissions.create/list
+over local HTTP for tests and benchmarks of client startup, uploads and whole
+runs.
+"""
+import collections
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import httplib2
+from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaUploadProgress
+
+
+def make_http_error(status, reason="error", retry_after=None):
+    """Build a googleapiclient HttpError with the given HTTP status (and Retry-After header)"""
+    headers = {'status': status, 'reason': reason}
+    if retry_after is not None:
+        headers['retry-after'] = str(retry_after)
+    resp = httplib2.Response(headers)
+    return HttpError(resp, f'{{"error": {{"code": {status}, "message": "{reason}"}}}}'.encode())
+
+
+class _Request:
+    def __init__(self, fn):
+        self._fn = fn
+
+    def execute(self, num_retries=0):
+        return self._fn()
+
+
+class _UploadRequest:
+    """files().create with resumable media: every next_chunk() sends one chunk"""
+
+    def __init__(self, drive, create, media_body):
+        self._drive = drive
+        self._create = create
+        self._media = media_body
+        self.session_started = False
+        self.progress = 0
+
+    def next_chunk(self, num_retries=0):
+        drive = self._drive
+        size = self._media.size()
+        if not self.session_started:
+            time.sleep(drive.latency)
+            drive._check('files.create')
+            self.session_started = True
+        chunk_size = self._media.chunksize()
+        end = size if chunk_size <= 0 else min(size, self.progress + chunk_size)
+        time.sleep(drive.latency)
+        drive._check('upload_chunk')
+        with drive.lock:
+            drive.bytes_received += end - self.progress
+            drive.chunks += 1
+        self.progress = end
+        if end < size:
+            return MediaUploadProgress(end, size), None
+        return None, self._create()
+
+    def execute(self, num_retries=0):
+        response = None
+        while response is None:
+            _, response = self.next_chunk()
+        return response
+
+
+class _Files:
+    def __init__(self, drive):
+        self._drive = drive
+
+    def create(self, body=None, media_body=None, fields=None):
+        def store():
+            with self._drive.lock:
+                file_id = f"file{next(self._drive._ids)}"
+                self._drive.stored_files[file_id] = {
+                    'name': body['name'],
+                    'parents': body.get('parents', []),
+                    'appProperties': body.get('appProperties', {}),
+                    'size': media_body.size() if media_body is not None else 0,
+                    'resumable': media_body is not None and media_body.resumable(),
+                }
+                self._drive.calls.append(('files.create', file_id))
+            return {
+                'id': file_id,
+                'webViewLink': f"https://drive.google.com/file/d/{file_id}/view",
+            }
+
+        if media_body is not None and media_body.resumable():
+            return _UploadRequest(self._drive, store, media_body)
+
+        def run():
+            time.sleep(self._drive.latency)
+            self._drive._check('files.create')
+            if media_body is not None:
+                with self._drive.lock:
+                    self._drive.bytes_received += media_body.size()
+            return store()
+        return _Request(run)
+
+    def list(self, q='', fields=None, pageSize=100):
+        # Only understands the appProperties clause of the query
+        def run():
+            time.sleep(self._drive.latency)
+            self._drive._check('files.list')
+            with self._drive.lock:
+                self._drive.calls.append(('files.list', q))
+                files = [
+                    {'id': file_id, 'webViewLink': f"https://drive.google.com/file/d/{file_id}/view"}
+                    for file_id, stored in self._drive.stored_files.items()
+                    if any(f"key='{k}' and value='{v}'" in q for k, v in stored['appProperties'].items())
+                ]
+            return {'files': files[:pageSize]}
+        return _Request(run)
+
+
+class _Permissions:
+    def __init__(self, drive):
+        self._drive = drive
+
+    def create(self, fileId=None, body=None, fields=None):
+        def run():
+            time.sleep(self._drive.latency)
+            self._drive._check('permissions.create')
+            if fileId in self._drive.fail_permissions:
+                raise make_http_error(403, "insufficientFilePermissions")
+            with self._drive.lock:
+                self._drive.granted.setdefault(fileId, []).append(body)
+                self._drive.calls.append(('permissions.create', fileId))
+            return {'id': 'anyoneWithLink', **body}
+        return _Request(run)
+
+    def list(self, fileId=None, fields=None):
+        def run():
+            time.sleep(self._drive.latency)
+            with self._drive.lock:
+                self._drive.calls.append(('permissions.list', fileId))
+                return {'permissions': list(self._drive.granted.get(fileId, []))}
+        return _Request(run)
+
+
+class _BatchRequest:
+    def __init__(self, drive, callback):
+        self._drive = drive
+        self._callback = callback
+        self._requests = []
+
+    def add(self, request, callback=None, request_id=None):
+        if len(self._requests) >= 100:
+            raise ValueError("batch requests are limited to 100 calls")
+        self._requests.append((request_id, request))
+
+    def execute(self):
+        # One HTTP round trip for the whole batch
+        time.sleep(self._drive.latency)
+        self._drive._check('batch')
+        with self._drive.lock:
+            self._drive.calls.append(('batch', len(self._requests)))
+        latency, self._drive.latency = self._drive.latency, 0
+        try:
+            for request_id, request in self._requests:
+                try:
+                    response, exception = request.execute(), None
+                except HttpError as error:
+                    response, exception = None, error
+                self._callback(request_id, response, exception)
+        finally:
+            self._drive.latency = latency
+
+
+class FakeDriveService:
+    def __init__(self, latency=0.0, quota_per_second=None):
+        """
+        Initialize the fake Drive service
+
+        Args:
+            latency: Seconds every API call sleeps before returning
+            quota_per_second: Calls allowed per second; calls over the quota
+                fail with 429 rateLimitExceeded and Retry-After: 1
+        """
+        self.latency = latency
+        self.quota_per_second = quota_per_second
+        self.lock = threading.Lock()
+        self.stored_files = {}
+        self.granted = {}
+        self.calls = []
+        self.failures = []
+        self.fail_permissions = set()
+        self.faults = {}
+        self.bytes_received = 0
+        self.chunks = 0
+        self._recent = collections.deque()
+        self._ids = itertools.count(1)
+
+    def inject(self, name, *errors):
+        """
+        Make the next calls of an API method fail
+
+        Args:
+            name: 'files.create' (upload session start), 'upload_chunk',
+                'permissions.create', 'files.list' or 'batch'
+            errors: Exceptions raised by the next calls, in order
+        """
+        with self.lock:
+            self.faults.setdefault(name, []).extend(errors)
+
+    def _check(self, name):
+        with self.lock:
+            pending = self.faults.get(name)
+            error = pending.pop(0) if pending else None
+            if error is None and self.quota_per_second:
+                now = time.monotonic()
+                while self._recent and now - self._recent[0] >= 1:
+                    self._recent.popleft()
+                if len(self._recent) >= self.quota_per_second:
+                    error = make_http_error(429, "rateLimitExceeded", retry_after=1)
+                else:
+                    self._recent.append(now)
+            if error is not None:
+                self.failures.append((name, error))
+        if error is not None:
+            raise error
+
+    def files(self):
+        return _Files(self)
+
+    def permissions(self):
+        return _Permissions(self)
+
+    def new_batch_http_request(self, callback=None):
+        return _BatchRequest(self, callback)
+
+
+class StubGoogleServer:
+    def __init__(self, latency=0.0, expires_in=3600):
+        """
+        Local HTTP server standing in for the Google OAuth token endpoint,
+        the Drive discovery service and the Drive upload endpoints
+
+        Args:
+            latency: Seconds every request sleeps before answering
+            expires_in: Lifetime in seconds of the access tokens handed out
+        """
+        self.latency = latency
+        self.expires_in = expires_in
+        self.requests = []
+        # (uploadType, size in bytes) of every completed upload
+        self.uploads = []
+        # Resumable upload sessions: id -> bytes received so far
+        self.sessions = {}
+        # File ID -> permissions granted with permissions.create
+        self.permissions = {}
+        self.lock = threading.Lock()
+        self._ids = itertools.count(1)
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                stub._record(self.path)
+                if self.path.startswith('/upload/drive/v3/files'):
+                    return self._start_upload(body)
+                file_id = self._permissions_file_id()
+                if file_id:
+                    permission = json.loads(body or b'{}')
+                    with stub.lock:
+                        stub.permissions.setdefault(file_id, []).append(permission)
+                    return self._send(200, {'id': 'anyoneWithLink', **permission})
+                if self.path != '/token':
+                    return self._send(404, {'error': 'not_found'})
+                self._send(200, {
+                    'access_token': f"token-{len(stub.requests)}",
+                    'expires_in': stub.expires_in,
+                    'token_type': 'Bearer',
+                })
+
+            def _start_upload(self, body):
+                upload_type = parse_qs(urlsplit(self.path).query).get('uploadType', [''])[0]
+                if upload_type != 'resumable':
+                    # multipart: metadata and content in this one request
+                    return self._send(200, stub._store(upload_type, len(body)))
+                with stub.lock:
+                    session_id = str(next(stub._ids))
+                    stub.sessions[session_id] = 0
+                self.send_response(200)
+                self.send_header('Location', f"{stub.url}/upload/drive/v3/files?uploadType=resumable"
+                                             f"&upload_id={session_id}")
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def do_PUT(self):
+                # One chunk of a resumable upload: Content-Range: bytes <first>-<last>/<total>
+                data = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                stub._record(self.path)
+                session_id = parse_qs(urlsplit(self.path).query).get('upload_id', [''])[0]
+                total = int(self.headers.get('Content-Range', '*/0').rsplit('/', 1)[1])
+                with stub.lock:
+                    if session_id not in stub.sessions:
+                        return self._send(404, {'error': 'no_such_upload'})
+                    stub.sessions[session_id] += len(data)
+                    received = stub.sessions[session_id]
+                if received < total:
+                    self.send_response(308)
+                    self.send_header('Range', f"bytes=0-{received - 1}")
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                with stub.lock:
+                    del stub.sessions[session_id]
+                self._send(200, stub._store('resumable', total))
+
+            def _permissions_file_id(self):
+                # /drive/v3/files/<file id>/permissions
+                parts = urlsplit(self.path).path.strip('/').split('/')
+                if len(parts) == 5 and parts[:3] == ['drive', 'v3', 'files'] and parts[4] == 'permissions':
+                    return parts[3]
+                return None
+
+            def do_GET(self):
+                stub._record(self.path)
+                file_id = self._permissions_file_id()
+                if file_id:
+                    with stub.lock:
+                        return self._send(200, {'permissions': list(stub.permissions.get(file_id, []))})
+                if urlsplit(self.path).path == '/drive/v3/files':
+                    # files.list: no search support, nothing is found
+                    return self._send(200, {'files': []})
+                if not self.path.startswith('/discovery/'):
+                    return self._send(404, {'error': 'not_found'})
+                from googleapiclient.discovery_cache import get_static_doc
+                self._send(200, get_static_doc('drive', 'v3'))
+
+            def _send(self, status, body):
+                data = (body if isinstance(body, str) else json.dumps(body)).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        self.token_uri = f"{self.url}/token"
+        self.discovery_url = f"{self.url}/discovery/{{api}}/{{apiVersion}}/rest"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def _record(self, path):
+        self.requests.append(path)
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _store(self, upload_type, size):
+        with self.lock:
+            file_id = f"file{next(self._ids)}"
+            self.uploads.append((upload_type, size))
+        return {'id': file_id, 'webViewLink': f"https://drive.google.com/file/d/{file_id}/view"}
+
+    def discovery_document(self):
+        """Drive v3 discovery document whose API calls go to this server"""
+        from googleapiclient.discovery_cache import get_static_doc
+        document = json.loads(get_static_doc('drive', 'v3'))
+        document['rootUrl'] = f"{self.url}/"
+        return document
+
+    def drive_service(self):
+        """Real googleapiclient Drive service sending its requests to this server"""
+        from googleapiclient.discovery import build_from_document
+        from googleapiclient.http import build_http
+        return build_from_document(self.discovery_document(), http=build_http())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
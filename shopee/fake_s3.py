@@ -0,0 +1,94 @@
+"""
+In-memory stand-in for a boto3 S3 client (MinIO/S3) used by the tests.
+Implements the calls S3Storage makes, with optional latency per call.
+"""
+import hashlib
+import itertools
+import threading
+import time
+
+
+class FakeS3Client:
+    def __init__(self, latency=0.0, fail_part=None):
+        """
+        Initialize the fake S3 client
+
+        Args:
+            latency: Seconds every call sleeps before returning
+            fail_part: Part number whose upload_part raises (for abort tests)
+        """
+        self.latency = latency
+        self.fail_part = fail_part
+        self.lock = threading.Lock()
+        self.objects = {}
+        self.metadata = {}
+        self.uploads = {}
+        self.aborted = []
+        self.calls = []
+        self.active_parts = 0
+        self.max_active_parts = 0
+        self._ids = itertools.count(1)
+
+    def _call(self, name, key):
+        with self.lock:
+            self.calls.append((name, key))
+        time.sleep(self.latency)
+
+    def put_object(self, Bucket, Key, Body, Metadata=None):
+        self._call('put_object', Key)
+        with self.lock:
+            self.objects[(Bucket, Key)] = bytes(Body)
+            self.metadata[(Bucket, Key)] = dict(Metadata or {})
+        return {'ETag': f'"{hashlib.md5(Body).hexdigest()}"'}
+
+    def create_multipart_upload(self, Bucket, Key, Metadata=None):
+        self._call('create_multipart_upload', Key)
+        with self.lock:
+            upload_id = f"upload{next(self._ids)}"
+            self.uploads[upload_id] = {'key': (Bucket, Key), 'parts': {}, 'metadata': dict(Metadata or {})}
+        return {'UploadId': upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        with self.lock:
+            self.active_parts += 1
+            self.max_active_parts = max(self.max_active_parts, self.active_parts)
+        try:
+            self._call('upload_part', Key)
+            if PartNumber == self.fail_part:
+                raise ConnectionError(f"connection reset during part {PartNumber}")
+            etag = f'"{hashlib.md5(Body).hexdigest()}"'
+            with self.lock:
+                self.uploads[UploadId]['parts'][PartNumber] = (etag, bytes(Body))
+            return {'ETag': etag}
+        finally:
+            with self.lock:
+                self.active_parts -= 1
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self._call('complete_multipart_upload', Key)
+        with self.lock:
+            upload = self.uploads.pop(UploadId)
+            body = b''
+            for part in MultipartUpload['Parts']:
+                etag, data = upload['parts'][part['PartNumber']]
+                assert etag == part['ETag'], "ETag mismatch"
+                body += data
+            self.objects[upload['key']] = body
+            self.metadata[upload['key']] = upload['metadata']
+        return {'Key': Key}
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self._call('abort_multipart_upload', Key)
+        with self.lock:
+            self.uploads.pop(UploadId, None)
+            self.aborted.append(UploadId)
+
+    def list_objects_v2(self, Bucket, Prefix='', MaxKeys=1000):
+        self._call('list_objects_v2', Prefix)
+        with self.lock:
+            keys = sorted(key for bucket, key in self.objects if bucket == Bucket and key.startswith(Prefix))
+        contents = [{'Key': key, 'Size': len(self.objects[(Bucket, key)])} for key in keys[:MaxKeys]]
+        return {'Contents': contents, 'KeyCount': len(contents)} if contents else {'KeyCount': 0}
+
+    def generate_presigned_url(self, ClientMethod, Params, ExpiresIn=3600):
+        return f"http://s3.local/{Params['Bucket']}/{Params['Key']}?X-Amz-Expires={ExpiresIn}"
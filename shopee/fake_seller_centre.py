@@ -0,0 +1,213 @@
+"""
+Local stand-in for the Shopee Seller Centre, for end-to-end benchmarks.
+Serves a login page that redirects to the portal (a valid session), the
+"Perlu Dikirim" list rendered from paged order list JSON, the order search,
+and order detail pages whose chat panel opens after a delay. Every request
+can be slowed down by a fixed latency.
+"""
+import html
+import json
+import math
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+FIRST_ORDER_ID = 900001
+
+_LIST_PAGE = """<!DOCTYPE html>
+<html lang="id">
+<head><meta charset="utf-8"><title>Pesanan Saya (fake Seller Centre)</title></head>
+<body>
+  <div class="order-list"></div>
+  <div class="pager"><button class="shopee-pager__button-next">Berikutnya</button></div>
+  <script>
+    const query = new URLSearchParams(location.search);
+    const keyword = query.get('keyword') || '';
+    const button = document.querySelector('.shopee-pager__button-next');
+    let page = 1;
+
+    async function load() {
+      const response = await fetch(`/api/v3/order/list?page=${page}&keyword=${encodeURIComponent(keyword)}`);
+      const payload = await response.json();
+      const list = document.querySelector('.order-list');
+      list.innerHTML = '';
+      for (const card of payload.data.card_list) {
+        const row = document.createElement('div');
+        row.className = 'order-row';
+        row.textContent = 'No. Pesanan ' + card.package_card.card_header.order_sn;
+        list.appendChild(row);
+      }
+      button.disabled = page >= payload.data.pagination.pages;
+    }
+
+    button.addEventListener('click', () => { page += 1; load(); });
+    load();
+  </script>
+</body>
+</html>
+"""
+
+_DETAIL_PAGE = """<!DOCTYPE html>
+<html lang="id">
+<head>
+<meta charset="utf-8">
+<title>Detail Pesanan (fake Seller Centre)</title>
+<style>
+  body {{ margin: 0; font-family: sans-serif; background: #f5f5f5; }}
+  .top-bar {{ height: 56px; background: #ee4d2d; }}
+  .order-header {{ position: absolute; top: 80px; left: 260px; width: 600px; height: 90px; background: #fff; }}
+  .chat-button {{ position: absolute; top: 200px; left: 260px; }}
+  .chat-panel {{ display: none; position: absolute; top: 80px; left: 900px; width: 360px; height: 560px;
+                 background: #fff; overflow-y: auto; }}
+  .chat-panel.open {{ display: block; }}
+  .bubble {{ margin: 12px; padding: 8px; border-radius: 8px; background: #ffede6; }}
+  .bubble.buyer {{ background: #e8f4ff; }}
+</style>
+</head>
+<body>
+  <div class="top-bar"></div>
+  <div class="order-header" data-testid="order-header"><h1>No. Pesanan {order_sn}</h1></div>
+  <button class="chat-button">Chat</button>
+  <div class="chat-panel" data-testid="chat-panel">{bubbles}</div>
+  <script>
+    document.querySelector('.chat-button').addEventListener('click', () => {{
+      setTimeout(() => document.querySelector('.chat-panel').classList.add('open'), {chat_delay_ms});
+    }});
+  </script>
+</body>
+</html>
+"""
+
+_SIMPLE_PAGE = """<!DOCTYPE html>
+<html lang="id"><head><meta charset="utf-8"><title>{title}</title></head>
+<body>{body}</body></html>
+"""
+
+
+class FakeSellerCentre:
+    def __init__(self, orders=20, page_size=10, latency=0.0, chat_delay=0.1, chat_messages=6):
+        """
+        Local HTTP server mimicking the Seller Centre pages the automation uses
+
+        Args:
+            orders: Number of orders in the "Perlu Dikirim" list
+            page_size: Orders per list page (one JSON request each)
+            latency: Seconds every request sleeps before answering
+            chat_delay: Seconds between clicking "Chat" and the panel opening
+            chat_messages: Chat bubbles shown per order
+        """
+        self.orders = [
+            {'order_sn': f"251018A{i:07d}", 'order_id': FIRST_ORDER_ID + i, 'create_time': 1760745600 + i * 60}
+            for i in range(orders)
+        ]
+        self.page_size = max(1, page_size)
+        self.latency = latency
+        self.chat_delay = chat_delay
+        self.chat_messages = chat_messages
+        self.requests = []
+        self._lock = threading.Lock()
+        self._by_id = {order['order_id']: order for order in self.orders}
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub._record(self.path)
+                url = urlsplit(self.path)
+                query = {key: values[0] for key, values in parse_qs(url.query).items()}
+                path = url.path.rstrip('/')
+                if path == '/login':
+                    # A valid session: the login page sends the seller on to the portal
+                    return self._html(_SIMPLE_PAGE.format(
+                        title="Login", body="<p>Memeriksa sesi...</p>"
+                        "<script>setTimeout(() => { location.href = '/portal/'; }, 50);</script>"))
+                if path == '/portal':
+                    return self._html(_SIMPLE_PAGE.format(title="Seller Centre", body="<h1>Beranda</h1>"))
+                if path == '/portal/sale/order':
+                    return self._html(_LIST_PAGE)
+                if path.startswith('/portal/sale/order/'):
+                    return self._detail(path.rsplit('/', 1)[1])
+                if path == '/api/v3/order/list':
+                    return self._json(stub._order_page(int(query.get('page', 1)), query.get('keyword', '')))
+                if path == '/api/selleraccount/shop_info':
+                    return self._json({'code': 0, 'data': {'shop_id': 1, 'name': "Toko Benchmark"}})
+                self._send(404, 'text/plain', b'not found')
+
+            def _detail(self, order_id):
+                order = stub._by_id.get(int(order_id)) if order_id.isdigit() else None
+                if order is None:
+                    return self._html(_SIMPLE_PAGE.format(title="Detail Pesanan", body="Pesanan tidak ditemukan"))
+                bubbles = ''.join(
+                    f'<div class="bubble{" buyer" if i % 2 else ""}">Pesan {i + 1} untuk pesanan '
+                    f'{html.escape(order["order_sn"])}</div>'
+                    for i in range(stub.chat_messages)
+                )
+                self._html(_DETAIL_PAGE.format(
+                    order_sn=html.escape(order['order_sn']),
+                    bubbles=bubbles,
+                    chat_delay_ms=int(stub.chat_delay * 1000),
+                ))
+
+            def _html(self, text):
+                self._send(200, 'text/html; charset=utf-8', text.encode())
+
+            def _json(self, payload):
+                self._send(200, 'application/json', json.dumps(payload).encode())
+
+            def _send(self, status, content_type, data):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        self.login_url = f"{self.url}/login"
+        self.orders_url = f"{self.url}/portal/sale/order?type=toship"
+        self.order_detail_url = f"{self.url}/portal/sale/order/{{order_id}}"
+        self.order_search_url = f"{self.url}/portal/sale/order?type=all&keyword={{order_sn}}"
+        self.probe_url = f"{self.url}/api/selleraccount/shop_info/"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def _record(self, path):
+        with self._lock:
+            self.requests.append(path)
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _order_page(self, page, keyword=''):
+        """Order list API response in the Seller Centre's card_list format"""
+        orders = [o for o in self.orders if keyword in o['order_sn']] if keyword else self.orders
+        start = (page - 1) * self.page_size
+        return {
+            'code': 0,
+            'data': {
+                'card_list': [
+                    {
+                        'package_card': {
+                            'card_header': {'order_sn': order['order_sn']},
+                            'order_ext_info': {'order_id': order['order_id'], 'create_time': order['create_time']},
+                        },
+                        'status_info': {'status': "To ship"},
+                    }
+                    for order in orders[start:start + self.page_size]
+                ],
+                'pagination': {
+                    'page_number': page,
+                    'total': len(orders),
+                    'pages': max(1, math.ceil(len(orders) / self.page_size)),
+                },
+            },
+        }
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,160 @@
+"""
+Post-capture screenshot processing: crop, downscale and re-encode before upload.
+Runs in a process pool so image encoding never stalls browser capture.
+"""
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# Pillow format name and file extension for every supported output format
+FORMATS = {
+    'webp': ('WEBP', '.webp'),
+    'jpeg': ('JPEG', '.jpg'),
+    'jpg': ('JPEG', '.jpg'),
+    'png': ('PNG', '.png'),
+}
+
+
+def compress_screenshot(file_path, fmt='webp', quality=80, max_width=None, crop_box=None):
+    """
+    Crop, downscale and re-encode a screenshot.
+
+    Args:
+        file_path: Path to the captured screenshot
+        fmt: Output format: 'webp', 'jpeg' or 'png' (optimized)
+        quality: Encoder quality 1-100 (webp/jpeg)
+        max_width: Downscale to at most this width in pixels, keeping aspect
+        crop_box: Optional (left, top, right, bottom) in image pixels
+
+    Returns:
+        str: Path to the processed file (next to the original)
+    """
+    from PIL import Image
+
+    pil_format, extension = FORMATS[fmt]
+    output_path = os.path.splitext(file_path)[0] + extension
+    if output_path == file_path:
+        output_path = os.path.splitext(file_path)[0] + '_compressed' + extension
+
+    with Image.open(file_path) as image:
+        image.load()
+        if crop_box:
+            left, top, right, bottom = (int(round(v)) for v in crop_box)
+            left, top = max(0, left), max(0, top)
+            right, bottom = min(image.width, right), min(image.height, bottom)
+            if right > left and bottom > top:
+                image = image.crop((left, top, right, bottom))
+        if max_width and image.width > max_width:
+            height = round(image.height * max_width / image.width)
+            image = image.resize((max_width, height), Image.LANCZOS)
+
+        if pil_format == 'JPEG':
+            image = image.convert('RGB')
+            image.save(output_path, 'JPEG', quality=quality, optimize=True, progressive=True)
+        elif pil_format == 'WEBP':
+            image.save(output_path, 'WEBP', quality=quality, method=4)
+        else:
+            image.save(output_path, 'PNG', optimize=True)
+
+    return output_path
+
+
+def stitch_images(images, output_path, gap=8, background=(255, 255, 255)):
+    """
+    Stack images vertically into one PNG.
+
+    Args:
+        images: PNG images as bytes (e.g. from locator.screenshot())
+        output_path: Where to save the stitched image
+        gap: Pixels of background between images
+        background: RGB background color
+
+    Returns:
+        str: output_path
+    """
+    from PIL import Image
+
+    parts = [Image.open(io.BytesIO(data)).convert('RGB') for data in images]
+    width = max(part.width for part in parts)
+    height = sum(part.height for part in parts) + gap * (len(parts) - 1)
+    canvas = Image.new('RGB', (width, height), background)
+    top = 0
+    for part in parts:
+        canvas.paste(part, (0, top))
+        top += part.height + gap
+    canvas.save(output_path, 'PNG')
+    return output_path
+
+
+class ScreenshotCompressor:
+    def __init__(self, fmt='webp', quality=80, max_width=None, processes=2):
+        """
+        Initialize the compressor
+
+        Args:
+            fmt: Output format: 'webp', 'jpeg', 'png' or 'original' (disabled)
+            quality: Encoder quality 1-100 (webp/jpeg)
+            max_width: Downscale to at most this width in pixels
+            processes: Number of worker processes
+        """
+        self.fmt = (fmt or 'original').lower()
+        self.quality = quality
+        self.max_width = max_width
+        self.processes = max(1, int(processes))
+        self._executor = None
+        self._lock = threading.Lock()
+
+        if self.fmt != 'original':
+            if self.fmt not in FORMATS:
+                print(f"⚠ Unknown screenshot FORMAT '{fmt}', uploading original files")
+                self.fmt = 'original'
+            else:
+                try:
+                    import PIL  # noqa: F401
+                except ImportError:
+                    print("⚠ Pillow is not installed (pip install pillow), uploading original files")
+                    self.fmt = 'original'
+
+    @property
+    def enabled(self):
+        return self.fmt != 'original'
+
+    def process(self, file_path, crop_box=None):
+        """
+        Compress a screenshot in the process pool and wait for the result.
+        Meant to be called from upload worker threads.
+
+        Args:
+            file_path: Path to the captured screenshot
+            crop_box: Optional (left, top, right, bottom) in image pixels
+
+        Returns:
+            str: Path to upload (the original file if compression is disabled or fails)
+        """
+        if not self.enabled:
+            return file_path
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a process that already runs upload threads is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    mp_context=multiprocessing.get_context('spawn'),
+                )
+            executor = self._executor
+        try:
+            future = executor.submit(
+                compress_screenshot, file_path, self.fmt, self.quality, self.max_width, crop_box
+            )
+            return future.result()
+        except Exception as e:
+            print(f"⚠ Could not compress {os.path.basename(file_path)}: {e}")
+            return file_path
+
+    def close(self):
+        """Shut down the worker processes"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
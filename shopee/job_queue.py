@@ -0,0 +1,175 @@
+"""
+SQLite job queue for the resident worker (daemon.py).
+Orders can be submitted from any process; the worker claims them in batches.
+"""
+import sqlite3
+import threading
+import time
+
+STATUSES = ('queued', 'running', 'done', 'failed')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    order_number TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    submitted_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    link TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, id);
+"""
+
+
+class JobQueue:
+    def __init__(self, path='jobs.sqlite3'):
+        """
+        Open (or create) the queue database
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.executescript(_SCHEMA)
+        # Queues created before failed batches were counted
+        columns = [row[1] for row in self._db.execute('PRAGMA table_info(jobs)')]
+        if 'attempts' not in columns:
+            self._db.execute('ALTER TABLE jobs ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0')
+
+    def submit(self, order_numbers):
+        """
+        Queue orders for processing. Orders already queued or running are skipped.
+
+        Args:
+            order_numbers: Order numbers (OrderSN)
+
+        Returns:
+            int: Number of orders added
+        """
+        added = 0
+        now = time.time()
+        with self._lock:
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                for order_number in dict.fromkeys(o.strip() for o in order_numbers if o.strip()):
+                    pending = self._db.execute(
+                        "SELECT 1 FROM jobs WHERE order_number = ? AND status IN ('queued', 'running')",
+                        (order_number,)
+                    ).fetchone()
+                    if pending:
+                        continue
+                    self._db.execute(
+                        "INSERT INTO jobs (order_number, submitted_at) VALUES (?, ?)",
+                        (order_number, now)
+                    )
+                    added += 1
+                self._db.execute('COMMIT')
+            except BaseException:
+                self._db.execute('ROLLBACK')
+                raise
+        return added
+
+    def claim(self, limit):
+        """
+        Take the oldest queued orders and mark them running
+
+        Args:
+            limit: Maximum number of orders
+
+        Returns:
+            list: (job_id, order_number) tuples, oldest first
+        """
+        with self._lock:
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                jobs = self._db.execute(
+                    "SELECT id, order_number FROM jobs WHERE status = 'queued' ORDER BY id LIMIT ?",
+                    (limit,)
+                ).fetchall()
+                self._db.executemany(
+                    "UPDATE jobs SET status = 'running', started_at = ? WHERE id = ?",
+                    [(time.time(), job_id) for job_id, _ in jobs]
+                )
+                self._db.execute('COMMIT')
+            except BaseException:
+                self._db.execute('ROLLBACK')
+                raise
+        return jobs
+
+    def finish(self, job_id, link=None, error=None):
+        """Mark a job done (with its Drive link) or failed (with an error message)"""
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, link = ?, error = ? WHERE id = ?",
+                ('done' if link else 'failed', time.time(), link, None if link else error, job_id)
+            )
+
+    def release(self, job_ids):
+        """Put running jobs back in the queue (not processed, e.g. on shutdown)"""
+        with self._lock:
+            self._db.executemany(
+                "UPDATE jobs SET status = 'queued', started_at = NULL WHERE id = ? AND status = 'running'",
+                [(job_id,) for job_id in job_ids]
+            )
+
+    def retry(self, job_ids, error, max_attempts):
+        """
+        Count a failed attempt of running jobs and put them back in the queue,
+        or mark them failed once they reach max_attempts
+
+        Args:
+            job_ids: Jobs of the batch that failed
+            error: Error message stored with jobs that give up
+            max_attempts: Failed attempts after which a job is not retried
+
+        Returns:
+            int: Number of jobs marked failed
+        """
+        with self._lock:
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                self._db.executemany(
+                    "UPDATE jobs SET attempts = attempts + 1 WHERE id = ? AND status = 'running'",
+                    [(job_id,) for job_id in job_ids]
+                )
+                failed = 0
+                for job_id in job_ids:
+                    failed += self._db.execute(
+                        "UPDATE jobs SET status = 'failed', finished_at = ?, error = ? "
+                        "WHERE id = ? AND status = 'running' AND attempts >= ?",
+                        (time.time(), error, job_id, max_attempts)
+                    ).rowcount
+                self._db.executemany(
+                    "UPDATE jobs SET status = 'queued', started_at = NULL WHERE id = ? AND status = 'running'",
+                    [(job_id,) for job_id in job_ids]
+                )
+                self._db.execute('COMMIT')
+            except BaseException:
+                self._db.execute('ROLLBACK')
+                raise
+        return failed
+
+    def requeue_running(self):
+        """Put jobs left running by a crashed worker back in the queue, returns how many"""
+        with self._lock:
+            return self._db.execute(
+                "UPDATE jobs SET status = 'queued', started_at = NULL WHERE status = 'running'"
+            ).rowcount
+
+    def depth(self):
+        """Number of jobs per status (every status in STATUSES is present)"""
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts = dict.fromkeys(STATUSES, 0)
+        counts.update(rows)
+        return counts
+
+    def close(self):
+        with self._lock:
+            self._db.close()
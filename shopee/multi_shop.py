@@ -0,0 +1,229 @@
+"""
+Several seller accounts in one run. Every [SHOP <name>] section of config.ini
+is one shop with its own login, browser profile (user_data_dir), Drive folder,
+upload manifest and report; all other settings are shared.
+
+    [SHOP toko_a]
+    USERNAME=...
+    PASSWORD=...
+    FOLDER_ID=...
+
+Shops are processed in parallel worker processes, each owning its own
+Playwright instance and browser, so throughput grows with the CPU cores
+instead of being capped at one browser. Each worker writes its output to
+shop_<name>.log and a combined summary is printed at the end.
+"""
+import concurrent.futures
+import configparser
+import contextlib
+import multiprocessing
+import os
+import time
+
+SHOP_SECTION_PREFIX = 'SHOP '
+
+# Shop section keys and the option of the shared config they replace. Any
+# other option can be set per shop as SECTION.OPTION (e.g. UPLOAD.WORKERS=2)
+SHOP_OPTIONS = {
+    'username': ('SHOPEE', 'USERNAME'),
+    'password': ('SHOPEE', 'PASSWORD'),
+    'folder_id': ('GOOGLE_DRIVE', 'FOLDER_ID'),
+    'user_data_dir': ('BROWSER', 'USER_DATA_DIR'),
+    'cdp_url': ('BROWSER', 'CDP_URL'),
+}
+
+# Shop section keys that are not config overrides (see shop_outputs)
+SHOP_OUTPUT_KEYS = ('report',)
+
+
+def shop_names(config):
+    """Names of the [SHOP <name>] sections, in config.ini order"""
+    return [
+        section[len(SHOP_SECTION_PREFIX):].strip()
+        for section in config.sections()
+        if section.startswith(SHOP_SECTION_PREFIX)
+    ]
+
+
+def _suffixed(path, name):
+    """run_metrics.jsonl -> run_metrics_<name>.jsonl"""
+    root, ext = os.path.splitext(path)
+    return f"{root}_{name}{ext}"
+
+
+def shop_config(config, name):
+    """
+    The config of one shop: the shared sections with the shop's overrides
+
+    Files that must not be shared between accounts get a per-shop default:
+    the browser profile (browser_data_<name>), the upload manifest and the
+    metrics files. CDP_URL is cleared unless the shop sets its own, since a
+    running Chrome is logged in to one account only.
+
+    Args:
+        config: ConfigParser from load_config()
+        name: Shop name (the <name> of [SHOP <name>])
+
+    Returns:
+        configparser.ConfigParser: A copy; config itself is not changed
+    """
+    shop = SHOP_SECTION_PREFIX + name
+    if not config.has_section(shop):
+        raise KeyError(f"No [{shop}] section in config.ini")
+
+    # Raw values, so %% escapes stay escaped in the copy
+    copy = configparser.ConfigParser()
+    copy.read_dict({
+        section: {option: config.get(section, option, raw=True) for option in config.options(section)}
+        for section in config.sections()
+        if not section.startswith(SHOP_SECTION_PREFIX)
+    })
+
+    def set_option(section, option, value):
+        if not copy.has_section(section):
+            copy.add_section(section)
+        copy.set(section, option, value)
+
+    set_option('BROWSER', 'USER_DATA_DIR', f'browser_data_{name}')
+    set_option('BROWSER', 'CDP_URL', '')
+    set_option('UPLOAD', 'MANIFEST', _suffixed(
+        config.get('UPLOAD', 'MANIFEST', fallback='upload_manifest.jsonl'), name))
+    for option, default in (('JSONL', 'run_metrics.jsonl'), ('PROMETHEUS_TEXTFILE', '')):
+        path = config.get('METRICS', option, fallback=default).strip()
+        set_option('METRICS', option, _suffixed(path, name) if path else '')
+
+    for key, value in config.items(shop, raw=True):
+        if key in SHOP_OPTIONS:
+            set_option(*SHOP_OPTIONS[key], value)
+        elif '.' in key:
+            section, option = key.split('.', 1)
+            set_option(section.upper(), option, value)
+        elif key not in SHOP_OUTPUT_KEYS and key not in config.defaults():
+            print(f"⚠ Unknown option '{key}' in [{shop}], ignored")
+    return copy
+
+
+def shop_outputs(config, name):
+    """
+    Report and screenshots folder of one shop, as run_workflow() keywords
+
+    Args:
+        config: ConfigParser from load_config()
+        name: Shop name
+
+    Returns:
+        dict: 'report_file' (REPORT of the shop section, default
+            shopee_report_<name>.xlsx) and 'screenshots_folder'
+    """
+    return {
+        'report_file': config.get(SHOP_SECTION_PREFIX + name, 'REPORT', fallback=f'shopee_report_{name}.xlsx'),
+        'screenshots_folder': os.path.join('screenshots', name),
+    }
+
+
+def run_shop(name, resume=False, command='run-all'):
+    """
+    Worker process entry point: run one command for one shop, headless, with
+    all output going to shop_<name>.log
+
+    Args:
+        name: Shop name
+        resume: Continue the shop's last interrupted run
+        command: Subcommand of shopee_automation.py (see its COMMANDS)
+
+    Returns:
+        dict: The run summary of run_workflow() plus 'shop', 'exit_code',
+            'seconds' and 'log'
+    """
+    # Deferred: shopee_automation imports this module
+    import shopee_automation as app
+
+    config = app.load_config()
+    shop = shop_config(config, name)
+    # A worker has no console: nothing may wait for the operator
+    shop.set('BROWSER', 'HEADLESS', 'true')
+
+    summary = {'shop': name, 'log': f'shop_{name}.log'}
+    start = time.perf_counter()
+    with open(summary['log'], 'w', encoding='utf-8', buffering=1) as log, \
+            contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        code = app.COMMANDS[command](shop, resume, summary=summary, **shop_outputs(config, name))
+    summary['exit_code'] = code or (1 if summary.get('error') else 0)
+    summary['seconds'] = time.perf_counter() - start
+    return summary
+
+
+def print_shop_summary(summaries, seconds):
+    """Print one line per shop and the totals of a multi-shop run"""
+    print("\n" + "="*78)
+    print("MULTI-SHOP SUMMARY")
+    print("="*78)
+    print(f"{'Shop':<18}{'Orders':>8}{'Reported':>10}{'Missing':>9}{'Time (s)':>10}  Report / error")
+    for summary in summaries:
+        result = f"✗ {summary['error']}" if summary.get('error') else (summary.get('report_file') or '-')
+        print(f"{summary['shop']:<18}{summary.get('orders', 0):>8}{summary.get('reported', 0):>10}"
+              f"{summary.get('missing', 0):>9}{summary.get('seconds', 0):>10.1f}  {result}")
+    reported = sum(summary.get('reported', 0) for summary in summaries)
+    print(f"{'Total':<18}{sum(s.get('orders', 0) for s in summaries):>8}{reported:>10}"
+          f"{sum(s.get('missing', 0) for s in summaries):>9}{seconds:>10.1f}")
+    if seconds:
+        print(f"\nThroughput: {reported / seconds * 60:.1f} orders/min")
+
+
+def run_all_shops(config, shops, resume=False, command='run-all', worker=run_shop):
+    """
+    Run every shop in its own worker process and print a combined summary
+
+    [SHOPS] PROCESSES sets the number of workers (0 = one per shop, up to the
+    number of CPU cores). Workers are started with "spawn", so each gets a
+    fresh interpreter and Playwright instance instead of a fork of this one.
+
+    Args:
+        config: ConfigParser from load_config()
+        shops: Shop names (see shop_names)
+        resume: Continue each shop's last interrupted run
+        command: Subcommand of shopee_automation.py run for every shop
+        worker: Function run per shop in the workers, called as
+            worker(name, resume, command) and returning a summary dict
+
+    Returns:
+        int: 0 if every shop finished, 2 if one needed the operator (log in
+            with python shopee_automation.py --shop NAME), else 1
+    """
+    processes = config.getint('SHOPS', 'PROCESSES', fallback=0) or min(len(shops), os.cpu_count() or 1)
+    processes = max(1, min(processes, len(shops)))
+
+    print("\n" + "="*70)
+    print(f"SHOPEE AUTOMATION - {command.upper()}: {len(shops)} SHOPS, {processes} WORKER PROCESSES")
+    print("="*70)
+
+    # Workers cannot show the Google consent prompt, so ask here (once, and
+    # only if token.json is missing or unusable)
+    if command in ('run-all', 'upload') and any(shop_config(config, name).get('STORAGE', 'BACKEND', fallback='drive').strip().lower() == 'drive'
+           for name in shops):
+        import shopee_automation as app
+        app.get_gdrive_credentials()
+
+    start = time.perf_counter()
+    summaries = []
+    with concurrent.futures.ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context('spawn')) as pool:
+        futures = {pool.submit(worker, name, resume, command): name for name in shops}
+        for name in shops:
+            print(f"  → {name} started (log: shop_{name}.log)")
+        for future in concurrent.futures.as_completed(futures):
+            name = futures[future]
+            try:
+                summary = future.result()
+            except Exception as e:
+                summary = {'shop': name, 'error': str(e) or type(e).__name__, 'exit_code': 1}
+            summaries.append(summary)
+            if summary.get('error'):
+                print(f"  ✗ {name} failed: {summary['error']}")
+            else:
+                print(f"  ✓ {name} finished: {summary.get('reported', 0)} orders reported")
+    seconds = time.perf_counter() - start
+
+    summaries.sort(key=lambda summary: shops.index(summary['shop']))
+    print_shop_summary(summaries, seconds)
+    codes = {summary.get('exit_code', 0) for summary in summaries}
+    return 2 if 2 in codes else (1 if codes - {0} else 0)
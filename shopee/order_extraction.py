@@ -0,0 +1,135 @@
+"""
+Order number extraction from the Seller Centre "Perlu Dikirim" list.
+Parses the JSON responses the page already fetches (or a recorded HAR file),
+with a plain-text fallback for when no JSON was captured.
+"""
+import base64
+import json
+import re
+from datetime import datetime
+
+# Keys the order list API uses for the order number
+ORDER_SN_KEYS = ('order_sn', 'ordersn')
+
+# Order list/search XHRs of the Seller Centre
+DEFAULT_API_PATTERN = r'/api/v\d+/order/'
+
+# Shopee order numbers: YYMMDD followed by 8-10 uppercase letters/digits
+ORDER_SN_PATTERN = re.compile(r'\b\d{6}[0-9A-Z]{8,10}\b')
+
+
+def _collect(node, flat, sns):
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if isinstance(value, (dict, list)):
+                _collect(value, flat, sns)
+            else:
+                flat.setdefault(key, value)
+                if key in ORDER_SN_KEYS and value:
+                    sns.add(str(value))
+    elif isinstance(node, list):
+        for item in node:
+            _collect(item, flat, sns)
+
+
+def extract_orders_from_json(payload):
+    """
+    Find orders anywhere in an order list API response.
+
+    Every object whose subtree holds exactly one order number is treated as
+    one order; order_id and create_time are taken from the same object.
+
+    Args:
+        payload: Decoded JSON response
+
+    Returns:
+        list: Dicts with 'order_sn', 'order_id' and 'create_time' (either may be None)
+    """
+    if isinstance(payload, list):
+        orders = []
+        for item in payload:
+            orders.extend(extract_orders_from_json(item))
+        return orders
+    if not isinstance(payload, dict):
+        return []
+
+    flat, sns = {}, set()
+    _collect(payload, flat, sns)
+    if not sns:
+        return []
+    if len(sns) == 1:
+        return [{
+            'order_sn': sns.pop(),
+            'order_id': flat.get('order_id'),
+            'create_time': flat.get('create_time', flat.get('ctime')),
+        }]
+
+    orders = []
+    for value in payload.values():
+        orders.extend(extract_orders_from_json(value))
+    return orders
+
+
+def extract_order_sns_from_text(text):
+    """Find order numbers in rendered page text, in order of appearance"""
+    return list(dict.fromkeys(ORDER_SN_PATTERN.findall(text or '')))
+
+
+def filter_orders(orders, date_from=None, date_to=None):
+    """
+    Remove duplicates and orders created outside a date range.
+
+    Args:
+        orders: Order dicts from extract_orders_from_json
+        date_from: Earliest creation date (datetime.date), inclusive
+        date_to: Latest creation date (datetime.date), inclusive
+
+    Returns:
+        list: Orders in first-seen order. Orders without create_time are kept.
+    """
+    unique = {}
+    for order in orders:
+        unique.setdefault(order['order_sn'], order)
+
+    result = []
+    for order in unique.values():
+        created = order.get('create_time')
+        if created and (date_from or date_to):
+            day = datetime.fromtimestamp(int(created)).date()
+            if (date_from and day < date_from) or (date_to and day > date_to):
+                continue
+        result.append(order)
+    return result
+
+
+def orders_from_har(har_path, api_pattern=DEFAULT_API_PATTERN):
+    """
+    Extract orders from the order list responses recorded in a HAR file
+
+    Args:
+        har_path: Path to a HAR file (e.g. saved from DevTools or record_har_path)
+        api_pattern: Regex matched against request URLs
+
+    Returns:
+        list: Order dicts, in response order (may contain duplicates)
+    """
+    pattern = re.compile(api_pattern)
+    with open(har_path, encoding='utf-8') as f:
+        har = json.load(f)
+
+    orders = []
+    for entry in har['log']['entries']:
+        if not pattern.search(entry['request']['url']):
+            continue
+        content = entry['response'].get('content', {})
+        if 'json' not in content.get('mimeType', '') or not content.get('text'):
+            continue
+        text = content['text']
+        if content.get('encoding') == 'base64':
+            text = base64.b64decode(text).decode('utf-8')
+        try:
+            payload = json.loads(text)
+        except json.JSONDecodeError:
+            continue
+        orders.extend(extract_orders_from_json(payload))
+    return orders
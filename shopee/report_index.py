@@ -0,0 +1,210 @@
+"""
+SQLite sidecar index of the orders in an Excel report, so checking whether an
+order was already reported is one B-tree lookup instead of a workbook scan.
+
+A report is split over numbered part files once it is full
+(shopee_report.xlsx, shopee_report_part2.xlsx, ...; see report_parts). One
+index covers all parts. It sits next to the first one
+(shopee_report.xlsx.index.sqlite3) and is updated by create_excel_report()
+on every write. It remembers the size and modification time of the parts it
+matches: when a part was changed elsewhere (edited in Excel, replaced or
+deleted), the index is rebuilt from the report once, on the next lookup.
+"""
+import json
+import os
+import sqlite3
+import threading
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    order_number TEXT PRIMARY KEY,
+    row_no INTEGER,
+    link TEXT
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Order numbers per SELECT ... IN (...) (older SQLite allows 999 parameters)
+LOOKUP_CHUNK = 500
+
+# Data rows per report file before the next part is started
+DEFAULT_MAX_ROWS = 10000
+
+
+def index_path(report_file):
+    """Sidecar index file of a report"""
+    return report_file + '.index.sqlite3'
+
+
+def part_path(report_file, number):
+    """File of part `number` of a report; part 1 is report_file itself"""
+    if number == 1:
+        return report_file
+    stem, ext = os.path.splitext(report_file)
+    return f"{stem}_part{number}{ext}"
+
+
+def report_parts(report_file):
+    """
+    Existing files of a report, in order
+
+    Returns:
+        list: report_file and its numbered parts, up to the first one missing
+    """
+    parts = []
+    while os.path.exists(part_path(report_file, len(parts) + 1)):
+        parts.append(part_path(report_file, len(parts) + 1))
+    return parts
+
+
+def _report_stamp(report_file):
+    """Size and modification time of every part of the report ('' if there is none)"""
+    stamps = []
+    for path in report_parts(report_file):
+        stat = os.stat(path)
+        stamps.append(f"{stat.st_size}:{stat.st_mtime_ns}")
+    return ';'.join(stamps)
+
+
+class ReportIndex:
+    def __init__(self, report_file, path=None):
+        """
+        Open (or create) the index of a report
+
+        Args:
+            report_file: Excel report the index belongs to
+            path: SQLite database file (index_path(report_file) if None)
+        """
+        self.report_file = report_file
+        self.path = path or index_path(report_file)
+        self.rebuilds = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.executescript(_SCHEMA)
+
+    def _stamp(self):
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'report'").fetchone()
+        return row[0] if row else None
+
+    def _set_stamp(self):
+        self._db.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('report', ?)",
+            (_report_stamp(self.report_file),)
+        )
+
+    def _rows(self):
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'rows'").fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _set_rows(self, counts):
+        self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('rows', ?)", (json.dumps(counts),))
+
+    def sync(self):
+        """
+        Rebuild the index from the report if the report changed since the
+        index was last written
+
+        Returns:
+            bool: True if the index was rebuilt
+        """
+        # Deferred: excel_report imports this module
+        from excel_report import iter_report_rows
+
+        with self._lock:
+            # Indexes written before reports had parts have no row counts
+            if self._stamp() == _report_stamp(self.report_file) and self._rows() is not None:
+                return False
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                self._db.execute("DELETE FROM orders")
+                counts = []
+                for path in report_parts(self.report_file):
+                    rows = list(iter_report_rows(path))
+                    self._db.executemany(
+                        "INSERT OR IGNORE INTO orders (order_number, row_no, link) VALUES (?, ?, ?)",
+                        ((str(order_number).strip(), no, link) for no, order_number, link in rows)
+                    )
+                    counts.append(len(rows))
+                self._set_rows(counts)
+                self._set_stamp()
+                self._db.execute('COMMIT')
+            except BaseException:
+                self._db.execute('ROLLBACK')
+                raise
+            self.rebuilds += 1
+        return True
+
+    def known(self, order_numbers):
+        """
+        Look up orders in the report
+
+        Args:
+            order_numbers: Order numbers (OrderSN)
+
+        Returns:
+            dict: Order number -> evidence link, for the orders already in the report
+        """
+        self.sync()
+        order_numbers = list(dict.fromkeys(order_numbers))
+        found = {}
+        with self._lock:
+            for start in range(0, len(order_numbers), LOOKUP_CHUNK):
+                chunk = order_numbers[start:start + LOOKUP_CHUNK]
+                found.update(self._db.execute(
+                    f"SELECT order_number, link FROM orders WHERE order_number IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ))
+        return found
+
+    def __contains__(self, order_number):
+        return bool(self.known([order_number]))
+
+    def __len__(self):
+        self.sync()
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM orders").fetchone()[0]
+
+    def part_rows(self):
+        """
+        Data rows of every part of the report
+
+        Returns:
+            list: Row count per part, in the order of report_parts()
+        """
+        self.sync()
+        with self._lock:
+            return self._rows()
+
+    def record(self, rows, part=1):
+        """
+        Add the rows just written to the report and mark the index in sync
+        with the report files as they are now
+
+        Args:
+            rows: (no, order_number, link) tuples
+            part: Number of the part the rows were written to
+        """
+        rows = list(rows)
+        with self._lock:
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                self._db.executemany(
+                    "INSERT OR IGNORE INTO orders (order_number, row_no, link) VALUES (?, ?, ?)",
+                    ((str(order_number).strip(), no, link) for no, order_number, link in rows)
+                )
+                counts = self._rows() or []
+                counts += [0] * (part - len(counts))
+                counts[part - 1] += len(rows)
+                self._set_rows(counts)
+                self._set_stamp()
+                self._db.execute('COMMIT')
+            except BaseException:
+                self._db.execute('ROLLBACK')
+                raise
+
+    def close(self):
+        with self._lock:
+            self._db.close()
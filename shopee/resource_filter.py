@@ -0,0 +1,108 @@
+"""
+Request filter for the Seller Centre browser context: aborts images, fonts,
+media and tracker scripts on pages that are only read (order list, search),
+and lets them through again before a page is captured or shown to the operator.
+"""
+import threading
+from collections import Counter
+from urllib.parse import urlparse
+
+# Playwright resource types not needed to read order lists
+DEFAULT_BLOCKED_TYPES = ('image', 'font', 'media')
+
+# Analytics/ad hosts, blocked on every page (subdomains included)
+DEFAULT_TRACKER_DOMAINS = (
+    'google-analytics.com',
+    'googletagmanager.com',
+    'doubleclick.net',
+    'googleadservices.com',
+    'facebook.net',
+    'connect.facebook.com',
+    'analytics.tiktok.com',
+    'hotjar.com',
+    'clarity.ms',
+)
+
+# Typical transfer size per blocked request, used to estimate bytes saved
+# (an aborted request never reports its real size)
+ESTIMATED_BYTES = {
+    'image': 25_000,
+    'font': 40_000,
+    'media': 200_000,
+    'tracker': 30_000,
+}
+
+
+class ResourceFilter:
+    def __init__(self, blocked_types=DEFAULT_BLOCKED_TYPES, tracker_domains=DEFAULT_TRACKER_DOMAINS):
+        """
+        Initialize the filter
+
+        Args:
+            blocked_types: Playwright resource types aborted while blocking is on
+            tracker_domains: Hosts whose requests are always aborted
+        """
+        self.blocked_types = frozenset(t.strip().lower() for t in blocked_types if t.strip())
+        self.tracker_domains = tuple(d.strip().lower().lstrip('.') for d in tracker_domains if d.strip())
+        self.blocking = True
+        self.blocked = Counter()
+        self._lock = threading.Lock()
+
+    def is_tracker(self, url):
+        """True if the URL's host is (a subdomain of) a tracker domain"""
+        host = (urlparse(url).hostname or '').lower()
+        return any(host == d or host.endswith('.' + d) for d in self.tracker_domains)
+
+    def check(self, request, blocking=None):
+        """
+        Decide whether to abort a request, and count it if so
+
+        Args:
+            request: Playwright Request (only resource_type and url are used)
+            blocking: Override self.blocking (per-page state of the async engine)
+
+        Returns:
+            bool: True if the request should be aborted
+        """
+        if blocking is None:
+            blocking = self.blocking
+        if self.is_tracker(request.url):
+            kind = 'tracker'
+        elif blocking and request.resource_type in self.blocked_types:
+            kind = request.resource_type
+        else:
+            return False
+        with self._lock:
+            self.blocked[kind] += 1
+        return True
+
+    def handle(self, route):
+        """Route handler for the sync API (context.route)"""
+        if self.check(route.request):
+            route.abort()
+        else:
+            route.continue_()
+
+    def install(self, context):
+        """Filter every request of a sync browser context"""
+        context.route('**/*', self.handle)
+
+    @property
+    def blocked_count(self):
+        with self._lock:
+            return sum(self.blocked.values())
+
+    @property
+    def estimated_bytes_saved(self):
+        with self._lock:
+            return sum(ESTIMATED_BYTES.get(kind, 0) * n for kind, n in self.blocked.items())
+
+    def print_summary(self):
+        """Print blocked request counts and the estimated bandwidth saved"""
+        with self._lock:
+            blocked = dict(self.blocked)
+        if not blocked:
+            return
+        details = ', '.join(f"{kind} {n}" for kind, n in sorted(blocked.items(), key=lambda item: -item[1]))
+        print(f"\n✓ Blocked {sum(blocked.values())} requests ({details}), "
+              f"~{self.estimated_bytes_saved / 1_000_000:.1f} MB saved (estimated)")
@@ -0,0 +1,223 @@
+"""
+Retries for Google API calls: jittered exponential backoff that honors
+Retry-After, and a token bucket shared by all upload threads that slows down
+(request rate and concurrent calls) when the API answers 429 and speeds up
+again while calls succeed.
+"""
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+# Statuses worth retrying: rate limits, timeouts and server errors
+RETRYABLE_STATUSES = {408, 429, 500, 502, 503, 504}
+# Drive reports per-user rate limits as 403 with one of these reasons
+RATE_LIMIT_REASONS = ('rateLimitExceeded', 'userRateLimitExceeded')
+
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_BASE_DELAY = 1.0
+DEFAULT_MAX_DELAY = 60.0
+# Drive allows roughly 10 requests per second per user
+DEFAULT_REQUESTS_PER_SECOND = 10.0
+
+
+def error_status(error):
+    """HTTP status of a googleapiclient HttpError, None for other errors"""
+    resp = getattr(error, 'resp', None)
+    try:
+        return int(resp.status)
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def is_rate_limited(error):
+    """True for 429 and for Drive's 403 rate limit errors"""
+    status = error_status(error)
+    if status == 429:
+        return True
+    if status == 403:
+        content = getattr(error, 'content', b'') or b''
+        if isinstance(content, bytes):
+            content = content.decode('utf-8', 'replace')
+        return any(reason in content for reason in RATE_LIMIT_REASONS)
+    return False
+
+
+def is_retryable(error):
+    """True if the call may succeed when repeated"""
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    return error_status(error) in RETRYABLE_STATUSES or is_rate_limited(error)
+
+
+def retry_after_seconds(error, now=None):
+    """
+    Seconds the server asked to wait (Retry-After header), None if not given
+
+    Args:
+        error: HttpError
+        now: Current time as epoch seconds (for HTTP-date values)
+    """
+    resp = getattr(error, 'resp', None)
+    value = resp.get('retry-after') if hasattr(resp, 'get') else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when - (time.time() if now is None else now))
+
+
+class AdaptiveRateLimiter:
+    def __init__(self, requests_per_second=DEFAULT_REQUESTS_PER_SECOND, max_concurrency=4,
+                 min_rate=0.5, clock=time.monotonic, sleep=time.sleep):
+        """
+        Token bucket with an adaptive concurrency limit (AIMD)
+
+        Every rate-limited response halves the request rate and the number of
+        calls allowed in flight; every success adds a little back, up to the
+        configured maximums.
+
+        Args:
+            requests_per_second: Maximum (and starting) request rate
+            max_concurrency: Maximum calls in flight
+            min_rate: The request rate never drops below this
+            clock: Monotonic clock (for tests)
+            sleep: Sleep function (for tests)
+        """
+        self.max_rate = float(requests_per_second)
+        self.min_rate = min(float(min_rate), self.max_rate)
+        self.rate = self.max_rate
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.concurrency = self.max_concurrency
+        self.in_flight = 0
+        self.throttle_events = 0
+        self._tokens = 1.0
+        self._updated = clock()
+        self._successes = 0
+        self._clock = clock
+        self._sleep = sleep
+        self._slots = threading.Condition()
+        self._bucket = threading.Lock()
+
+    def acquire(self):
+        """Wait for a free slot and a token"""
+        with self._slots:
+            while self.in_flight >= self.concurrency:
+                self._slots.wait()
+            self.in_flight += 1
+        while True:
+            with self._bucket:
+                now = self._clock()
+                # Burst of at most one second worth of requests
+                self._tokens = min(max(1.0, self.rate), self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                # Tolerance for rounding: a wait of 1e-16 s would not advance the clock
+                if self._tokens >= 1 - 1e-9:
+                    self._tokens = max(0.0, self._tokens - 1)
+                    return
+                wait = (1 - self._tokens) / self.rate
+            self._sleep(wait)
+
+    def release(self, throttled=False):
+        """
+        Free the slot taken by acquire()
+
+        Args:
+            throttled: The call was answered with a rate limit error
+        """
+        with self._slots:
+            self.in_flight -= 1
+            if throttled:
+                self.throttle_events += 1
+                self._successes = 0
+                self.concurrency = max(1, self.concurrency // 2)
+                with self._bucket:
+                    self.rate = max(self.min_rate, self.rate / 2)
+                    self._tokens = min(self._tokens, 0.0)
+            else:
+                self._successes += 1
+                with self._bucket:
+                    self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+                # One more call in flight after a full round of successes
+                if self._successes >= self.concurrency and self.concurrency < self.max_concurrency:
+                    self.concurrency += 1
+                    self._successes = 0
+            self._slots.notify_all()
+
+
+class Retrier:
+    def __init__(self, max_attempts=DEFAULT_MAX_ATTEMPTS, base_delay=DEFAULT_BASE_DELAY,
+                 max_delay=DEFAULT_MAX_DELAY, limiter=None, sleep=time.sleep, rng=random.random):
+        """
+        Run API calls with retries
+
+        Args:
+            max_attempts: Attempts per call, including the first one
+            base_delay: Backoff before the first retry (doubles per retry)
+            max_delay: Upper bound of the backoff
+            limiter: Optional AdaptiveRateLimiter shared by all callers
+            sleep: Sleep function (for tests)
+            rng: Random number in [0, 1) for the jitter (for tests)
+        """
+        self.max_attempts = max(1, int(max_attempts))
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.limiter = limiter
+        self.retries = 0
+        self._sleep = sleep
+        self._rng = rng
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @property
+    def thread_retries(self):
+        """Retries made by the calling thread so far (for per-order counts)"""
+        return getattr(self._local, 'retries', 0)
+
+    def delay(self, attempt, error=None):
+        """
+        Seconds to wait before retry number attempt + 1
+
+        Full jitter: a random share of the exponential backoff, so threads
+        that failed together do not retry together. A Retry-After from the
+        server is a lower bound.
+        """
+        backoff = self._rng() * min(self.max_delay, self.base_delay * 2 ** attempt)
+        retry_after = retry_after_seconds(error) if error is not None else None
+        return max(backoff, retry_after or 0.0)
+
+    def wait(self, attempt, error=None):
+        """Sleep before the next attempt and count the retry"""
+        with self._lock:
+            self.retries += 1
+        self._local.retries = self.thread_retries + 1
+        self._sleep(self.delay(attempt, error))
+
+    def call(self, fn, *args, **kwargs):
+        """
+        Call fn until it succeeds, fails with a non-retryable error, or
+        max_attempts is reached (the last error is raised)
+        """
+        attempt = 0
+        while True:
+            if self.limiter:
+                self.limiter.acquire()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as error:
+                if self.limiter:
+                    self.limiter.release(throttled=is_rate_limited(error))
+                attempt += 1
+                if attempt >= self.max_attempts or not is_retryable(error):
+                    raise
+                self.wait(attempt - 1, error)
+                continue
+            if self.limiter:
+                self.limiter.release()
+            return result
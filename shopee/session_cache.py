@@ -0,0 +1,94 @@
+"""
+Session health cache: lets a warm start skip the Seller Centre login page.
+Stores when the stored browser session was last confirmed valid, together
+with the expiry of its session cookies.
+"""
+import json
+import os
+import time
+
+# Cookies set by the Seller Centre login
+DEFAULT_SESSION_COOKIES = ('SPC_SC_TK', 'SPC_EC')
+
+# Cheap authenticated endpoint: answers {"code": 0, ...} with a valid session
+DEFAULT_PROBE_URL = 'https://seller.shopee.co.id/api/selleraccount/shop_info/'
+
+# File name inside browser_data
+SESSION_CACHE_FILE = 'session_state.json'
+
+
+def session_cookie_expiry(cookies, names=DEFAULT_SESSION_COOKIES):
+    """
+    Earliest expiry of the session cookies
+
+    Args:
+        cookies: Cookie dicts, e.g. context.cookies() or storage_state()['cookies']
+        names: Cookie names that make up the session
+
+    Returns:
+        float: Expiry in epoch seconds (inf for browser-session cookies),
+            or None if a session cookie is missing
+    """
+    expires = {}
+    for cookie in cookies:
+        if cookie['name'] in names:
+            value = cookie.get('expires', -1)
+            expires[cookie['name']] = float('inf') if value is None or value < 0 else value
+    if set(names) - set(expires):
+        return None
+    return min(expires.values())
+
+
+class SessionCache:
+    def __init__(self, path, max_age=300):
+        """
+        Initialize the cache
+
+        Args:
+            path: JSON file holding the last successful check
+            max_age: Seconds a check stays valid without probing again
+        """
+        self.path = path
+        self.max_age = max_age
+
+    def load(self):
+        """Last recorded check, or an empty dict"""
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def record(self, cookie_expires):
+        """Remember that the session was confirmed valid just now"""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        state = {
+            'checked_at': time.time(),
+            'cookie_expires': None if cookie_expires == float('inf') else cookie_expires,
+        }
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+
+    def is_fresh(self, cookie_expires, now=None):
+        """
+        True if the session was confirmed recently with the same cookies
+
+        Args:
+            cookie_expires: Current expiry from session_cookie_expiry
+            now: Current epoch seconds (time.time() if None)
+        """
+        now = time.time() if now is None else now
+        if cookie_expires is None or cookie_expires <= now:
+            return False
+        state = self.load()
+        if not state.get('checked_at') or now - state['checked_at'] > self.max_age:
+            return False
+        recorded = state.get('cookie_expires')
+        return (recorded is None and cookie_expires == float('inf')) or recorded == cookie_expires
+
+    def clear(self):
+        """Forget the last check (the session turned out to be invalid)"""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,317 @@
+"""
+Async Shopee Seller Centre engine: captures several orders at once in
+separate tabs of the same logged-in persistent browser context.
+"""
+import asyncio
+import os
+import re
+import time
+from datetime import datetime
+from urllib.parse import urlparse
+
+from playwright.async_api import async_playwright, Error as PlaywrightError
+
+from order_extraction import DEFAULT_API_PATTERN, extract_orders_from_json
+from shopee_module import (
+    DEFAULT_CHAT_BUTTON_SELECTOR,
+    DEFAULT_TIMEOUTS,
+    DEFAULT_VIEWPORT,
+    ORDER_DETAIL_URL,
+    ORDER_SEARCH_URL,
+    default_user_data_dir,
+    persistent_context_options,
+)
+from timing import StepTimer
+
+
+class HostRateLimiter:
+    def __init__(self, requests_per_second):
+        """
+        Spaces out navigations to the same host
+
+        Args:
+            requests_per_second: Maximum page loads per second per host
+                (0 or None = unlimited)
+        """
+        self.interval = 1.0 / requests_per_second if requests_per_second else 0
+        self._next_slot = {}
+        self._lock = asyncio.Lock()
+
+    async def wait(self, url):
+        """Sleep until a request to this URL's host is allowed"""
+        if not self.interval:
+            return
+        host = urlparse(url).netloc
+        async with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class AsyncShopeeAutomation:
+    def __init__(self, concurrency=3, requests_per_second=2.0, capture_mode="visible",
+                 chat_panel_selector=None, order_header_selector=None,
+                 chat_button_selector=DEFAULT_CHAT_BUTTON_SELECTOR,
+                 order_api_pattern=DEFAULT_API_PATTERN, order_ids=None,
+                 order_detail_url=ORDER_DETAIL_URL, order_search_url=ORDER_SEARCH_URL,
+                 timeouts=None, timer=None, resource_filter=None,
+                 headless=False, viewport=None, device_scale_factor=1, cdp_url=None, user_data_dir=None):
+        """
+        Initialize the async engine
+
+        Login is not handled here: the session must already be stored in the
+        persistent browser data (run ShopeeAutomation.login() first).
+
+        Args:
+            concurrency: Number of orders (tabs) processed at the same time
+            requests_per_second: Page loads per second allowed per host
+            capture_mode: "visible", "full" or "elements" (no prompts here)
+            chat_panel_selector: CSS selector of the chat panel
+            order_header_selector: CSS selector of the order number header
+            chat_button_selector: CSS selector of the "Chat" button
+            order_api_pattern: Regex of the order list/search XHR URLs
+            order_ids: Dict OrderSN -> order ID, e.g. ShopeeAutomation.order_ids
+            order_detail_url: URL template with {order_id} / {order_sn}
+            order_search_url: URL template with {order_sn}
+            timeouts: Dict overriding DEFAULT_TIMEOUTS (milliseconds)
+            timer: StepTimer collecting per-step durations (a new one if None)
+            resource_filter: Optional ResourceFilter. Each tab blocks
+                images/fonts until its order detail page is opened
+            headless: Run without a browser window
+            viewport: Dict with 'width' and 'height' (DEFAULT_VIEWPORT if None)
+            device_scale_factor: Screenshot pixels per CSS pixel
+            cdp_url: Remote debugging endpoint of an already running Chrome
+                to open the tabs in, instead of launching a browser
+            user_data_dir: Folder holding the logged-in session
+                (default_user_data_dir() if None)
+        """
+        self.concurrency = max(1, int(concurrency))
+        self.rate_limiter = HostRateLimiter(requests_per_second)
+        self.capture_mode = capture_mode if capture_mode in ("visible", "full", "elements") else "visible"
+        self.chat_panel_selector = chat_panel_selector
+        self.order_header_selector = order_header_selector
+        self.chat_button_selector = chat_button_selector
+        self.order_api_pattern = re.compile(order_api_pattern)
+        self.order_ids = dict(order_ids or {})
+        self.timeouts = {**DEFAULT_TIMEOUTS, **(timeouts or {})}
+        self.timer = timer or StepTimer()
+        self.resource_filter = resource_filter
+        self.headless = headless
+        self.viewport = viewport
+        self.device_scale_factor = device_scale_factor
+        self.cdp_url = cdp_url
+        self.cdp_browser = None
+        self.order_detail_url = order_detail_url
+        self.order_search_url = order_search_url
+        self.user_data_dir = user_data_dir or default_user_data_dir()
+        self.playwright = None
+        self.context = None
+
+    async def start_browser(self):
+        """Open the persistent context that holds the logged-in session"""
+        with self.timer.step('start_browser'):
+            self.playwright = await async_playwright().start()
+            if self.cdp_url:
+                self.cdp_browser = await self.playwright.chromium.connect_over_cdp(self.cdp_url)
+                contexts = self.cdp_browser.contexts
+                self.context = contexts[0] if contexts else await self.cdp_browser.new_context()
+                print(f"✓ Async engine connected to {self.cdp_url} ({self.concurrency} tabs)")
+                return
+            os.makedirs(self.user_data_dir, exist_ok=True)
+            self.context = await self.playwright.chromium.launch_persistent_context(
+                **persistent_context_options(
+                    self.user_data_dir,
+                    headless=self.headless,
+                    viewport=self.viewport,
+                    device_scale_factor=self.device_scale_factor,
+                )
+            )
+        print(f"✓ Async browser ready ({self.concurrency} tabs)")
+
+    async def close_browser(self):
+        """Close the browser (or only disconnect from a Chrome reused over CDP)"""
+        if self.cdp_browser:
+            await self.cdp_browser.close()
+            self.cdp_browser = None
+        elif self.context:
+            await self.context.close()
+        self.context = None
+        if self.playwright:
+            await self.playwright.stop()
+            self.playwright = None
+
+    async def process_orders(self, order_numbers, output_folder='screenshots', on_capture=None):
+        """
+        Navigate to and screenshot the chat of every order, several at a time
+
+        Args:
+            order_numbers: Order numbers to process
+            output_folder: Folder to save screenshots
+            on_capture: Optional callable(order_number, screenshot_path) run in
+                a worker thread as soon as an order is captured (e.g.
+                UploadPipeline.submit, which may block)
+
+        Returns:
+            list: Screenshot path (or None if it failed) per order, in input order
+        """
+        os.makedirs(output_folder, exist_ok=True)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        loop = asyncio.get_running_loop()
+
+        async def run(order_number):
+            async with semaphore:
+                path = await self._process_order(order_number, output_folder)
+            if path and on_capture:
+                await loop.run_in_executor(None, on_capture, order_number, path)
+            return path
+
+        return await asyncio.gather(*(run(order_number) for order_number in order_numbers))
+
+    async def _process_order(self, order_number, output_folder):
+        # Any failure only loses this order, not the others in the gather
+        page = None
+        # Per tab: other tabs may still be on a search page
+        blocking = {'on': True}
+        try:
+            page = await self.context.new_page()
+            if self.cdp_url:
+                await page.set_viewport_size(self.viewport or DEFAULT_VIEWPORT)
+            if self.resource_filter:
+                async def handle(route):
+                    if self.resource_filter.check(route.request, blocking['on']):
+                        await route.abort()
+                    else:
+                        await route.continue_()
+                await page.route('**/*', handle)
+            with self.timer.step('navigate', order=order_number):
+                if not await self._navigate_to_order_chat(page, order_number, blocking):
+                    return None
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            screenshot_path = os.path.join(output_folder, f"{order_number}_{timestamp}.png")
+            with self.timer.step('capture', order=order_number) as span:
+                mode = await self._capture(page, screenshot_path)
+                span.update(mode=mode, bytes=os.path.getsize(screenshot_path))
+            print(f"  ✓ Screenshot saved: {os.path.basename(screenshot_path)}")
+            return screenshot_path
+        except Exception as e:
+            message = str(e).splitlines()[0] if str(e) else type(e).__name__
+            print(f"  ✗ Error taking screenshot for {order_number}: {message}")
+            return None
+        finally:
+            if page:
+                try:
+                    await page.close()
+                except PlaywrightError:
+                    pass
+
+    async def _goto(self, page, url):
+        await self.rate_limiter.wait(url)
+        await page.goto(url, timeout=self.timeouts['navigation'], wait_until='domcontentloaded')
+
+    async def _wait_for_network_idle(self, page):
+        try:
+            await page.wait_for_load_state('networkidle', timeout=self.timeouts['network_idle'])
+        except PlaywrightError:
+            pass
+
+    async def _navigate_to_order_chat(self, page, order_number, blocking):
+        """Async counterpart of ShopeeAutomation.navigate_to_order_chat"""
+        timeout = self.timeouts['order_chat']
+        order_id = self.order_ids.get(order_number) or await self._lookup_order_id(page, order_number)
+        if not order_id:
+            print(f"  ⚠ Order ID untuk {order_number} tidak ditemukan")
+            return False
+
+        blocking['on'] = False
+        await self._goto(page, self.order_detail_url.format(order_id=order_id, order_sn=order_number))
+        await page.get_by_text(order_number).first.wait_for(state='visible', timeout=timeout)
+        if self.chat_button_selector:
+            await page.locator(self.chat_button_selector).first.click(timeout=timeout)
+        if self.chat_panel_selector:
+            await page.locator(self.chat_panel_selector).first.wait_for(state='visible', timeout=timeout)
+        await self._wait_for_network_idle(page)
+        return True
+
+    async def _lookup_order_id(self, page, order_number):
+        found = []
+
+        async def on_response(response):
+            if self.order_api_pattern.search(response.url) and 'json' in response.headers.get('content-type', ''):
+                try:
+                    found.extend(extract_orders_from_json(await response.json()))
+                except Exception:
+                    pass
+
+        page.on("response", on_response)
+        try:
+            await self._goto(page, self.order_search_url.format(order_sn=order_number))
+            await self._wait_for_network_idle(page)
+        finally:
+            page.remove_listener("response", on_response)
+
+        for order in found:
+            if order['order_id']:
+                self.order_ids.setdefault(order['order_sn'], order['order_id'])
+        return self.order_ids.get(order_number)
+
+    async def _capture(self, page, screenshot_path):
+        """Take the screenshot, returns the mode actually used (see ShopeeAutomation._capture)"""
+        mode = self.capture_mode
+        if mode == "elements":
+            if await self._capture_elements(page, screenshot_path):
+                return mode
+            print(f"  ⚠ Elements not found, taking visible area instead")
+            mode = "visible"
+        await page.screenshot(path=screenshot_path, full_page=(mode == "full"))
+        return mode
+
+    async def _capture_elements(self, page, screenshot_path, timeout=5000):
+        """Async counterpart of ShopeeAutomation.capture_elements; False if any element is missing"""
+        selectors = [s for s in (self.order_header_selector, self.chat_panel_selector) if s]
+        if not selectors:
+            return False
+        try:
+            shots = [
+                await page.locator(selector).first.screenshot(timeout=timeout, animations='disabled')
+                for selector in selectors
+            ]
+        except PlaywrightError:
+            return False
+        if len(shots) == 1:
+            with open(screenshot_path, 'wb') as f:
+                f.write(shots[0])
+            return True
+        try:
+            from image_pipeline import stitch_images
+            # CPU-bound: off the event loop, so the other tabs keep going
+            await asyncio.get_running_loop().run_in_executor(None, stitch_images, shots, screenshot_path)
+        except ImportError:
+            # Without Pillow the shots cannot be stitched
+            return False
+        return True
+
+
+def capture_orders_concurrently(order_numbers, output_folder='screenshots', on_capture=None, **options):
+    """
+    Run AsyncShopeeAutomation from synchronous code
+
+    Args:
+        order_numbers: Order numbers to process
+        output_folder: Folder to save screenshots
+        on_capture: See AsyncShopeeAutomation.process_orders
+        **options: Passed to AsyncShopeeAutomation
+
+    Returns:
+        list: Screenshot path (or None) per order, in input order
+    """
+    async def run():
+        engine = AsyncShopeeAutomation(**options)
+        await engine.start_browser()
+        try:
+            return await engine.process_orders(order_numbers, output_folder, on_capture)
+        finally:
+            await engine.close_browser()
+
+    return asyncio.run(run())
@@ -1,22 +1,47 @@
+"""
+Shopee chat screenshot automation: capture the chat of every order to ship,
+upload the screenshots and write the Shopee CS Excel report.
+
+    python shopee_automation.py [run-all]   all stages in one run (default)
+    python shopee_automation.py capture     screenshots only (browser)
+    python shopee_automation.py upload      upload the captured screenshots
+    python shopee_automation.py report      write the report from the manifest
+
+Playwright, the Google client libraries and openpyxl are imported by the
+functions that use them, so a stage only loads (and only needs installed)
+what it uses: "report" runs without a browser or Google libraries.
+"""
 import os.path
+import argparse
 import configparser
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
-from googleapiclient.http import MediaFileUpload
-import openpyxl
-from openpyxl import Workbook
-from shopee_module import ShopeeAutomation
+import sys
+from datetime import datetime
+from drive_service import LazyDriveService, TokenRefresher
+from report_index import DEFAULT_MAX_ROWS, ReportIndex
+from image_pipeline import ScreenshotCompressor
+from retry import AdaptiveRateLimiter, Retrier
+from storage import DRIVE_BATCH_LIMIT, MB, DriveStorage, LocalStorage, S3Storage, upload_file_to_gdrive
+from order_extraction import DEFAULT_API_PATTERN
+from resource_filter import DEFAULT_BLOCKED_TYPES, DEFAULT_TRACKER_DOMAINS, ResourceFilter
+from session_cache import DEFAULT_PROBE_URL, DEFAULT_SESSION_COOKIES
+from upload_manifest import UploadManifest, file_sha256
+from multi_shop import run_all_shops, shop_config, shop_names, shop_outputs
+from timing import StepTimer
+from upload_pipeline import UploadPipeline
 
 # If modifying these scopes, delete the file token.json.
 SCOPES = ["https://www.googleapis.com/auth/drive"]
 
-def get_gdrive_service():
+def get_gdrive_credentials():
     """
-    Authenticates with the Google Drive API and returns a service object.
+    Loads (or interactively creates) the Google Drive OAuth credentials.
+    
+    An expired access token is not refreshed here: that happens on the first
+    API call or ahead of time in a TokenRefresher, so startup stays offline.
     """
+    from google.oauth2.credentials import Credentials
+    from google_auth_oauthlib.flow import InstalledAppFlow
+
     creds = None
     # The file token.json stores the user's access and refresh tokens, and is
     # created automatically when the authorization flow completes for the first
@@ -24,39 +49,50 @@ def get_gdrive_service():
     if os.path.exists("token.json"):
         creds = Credentials.from_authorized_user_file("token.json", SCOPES)
     
-    # If there are no (valid) credentials available, let the user log in.
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
-            # Make sure you have the credentials.json file from Google Cloud Console
-            flow = InstalledAppFlow.from_client_secrets_file(
-                "credentials.json", SCOPES, redirect_uri='urn:ietf:wg:oauth:2.0:oob'
-            )
-            # Use manual authorization flow
-            auth_url, _ = flow.authorization_url(prompt='consent')
-            
-            print("\n" + "="*70)
-            print("AUTHORIZATION REQUIRED")
-            print("="*70)
-            print("\nPlease visit this URL to authorize this application:")
-            print("\n" + auth_url + "\n")
-            print("After authorization, you will get a code.")
-            code = input("Enter the authorization code here: ").strip()
-            flow.fetch_token(code=code)
-            creds = flow.credentials
+    # If there are no credentials that can be used or refreshed, let the user log in.
+    if not creds or not (creds.valid or creds.refresh_token):
+        # Make sure you have the credentials.json file from Google Cloud Console
+        flow = InstalledAppFlow.from_client_secrets_file(
+            "credentials.json", SCOPES, redirect_uri='urn:ietf:wg:oauth:2.0:oob'
+        )
+        # Use manual authorization flow
+        auth_url, _ = flow.authorization_url(prompt='consent')
+        
+        print("\n" + "="*70)
+        print("AUTHORIZATION REQUIRED")
+        print("="*70)
+        print("\nPlease visit this URL to authorize this application:")
+        print("\n" + auth_url + "\n")
+        print("After authorization, you will get a code.")
+        code = input("Enter the authorization code here: ").strip()
+        flow.fetch_token(code=code)
+        creds = flow.credentials
         
         # Save the credentials for the next run
         with open("token.json", "w") as token:
             token.write(creds.to_json())
 
-    try:
-        service = build("drive", "v3", credentials=creds)
-        print("Successfully connected to Google Drive API.")
-        return service
-    except HttpError as error:
-        print(f"An error occurred: {error}")
-        return None
+    return creds
+
+def get_gdrive_service(creds=None, discovery_path=None):
+    """
+    Returns a Google Drive API service object.
+    
+    The service is built from a local discovery document on first use, so
+    this makes no network request.
+
+    Args:
+        creds: Credentials from get_gdrive_credentials(). Loaded if not given.
+        discovery_path: Optional local Drive v3 discovery document
+    """
+    if creds is None:
+        creds = get_gdrive_credentials()
+    return LazyDriveService(creds, discovery_path)
+
+def create_excel_report(order_data, output_file='shopee_report.xlsx', index=None, max_rows=DEFAULT_MAX_ROWS):
+    """excel_report.create_excel_report, importing openpyxl only when a report is written"""
+    from excel_report import create_excel_report
+    return create_excel_report(order_data, output_file, index, max_rows)
 
 def load_config():
     """Load configuration from config.ini file."""
@@ -76,195 +112,628 @@ def upload_to_gdrive(service, file_path, folder_id):
     Returns:
         str: Shareable link to the uploaded file, or None if upload fails
     """
-    try:
-        file_name = os.path.basename(file_path)
-        file_metadata = {
-            'name': file_name,
-            'parents': [folder_id]
-        }
-        
-        media = MediaFileUpload(file_path, resumable=True)
-        file = service.files().create(
-            body=file_metadata,
-            media_body=media,
-            fields='id, webViewLink'
-        ).execute()
-        
-        # Make the file accessible to anyone with the link
-        permission = {
-            'type': 'anyone',
-            'role': 'reader'
-        }
-        service.permissions().create(
-            fileId=file.get('id'),
-            body=permission
-        ).execute()
+    file = upload_file_to_gdrive(service, file_path, folder_id)
+    return file.get('webViewLink') if file else None
+
+def make_uploader(storage, manifest=None, check_existing=False, timer=None):
+    """
+    Returns an upload function for UploadPipeline workers.
+
+    Args:
+        storage: StorageBackend the screenshots are uploaded to
+        manifest: Optional UploadManifest. Files whose order number and
+            SHA-256 are already recorded are not uploaded again, and every
+            new upload is recorded.
+        check_existing: Ask the storage for a file with the same SHA-256
+            before uploading (one extra request per file on Drive and S3)
+        timer: Optional StepTimer. Every call is recorded as an 'upload' span
+            of its order with the bytes sent, the retries made and where
+            the file came from ('manifest', the storage name, or 'upload').
+
+    Returns:
+        callable: Function taking (order_number, file_path) and returning the
+            file metadata dict ('id', 'webViewLink'), or None if upload fails
+    """
+    timer = timer or StepTimer()
+    retrier = getattr(storage, 'retrier', None)
+
+    def store(order_number, file_path, span):
+        digest = file_sha256(file_path)
+        span['bytes'] = 0
+        if manifest is not None:
+            entry = manifest.find(order_number, digest)
+            if entry:
+                print(f"✓ Already uploaded: {os.path.basename(file_path)} (manifest)")
+                span['source'] = 'manifest'
+                file = {'id': entry['file_id'], 'webViewLink': entry['link']}
+                if entry['run_id'] != manifest.run_id:
+                    manifest.record_upload(order_number, digest, file, file_path, shared=entry['shared'])
+                return file
         
-        print(f"✓ Uploaded: {file_name}")
-        return file.get('webViewLink')
+        file = storage.find_by_hash(digest) if check_existing else None
+        # A file found on Drive may not be shared yet, share() takes care of it
+        shared = storage.share_on_upload and not (file and storage.share_required)
+        if file:
+            print(f"✓ Already uploaded: {os.path.basename(file_path)} ({storage.name})")
+            span['source'] = storage.name
+        else:
+            span['source'] = 'upload'
+            span['bytes'] = os.path.getsize(file_path)
+            file = storage.upload(file_path, digest)
         
-    except HttpError as error:
-        print(f"✗ Error uploading {file_path}: {error}")
+        if file and manifest is not None:
+            manifest.record_upload(order_number, digest, file, file_path, shared=shared)
+        return file
+
+    def upload(order_number, file_path):
+        with timer.step('upload', order=order_number) as span:
+            # Retries are counted per thread, a worker uploads one file at a time
+            retries = retrier.thread_retries if retrier else 0
+            try:
+                file = store(order_number, file_path, span)
+            finally:
+                span['retries'] = (retrier.thread_retries if retrier else 0) - retries
+            span['ok'] = file is not None
+            return file
+
+    return upload
+
+def make_storage_backend(config, timer=None):
+    """
+    StorageBackend from [STORAGE] of config.ini (Google Drive by default)
+
+    Args:
+        config: ConfigParser from load_config()
+        timer: Optional StepTimer for the Drive upload times
+
+    Returns:
+        StorageBackend
+    """
+    backend = config.get('STORAGE', 'BACKEND', fallback='drive').strip().lower()
+    if backend == 'local':
+        return LocalStorage(
+            root=config.get('STORAGE', 'LOCAL_ROOT', fallback='evidence'),
+            base_url=config.get('STORAGE', 'LOCAL_BASE_URL', fallback='').strip() or None,
+        )
+    if backend == 's3':
+        public_base_url = config.get('STORAGE', 'S3_PUBLIC_BASE_URL', fallback='').strip() or None
+        if not public_base_url:
+            # Presigned links stop working after at most 7 days, long before
+            # anyone stops reading the report
+            if not config.getboolean('STORAGE', 'S3_PRESIGNED_LINKS', fallback=False):
+                raise RuntimeError(
+                    "[STORAGE] S3_PUBLIC_BASE_URL is not set: report links would be presigned URLs "
+                    "that expire within 7 days. Set S3_PUBLIC_BASE_URL, or S3_PRESIGNED_LINKS=true "
+                    "to accept expiring links."
+                )
+            print("⚠ WARNING: S3_PUBLIC_BASE_URL is not set, report links are presigned URLs "
+                  f"that EXPIRE after {config.getint('STORAGE', 'S3_LINK_EXPIRY', fallback=7 * 24 * 3600)} seconds")
+        return S3Storage(
+            config.get('STORAGE', 'S3_BUCKET'),
+            prefix=config.get('STORAGE', 'S3_PREFIX', fallback=''),
+            endpoint_url=config.get('STORAGE', 'S3_ENDPOINT_URL', fallback='').strip() or None,
+            region=config.get('STORAGE', 'S3_REGION', fallback='').strip() or None,
+            access_key=config.get('STORAGE', 'S3_ACCESS_KEY', fallback='').strip() or None,
+            secret_key=config.get('STORAGE', 'S3_SECRET_KEY', fallback='').strip() or None,
+            public_base_url=public_base_url,
+            link_expiry=config.getint('STORAGE', 'S3_LINK_EXPIRY', fallback=7 * 24 * 3600),
+            multipart_threshold=config.getint('STORAGE', 'MULTIPART_THRESHOLD_MB', fallback=8) * MB,
+            multipart_chunk=config.getint('STORAGE', 'MULTIPART_CHUNK_MB', fallback=8) * MB,
+            multipart_concurrency=config.getint('STORAGE', 'MULTIPART_CONCURRENCY', fallback=4),
+        )
+    if backend != 'drive':
+        print(f"⚠ Unknown storage BACKEND '{backend}', using 'drive'")
+    return DriveStorage(
+        get_gdrive_credentials(),
+        config.get('GOOGLE_DRIVE', 'FOLDER_ID'),
+        discovery_path=config.get('GOOGLE_DRIVE', 'DISCOVERY_DOCUMENT', fallback='').strip() or None,
+        retrier=make_retrier(config),
+        simple_upload_max=config.getint('GOOGLE_DRIVE', 'SIMPLE_UPLOAD_MAX_MB', fallback=2) * MB,
+        chunk_size=config.getint('GOOGLE_DRIVE', 'UPLOAD_CHUNK_MB', fallback=16) * MB,
+        timer=timer,
+    )
+
+def make_retrier(config):
+    """Retrier with a shared AdaptiveRateLimiter from [UPLOAD] of config.ini"""
+    return Retrier(
+        max_attempts=config.getint('UPLOAD', 'RETRIES', fallback=5),
+        base_delay=config.getfloat('UPLOAD', 'RETRY_BASE_SECONDS', fallback=1.0),
+        max_delay=config.getfloat('UPLOAD', 'RETRY_MAX_SECONDS', fallback=60.0),
+        limiter=AdaptiveRateLimiter(
+            requests_per_second=config.getfloat('UPLOAD', 'MAX_REQUESTS_PER_SECOND', fallback=10.0),
+            max_concurrency=config.getint('UPLOAD', 'WORKERS', fallback=3),
+        ),
+    )
+
+def parse_config_date(config, section, option):
+    """Read an optional YYYY-MM-DD date from config.ini"""
+    value = config.get(section, option, fallback='').strip()
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        print(f"⚠ Ignoring {section}.{option}={value!r}, expected YYYY-MM-DD")
         return None
 
-def create_excel_report(order_data, output_file='shopee_report.xlsx'):
+def ask_order_numbers_manually():
+    """Fallback when no orders were found: let the operator type them in."""
+    print("\n⚠ No orders found. Would you like to manually enter order numbers?")
+    response = input("Enter 'y' to manually input orders, or any key to exit: ").strip().lower()
+    order_numbers = []
+    if response == 'y':
+        print("\nEnter order numbers (one per line, press Enter twice when done):")
+        while True:
+            order = input().strip()
+            if not order:
+                break
+            order_numbers.append(order)
+    return order_numbers
+
+def make_resource_filter(config):
+    """ResourceFilter from [RESOURCES] of config.ini, or None if blocking is off"""
+    if not config.getboolean('RESOURCES', 'BLOCK', fallback=True):
+        return None
+    extra_trackers = config.get('RESOURCES', 'TRACKER_DOMAINS', fallback='').split(',')
+    return ResourceFilter(
+        blocked_types=config.get('RESOURCES', 'BLOCK_TYPES', fallback=','.join(DEFAULT_BLOCKED_TYPES)).split(','),
+        tracker_domains=list(DEFAULT_TRACKER_DOMAINS) + extra_trackers,
+    )
+
+def make_shopee_automation(config, timer=None, resource_filter=None):
     """
-    Creates an Excel report with order numbers and Google Drive links.
-    Format follows Shopee CS template with 3 columns: No, OrderSN, Bukti
-    If the file exists, it will append new data. Otherwise, create new file.
-    
+    ShopeeAutomation configured from config.ini (browser not started yet)
+
     Args:
-        order_data: List of dictionaries with 'order_number' and 'gdrive_link'
-        output_file: Name of the output Excel file
+        config: ConfigParser from load_config()
+        timer: StepTimer shared with the rest of the run
+        resource_filter: Optional ResourceFilter (see make_resource_filter)
+
+    Returns:
+        ShopeeAutomation
+    """
+    from shopee_module import (
+        DEFAULT_CHAT_BUTTON_SELECTOR,
+        DEFAULT_NEXT_PAGE_SELECTOR,
+        DEFAULT_TIMEOUTS,
+        DEFAULT_VIEWPORT,
+        LOGIN_URL,
+        ORDER_DETAIL_URL,
+        ORDER_SEARCH_URL,
+        ORDERS_TO_SHIP_URL,
+        ShopeeAutomation,
+    )
+
+    capture_mode = config.get('SCREENSHOT', 'CAPTURE_MODE', fallback='ask').strip().lower()
+    if capture_mode not in ('ask', 'visible', 'full', 'elements'):
+        print(f"⚠ Unknown CAPTURE_MODE '{capture_mode}', using 'ask'")
+        capture_mode = 'ask'
+
+    shopee = ShopeeAutomation(
+        config.get('SHOPEE', 'USERNAME'),
+        config.get('SHOPEE', 'PASSWORD'),
+        headless=config.getboolean('BROWSER', 'HEADLESS', fallback=False),
+        chrome_profile=config.get('SHOPEE', 'CHROME_PROFILE', fallback='Default'),
+        chat_panel_selector=config.get('SCREENSHOT', 'CHAT_PANEL_SELECTOR', fallback='').strip() or None,
+        capture_mode=capture_mode,
+        order_header_selector=config.get('SCREENSHOT', 'ORDER_HEADER_SELECTOR', fallback='').strip() or None,
+        order_api_pattern=config.get('ORDERS', 'API_PATTERN', fallback=DEFAULT_API_PATTERN),
+        next_page_selector=config.get('ORDERS', 'NEXT_PAGE_SELECTOR', fallback=DEFAULT_NEXT_PAGE_SELECTOR),
+        auto_navigate=config.getboolean('NAVIGATION', 'AUTO_NAVIGATE', fallback=False),
+        chat_button_selector=config.get('NAVIGATION', 'CHAT_BUTTON_SELECTOR', fallback=DEFAULT_CHAT_BUTTON_SELECTOR),
+        timeouts={
+            name: config.getint('TIMEOUTS', name, fallback=default)
+            for name, default in DEFAULT_TIMEOUTS.items()
+        },
+        timer=timer,
+        resource_filter=resource_filter,
+        viewport={
+            'width': config.getint('BROWSER', 'VIEWPORT_WIDTH', fallback=DEFAULT_VIEWPORT['width']),
+            'height': config.getint('BROWSER', 'VIEWPORT_HEIGHT', fallback=DEFAULT_VIEWPORT['height']),
+        },
+        device_scale_factor=config.getfloat('BROWSER', 'DEVICE_SCALE_FACTOR', fallback=1),
+        cdp_url=config.get('BROWSER', 'CDP_URL', fallback='').strip() or None,
+        user_data_dir=config.get('BROWSER', 'USER_DATA_DIR', fallback='').strip() or None,
+        crop_to_chat_panel=config.getboolean('SCREENSHOT', 'CROP_TO_CHAT_PANEL', fallback=False),
+    )
+    shopee.login_url = config.get('SHOPEE', 'LOGIN_URL', fallback=LOGIN_URL)
+    shopee.orders_url = config.get('ORDERS', 'LIST_URL', fallback=ORDERS_TO_SHIP_URL)
+    shopee.order_detail_url = config.get('NAVIGATION', 'ORDER_DETAIL_URL', fallback=ORDER_DETAIL_URL)
+    shopee.order_search_url = config.get('NAVIGATION', 'ORDER_SEARCH_URL', fallback=ORDER_SEARCH_URL)
+    shopee.session_probe_url = config.get('SESSION', 'PROBE_URL', fallback=DEFAULT_PROBE_URL)
+    shopee.session_cookies = tuple(
+        name.strip() for name in
+        config.get('SESSION', 'COOKIES', fallback=','.join(DEFAULT_SESSION_COOKIES)).split(',')
+        if name.strip()
+    )
+    shopee.session_cache.max_age = config.getint('SESSION', 'CACHE_SECONDS', fallback=300)
+    return shopee
+
+def make_screenshot_compressor(config):
+    """ScreenshotCompressor from [SCREENSHOT] of config.ini"""
+    return ScreenshotCompressor(
+        fmt=config.get('SCREENSHOT', 'FORMAT', fallback='original'),
+        quality=config.getint('SCREENSHOT', 'QUALITY', fallback=80),
+        max_width=config.getint('SCREENSHOT', 'MAX_WIDTH', fallback=0) or None,
+        processes=config.getint('SCREENSHOT', 'PROCESSES', fallback=2),
+    )
+
+def apply_share_mode(storage, share_mode):
+    """
+    Settle SHARE_MODE for the storage and configure per-file sharing
+
+    Args:
+        storage: StorageBackend from make_storage_backend()
+        share_mode: 'file', 'batch' or 'folder' from [GOOGLE_DRIVE]
+
+    Returns:
+        str: Share mode in effect. 'folder' (nothing to share) when links work
+            as soon as a file is stored, 'file' if the Drive folder turns out
+            not to be shared by link.
+    """
+    if not storage.share_required:
+        return 'folder'
+    if share_mode == 'folder':
+        if storage.folder_is_shared():
+            print("✓ Folder is shared by link, files inherit its sharing")
+        else:
+            print("⚠ FOLDER_ID is not shared with 'Anyone with the link'.")
+            print("  Falling back to per-file sharing (SHARE_MODE=file).")
+            share_mode = 'file'
+    storage.share_on_upload = (share_mode == 'file')
+    return share_mode
+
+def share_unshared_uploads(storage, manifest, order_numbers, timer=None):
+    """
+    Grant link access to the uploads of these orders that are not shared yet
+    (batch mode, or leftovers of an interrupted batch run)
+
+    Args:
+        storage: StorageBackend the files were uploaded to
+        manifest: UploadManifest of the current run
+        order_numbers: Order numbers of the run
+        timer: Optional StepTimer ('share_batch' step)
+
+    Returns:
+        dict: Order number -> error message for files that could not be shared
+    """
+    file_ids = {}
+    for order_number in order_numbers:
+        entry = manifest.run_upload(order_number)
+        if entry and not entry['shared']:
+            file_ids[order_number] = entry['file_id']
+    if not file_ids:
+        return {}
+
+    print(f"\nSharing {len(file_ids)} files in batches of {DRIVE_BATCH_LIMIT}...")
+    timer = timer or StepTimer()
+    with timer.step('share_batch', files=len(file_ids)) as span:
+        share_errors = storage.share(file_ids)
+        span['errors'] = len(share_errors)
+    manifest.mark_shared([o for o in file_ids if o not in share_errors])
+    return share_errors
+
+def export_run_metrics(config, timer, run_id=None):
+    """
+    Write the spans of the run as set in [METRICS] of config.ini: appended to
+    a JSONL file, and as a Prometheus textfile-collector file (if a path is set)
+    """
+    jsonl_path = config.get('METRICS', 'JSONL', fallback='run_metrics.jsonl').strip()
+    prometheus_path = config.get('METRICS', 'PROMETHEUS_TEXTFILE', fallback='').strip()
+    try:
+        if jsonl_path:
+            timer.write_jsonl(jsonl_path, run_id)
+            print(f"✓ Run metrics appended to {jsonl_path}")
+        if prometheus_path:
+            timer.write_prometheus(prometheus_path)
+    except OSError as e:
+        print(f"⚠ Could not write run metrics: {e}")
+
+def credentials_configured(config):
+    """False (with a message) while config.ini still holds the template's Shopee login"""
+    if (config.get('SHOPEE', 'USERNAME') == 'your_shopee_username'
+            or config.get('SHOPEE', 'PASSWORD') == 'your_shopee_password'):
+        print("\n✗ ERROR: Shopee credentials not configured!")
+        print("Please edit config.ini and add your Shopee username and password.")
+        return False
+    return True
+
+def list_new_orders(config, shopee, manifest, report_index, report_file):
+    """
+    Read the orders to ship and start a new run with them in the manifest
+
+    Args:
+        config: ConfigParser from load_config()
+        shopee: Logged-in ShopeeAutomation
+        manifest: UploadManifest the run is recorded in
+        report_index: ReportIndex of report_file
+        report_file: Excel report the orders are written to
+
+    Returns:
+        tuple: (order_numbers, reported), reported being the orders already
+            in the report; ([], set()) if there is nothing to process
+    """
+    order_numbers = shopee.get_orders_to_ship(
+        auto=config.getboolean('ORDERS', 'AUTO_EXTRACT', fallback=True),
+        date_from=parse_config_date(config, 'ORDERS', 'DATE_FROM'),
+        date_to=parse_config_date(config, 'ORDERS', 'DATE_TO'),
+        max_pages=config.getint('ORDERS', 'MAX_PAGES', fallback=50)
+    ) or (ask_order_numbers_manually() if not shopee.headless else [])
+    if not order_numbers:
+        print("No orders to process. Exiting.")
+        return [], set()
+    manifest.start_run(order_numbers)
+    reported = set(report_index.known(order_numbers))
+    if reported:
+        print(f"Skipping {len(reported)} orders already in {report_file}")
+    return order_numbers, reported
+
+def capture_orders(config, shopee, order_numbers, screenshots_folder, handle, timer, resource_filter=None,
+                   action='upload', wait_step='upload_wait'):
+    """
+    Screenshot the orders and hand every screenshot, compressed, to handle()
+    in background workers while the next order is captured
+
+    Args:
+        config: ConfigParser from load_config()
+        shopee: Logged-in ShopeeAutomation. With CONCURRENT_TABS > 1 its
+            browser is closed and the async engine takes over the session
+        order_numbers: Orders to capture
+        screenshots_folder: Folder the screenshots are saved in
+        handle: Function (order_number, file_path) run in the workers after
+            compression, returning a result (None = failed)
+        timer: StepTimer of the run
+        resource_filter: Optional ResourceFilter (see make_resource_filter)
+        action: What handle() does, for the progress messages
+        wait_step: Timer step of the wait for the workers at the end
+
+    Returns:
+        list: UploadPipeline.join() results, one dict per screenshot taken
+    """
+    compressor = make_screenshot_compressor(config)
+    crop_boxes = {}
+    
+    def compress_and_handle(order_number, file_path):
+        with timer.step('compress', order=order_number):
+            file_path = compressor.process(file_path, crop_boxes.get(order_number))
+        return handle(order_number, file_path)
     
+    pipeline = UploadPipeline(
+        compress_and_handle,
+        workers=config.getint('UPLOAD', 'WORKERS', fallback=3),
+        queue_size=config.getint('UPLOAD', 'QUEUE_SIZE', fallback=10),
+    )
+    
+    print(f"\nProcessing {len(order_numbers)} orders...")
+    print(f"{action.capitalize()} workers: {pipeline.workers}, queue size: {pipeline.queue_size}")
+    if compressor.enabled:
+        print(f"Screenshots: {compressor.fmt}, quality {compressor.quality}, max width {compressor.max_width or 'original'}")
+    concurrent_tabs = config.getint('NAVIGATION', 'CONCURRENT_TABS', fallback=1)
+    if concurrent_tabs > 1 and not shopee.auto_navigate:
+        print("⚠ CONCURRENT_TABS needs AUTO_NAVIGATE=true, processing orders one by one")
+        concurrent_tabs = 1
+    
+    pipeline.start()
+    try:
+        if concurrent_tabs > 1:
+            from shopee_async import capture_orders_concurrently
+            
+            # The async engine opens its own context on the same
+            # browser_data, so the logged-in session is shared. Read the CDP
+            # connection first: close_browser() forgets it
+            cdp_url = shopee.cdp_url if shopee.cdp_browser else None
+            shopee.close_browser()
+            
+            def queue_capture(order_number, screenshot_path):
+                print(f"  → {order_number} queued for {action}...")
+                pipeline.submit(order_number, screenshot_path)
+            
+            print(f"Capturing with {concurrent_tabs} concurrent tabs...")
+            paths = capture_orders_concurrently(
+                order_numbers,
+                screenshots_folder,
+                on_capture=queue_capture,
+                concurrency=concurrent_tabs,
+                requests_per_second=config.getfloat('NAVIGATION', 'MAX_REQUESTS_PER_SECOND', fallback=2.0),
+                capture_mode=shopee.capture_mode if shopee.capture_mode != 'ask' else 'visible',
+                chat_panel_selector=shopee.chat_panel_selector,
+                order_header_selector=shopee.order_header_selector,
+                chat_button_selector=shopee.chat_button_selector,
+                order_api_pattern=shopee.order_api_pattern.pattern,
+                order_ids=shopee.order_ids,
+                order_detail_url=shopee.order_detail_url,
+                order_search_url=shopee.order_search_url,
+                timeouts=shopee.timeouts,
+                timer=timer,
+                resource_filter=resource_filter,
+                headless=shopee.headless,
+                viewport=shopee.viewport,
+                device_scale_factor=shopee.device_scale_factor,
+                cdp_url=cdp_url,
+                user_data_dir=shopee.user_data_dir,
+            )
+            for order_number, path in zip(order_numbers, paths):
+                if not path:
+                    print(f"  ✗ Failed to take screenshot for order {order_number}")
+        else:
+            for i, order_number in enumerate(order_numbers, 1):
+                print(f"\n[{i}/{len(order_numbers)}] Processing order: {order_number}")
+            
+                # Take screenshot
+                screenshot_path = shopee.take_chat_screenshot(order_number, screenshots_folder)
+            
+                if screenshot_path:
+                    if shopee.last_capture_box:
+                        crop_boxes[order_number] = shopee.last_capture_box
+                    # Hand over in the background (blocks only while the queue is full)
+                    print(f"  → Queued for {action}...")
+                    pipeline.submit(order_number, screenshot_path)
+                else:
+                    print(f"  ✗ Failed to take screenshot for order {order_number}")
+    finally:
+        print(f"\nWaiting for remaining {action} jobs to finish...")
+        with timer.step(wait_step):
+            results = pipeline.join()
+        compressor.close()
+    return results
+
+def report_rows(manifest, order_numbers, reported=(), share_errors=None):
+    """
+    Report rows of the current run rebuilt from the manifest, in run order
+
+    Args:
+        manifest: UploadManifest of the run
+        order_numbers: Order numbers of the run
+        reported: Orders already in the report (left out)
+        share_errors: Order number -> error for files that are not viewable
+            by link (left out, with a message)
+
     Returns:
-        str: Path to the created Excel file
+        list: Dicts with 'order_number' and 'gdrive_link'
     """
-    # Check if file already exists
-    if os.path.exists(output_file):
-        print(f"File '{output_file}' sudah ada, akan menambahkan data baru...")
-        wb = openpyxl.load_workbook(output_file)
-        ws = wb.active
-        
-        # Find the next empty row (skip header row)
-        next_row = ws.max_row + 1
-        
-        # Get current number for sequential numbering
-        current_no = next_row - 1  # Assuming row 1 is header
-        
-        # Add new data
-        for data in order_data:
-            ws[f'A{next_row}'] = current_no  # Sequential number
-            ws[f'B{next_row}'] = data['order_number']
-            ws[f'C{next_row}'] = data['gdrive_link']
-            next_row += 1
-            current_no += 1
-        
-        print(f"✓ Menambahkan {len(order_data)} data baru ke file existing")
-    else:
-        print(f"Membuat file Excel baru: {output_file}")
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Sheet1"
-        
-        # Add headers (Row 1) - matching Shopee template
-        ws['A1'] = "No"
-        ws['B1'] = "OrderSN/ Nomor Pesanan"
-        ws['C1'] = "Bukti pembeli sudah menerima pesanan\n- Screenshot yang menunjukkan pembeli sudah mengonfirmasi menerima produk non fisik. Screenshot harus dari Chat di Shopee, screenshot dari platform lain (cth Whatsapp) tidak akan diproses\n- Masukkan foto kedalam google drive dan salin ulang link kedalam kolom dibawah ini\n- Pastikan google drive tidak terkunci sehingga dapat diakses oleh Tim Shopee"
-        
-        # Make headers bold and wrap text
-        for cell in ['A1', 'B1', 'C1']:
-            ws[cell].font = openpyxl.styles.Font(bold=True)
-            ws[cell].alignment = openpyxl.styles.Alignment(wrap_text=True, vertical='top')
-        
-        # Add data starting from row 2
-        for idx, data in enumerate(order_data, start=2):
-            ws[f'A{idx}'] = idx - 1  # Sequential number starting from 1
-            ws[f'B{idx}'] = data['order_number']
-            ws[f'C{idx}'] = data['gdrive_link']
-        
-        # Adjust column widths
-        ws.column_dimensions['A'].width = 5
-        ws.column_dimensions['B'].width = 20
-        ws.column_dimensions['C'].width = 100
-        
-        # Set row height for header
-        ws.row_dimensions[1].height = 80
+    share_errors = share_errors or {}
+    order_data = []
+    for order_number in order_numbers:
+        entry = manifest.run_upload(order_number)
+        if not entry or order_number in reported:
+            continue
+        if order_number in share_errors:
+            print(f"  ✗ Failed to share screenshot for order {order_number}: {share_errors[order_number]}")
+            continue
+        order_data.append({
+            'order_number': order_number,
+            'gdrive_link': entry['link']
+        })
+        print(f"  ✓ Order {order_number} processed successfully!")
+    return order_data
+
+def run_workflow(config, resume=False, report_file='shopee_report.xlsx', screenshots_folder='screenshots',
+                 summary=None):
+    """
+    Capture, upload and report the orders of one shop (the run-all command)
+    
+    Args:
+        config: ConfigParser from load_config() (or shop_config() for one
+            shop of a multi-shop config.ini)
+        resume: Continue the last interrupted run from the upload manifest
+        report_file: Excel report the orders are written to
+        screenshots_folder: Folder the screenshots are saved in
+        summary: Optional dict filled with 'orders', 'reported', 'missing'
+            and 'report_file' of the run, and 'error' if it failed
     
-    wb.save(output_file)
-    print(f"✓ Excel report created/updated: {output_file}")
-    return output_file
+    Returns:
+        int: 2 if the browser needed the operator in headless mode, else None
+    """
+    from shopee_module import InteractionRequired
 
-def main():
-    """Main function to run the full automation workflow."""
+    summary = {} if summary is None else summary
+    summary.update(orders=0, reported=0, missing=0, report_file=None, error=None)
     print("\n" + "="*70)
     print("SHOPEE AUTOMATION - FULL WORKFLOW")
     print("="*70)
     
-    # Load configuration
-    config = load_config()
-    folder_id = config.get('GOOGLE_DRIVE', 'FOLDER_ID')
-    username = config.get('SHOPEE', 'USERNAME')
-    password = config.get('SHOPEE', 'PASSWORD')
-    chrome_profile = config.get('SHOPEE', 'CHROME_PROFILE', fallback='Default')
+    share_mode = config.get('GOOGLE_DRIVE', 'SHARE_MODE', fallback='file').strip().lower()
+    manifest_path = config.get('UPLOAD', 'MANIFEST', fallback='upload_manifest.jsonl')
+    timer = StepTimer()
+    resource_filter = make_resource_filter(config)
     
     # Check if credentials are configured
-    if username == 'your_shopee_username' or password == 'your_shopee_password':
-        print("\n✗ ERROR: Shopee credentials not configured!")
-        print("Please edit config.ini and add your Shopee username and password.")
+    if not credentials_configured(config):
+        summary['error'] = "credentials not configured"
         return
     
-    # Step 1: Connect to Google Drive
-    print("\n[1/5] Connecting to Google Drive...")
-    gdrive_service = get_gdrive_service()
-    if not gdrive_service:
-        print("✗ Could not connect to Google Drive. Aborting.")
-        return
-    print("✓ Google Drive connected!")
+    if share_mode not in ('file', 'batch', 'folder'):
+        print(f"⚠ Unknown SHARE_MODE '{share_mode}', using 'file'")
+        share_mode = 'file'
     
-    # Step 2: Initialize Shopee automation
-    print("\n[2/5] Initializing Shopee automation...")
-    shopee = ShopeeAutomation(username, password, headless=False, chrome_profile=chrome_profile)
-    shopee.start_browser()
+    manifest = UploadManifest(manifest_path)
+    # Orders already in the Excel report are skipped before any navigation
+    report_index = ReportIndex(report_file)
+    order_numbers = []
+    reported = set()
+    if resume:
+        run = manifest.resume_run()
+        if not run:
+            print(f"\n✗ Nothing to resume: no run recorded in {manifest_path}")
+            report_index.close()
+            return
+        order_numbers = run['orders']
+        reported = run['reported'] | set(report_index.known(order_numbers))
+        if set(order_numbers) <= reported:
+            print(f"\n✓ Last run ({run['run_id']}) already completed, nothing to resume.")
+            report_index.close()
+            return
+        print(f"\nResuming run {run['run_id']} ({len(order_numbers)} orders, {len(reported)} already in report)")
     
+    shopee = storage = token_refresher = None
     try:
-        # Step 3: Login to Shopee
-        print("\n[3/5] Logging in to Shopee Seller Centre...")
-        if not shopee.login():
-            print("✗ Login failed. Aborting.")
-            return
+        # Step 1: Connect to the evidence storage (Google Drive by default)
+        print("\n[1/5] Connecting to storage...")
+        with timer.step('drive_connect'):
+            storage = make_storage_backend(config, timer)
+        if isinstance(storage, DriveStorage):
+            token_refresher = TokenRefresher(storage.creds).start()
+        print(f"✓ Storage ready: {storage.name}")
+        share_mode = apply_share_mode(storage, share_mode)
         
-        # Step 4: Get orders and process
-        print("\n[4/5] Getting orders and taking screenshots...")
-        order_numbers = shopee.get_orders_to_ship()
+        # Orders of a resumed run that still need a screenshot
+        pending = [o for o in order_numbers if not manifest.run_upload(o) and o not in reported]
+        if resume and not pending:
+            print("✓ All orders of this run are already uploaded, skipping the browser.")
         
-        if not order_numbers:
-            print("\n⚠ No orders found. Would you like to manually enter order numbers?")
-            response = input("Enter 'y' to manually input orders, or any key to exit: ").strip().lower()
-            if response == 'y':
-                print("\nEnter order numbers (one per line, press Enter twice when done):")
-                order_numbers = []
-                while True:
-                    order = input().strip()
-                    if not order:
-                        break
-                    order_numbers.append(order)
+        if not resume or pending:
+            # Step 2: Initialize Shopee automation
+            print("\n[2/5] Initializing Shopee automation...")
+            shopee = make_shopee_automation(config, timer, resource_filter)
+            shopee.start_browser()
             
-            if not order_numbers:
-                print("No orders to process. Exiting.")
+            # Step 3: Login to Shopee
+            print("\n[3/5] Logging in to Shopee Seller Centre...")
+            if not shopee.login():
+                print("✗ Login failed. Aborting.")
+                summary['error'] = "login failed"
                 return
-        
-        # Process each order
-        order_data = []
-        screenshots_folder = 'screenshots'
-        
-        print(f"\nProcessing {len(order_numbers)} orders...")
-        for i, order_number in enumerate(order_numbers, 1):
-            print(f"\n[{i}/{len(order_numbers)}] Processing order: {order_number}")
-            
-            # Take screenshot
-            screenshot_path = shopee.take_chat_screenshot(order_number, screenshots_folder)
             
-            if screenshot_path:
-                # Upload to Google Drive
-                print(f"  → Uploading to Google Drive...")
-                gdrive_link = upload_to_gdrive(gdrive_service, screenshot_path, folder_id)
-                
-                if gdrive_link:
-                    order_data.append({
-                        'order_number': order_number,
-                        'gdrive_link': gdrive_link
-                    })
-                    print(f"  ✓ Order {order_number} processed successfully!")
-                else:
-                    print(f"  ✗ Failed to upload screenshot for order {order_number}")
+            # Step 4: Get orders and process
+            print("\n[4/5] Getting orders and taking screenshots...")
+            if not resume:
+                order_numbers, reported = list_new_orders(config, shopee, manifest, report_index, report_file)
+                if not order_numbers:
+                    return
+                pending = [o for o in order_numbers if o not in reported]
             else:
-                print(f"  ✗ Failed to take screenshot for order {order_number}")
+                print(f"Skipping {len(order_numbers) - len(pending)} orders already in the manifest")
+            
+            # Process each order: capture here, upload in the background
+            upload = make_uploader(
+                storage, manifest=manifest,
+                check_existing=config.getboolean('STORAGE', 'CHECK_EXISTING', fallback=False),
+                timer=timer,
+            )
+            uploads = capture_orders(config, shopee, pending, screenshots_folder, upload, timer, resource_filter)
+            
+            for upload in uploads:
+                if not upload['result']:
+                    error = f": {upload['error']}" if upload['error'] else ""
+                    print(f"  ✗ Failed to upload screenshot for order {upload['order_number']}{error}")
+        
+        # Grant link access to uploads that are not shared yet: the whole
+        # run in batch mode, or leftovers of an interrupted batch run
+        share_errors = {}
+        if share_mode != 'folder':
+            share_errors = share_unshared_uploads(storage, manifest, order_numbers, timer)
+        
+        # Rebuild the report rows from the manifest, in the original order
+        summary['orders'] = len(order_numbers)
+        order_data = report_rows(manifest, order_numbers, reported, share_errors)
         
         # Step 5: Generate Excel report
         print("\n[5/5] Generating Excel report...")
         if order_data:
-            excel_file = create_excel_report(order_data, 'shopee_report.xlsx')
+            with timer.step('report', rows=len(order_data)):
+                excel_file = create_excel_report(order_data, report_file, report_index,
+                                                 config.getint('REPORT', 'MAX_ROWS', fallback=DEFAULT_MAX_ROWS))
+            manifest.mark_reported(report_file, [data['order_number'] for data in order_data])
             print(f"\n✓ Excel report created: {excel_file}")
             
             print("\n" + "="*70)
@@ -272,28 +741,355 @@ def main():
             print("="*70)
             print(f"\nSummary:")
             print(f"  - Orders processed: {len(order_data)}")
-            print(f"  - Screenshots uploaded to Google Drive")
-            print(f"  - Excel report: shopee_report.xlsx")
+            print(f"  - Screenshots uploaded to {storage.name}")
+            print(f"  - Excel report: {excel_file}")
+            missing = len(order_numbers) - len(order_data) - len(reported)
+            summary.update(reported=len(order_data), missing=missing, report_file=excel_file)
+            if missing:
+                print(f"  - Missing: {missing} orders (run with --resume to retry)")
             print(f"\nNext steps:")
-            print(f"  1. Open shopee_report.xlsx")
+            print(f"  1. Open {excel_file}")
             print(f"  2. Verify all data is correct")
             print(f"  3. Submit the report to Shopee CS")
         else:
             print("\n⚠ No orders were successfully processed.")
+            summary['missing'] = len(order_numbers) - len(reported)
             
+    except InteractionRequired as e:
+        print(f"\n✗ {e}")
+        summary['error'] = str(e)
+        return 2
     except KeyboardInterrupt:
         print("\n\n⚠ Process interrupted by user.")
+        print("  Finished uploads are kept in the manifest, run with --resume to continue.")
+        summary['error'] = "interrupted"
     except Exception as e:
         print(f"\n✗ Error during automation: {e}")
+        summary['error'] = str(e)
         import traceback
         traceback.print_exc()
     finally:
         # Cleanup
-        print("\nClosing browser...")
-        shopee.close_browser()
+        if shopee:
+            print("\nClosing browser...")
+            shopee.close_browser()
+        if token_refresher:
+            token_refresher.stop()
+        if storage:
+            storage.close()
+        report_index.close()
+        timer.print_summary()
+        export_run_metrics(config, timer, manifest.run_id)
+        if resource_filter:
+            resource_filter.print_summary()
         print("✓ Automation finished.")
 
+def run_capture(config, resume=False, report_file='shopee_report.xlsx', screenshots_folder='screenshots',
+                summary=None):
+    """
+    Capture stage: take and compress the screenshots and record them in the
+    manifest without uploading them ("upload" continues from there). The
+    storage is not contacted, so the Google libraries are not loaded.
+    
+    Args and return value as run_workflow(); with resume the orders of the
+    last run that have no screenshot yet are captured.
+    """
+    from shopee_module import InteractionRequired
 
-if __name__ == "__main__":
-    main()
+    summary = {} if summary is None else summary
+    summary.update(orders=0, reported=0, missing=0, report_file=None, error=None)
+    print("\n" + "="*70)
+    print("SHOPEE AUTOMATION - CAPTURE")
+    print("="*70)
+    
+    manifest_path = config.get('UPLOAD', 'MANIFEST', fallback='upload_manifest.jsonl')
+    timer = StepTimer()
+    resource_filter = make_resource_filter(config)
+    if not credentials_configured(config):
+        summary['error'] = "credentials not configured"
+        return
+    
+    manifest = UploadManifest(manifest_path)
+    report_index = ReportIndex(report_file)
+    order_numbers = []
+    reported = set()
+    if resume:
+        run = manifest.resume_run()
+        if not run:
+            print(f"\n✗ Nothing to resume: no run recorded in {manifest_path}")
+            report_index.close()
+            return
+        order_numbers = run['orders']
+        reported = run['reported'] | set(report_index.known(order_numbers))
+    
+    def captured(order_number):
+        entry = manifest.run_capture(order_number)
+        return manifest.run_upload(order_number) or (entry and os.path.exists(entry['file_path']))
+    
+    pending = [o for o in order_numbers if o not in reported and not captured(o)]
+    if resume and not pending:
+        print("\n✓ All orders of the last run are already captured.")
+        report_index.close()
+        return
+    
+    shopee = None
+    try:
+        print("\n[1/3] Initializing Shopee automation...")
+        shopee = make_shopee_automation(config, timer, resource_filter)
+        shopee.start_browser()
+        
+        print("\n[2/3] Logging in to Shopee Seller Centre...")
+        if not shopee.login():
+            print("✗ Login failed. Aborting.")
+            summary['error'] = "login failed"
+            return
+        
+        print("\n[3/3] Getting orders and taking screenshots...")
+        if not resume:
+            order_numbers, reported = list_new_orders(config, shopee, manifest, report_index, report_file)
+            if not order_numbers:
+                return
+            pending = [o for o in order_numbers if o not in reported]
+        
+        def record(order_number, file_path):
+            manifest.record_capture(order_number, file_path)
+            return file_path
+        
+        results = capture_orders(config, shopee, pending, screenshots_folder, record, timer, resource_filter,
+                                 action='saving', wait_step='compress_wait')
+        captured_count = sum(1 for result in results if result['result'])
+        summary.update(orders=len(order_numbers), missing=len(pending) - captured_count)
+        print(f"\n✓ {captured_count} of {len(pending)} screenshots captured")
+        print("  Upload them with: python shopee_automation.py upload")
+    except InteractionRequired as e:
+        print(f"\n✗ {e}")
+        summary['error'] = str(e)
+        return 2
+    except KeyboardInterrupt:
+        print("\n\n⚠ Process interrupted by user.")
+        print("  Captured screenshots are kept in the manifest, run capture --resume to continue.")
+        summary['error'] = "interrupted"
+    except Exception as e:
+        print(f"\n✗ Error during capture: {e}")
+        summary['error'] = str(e)
+        import traceback
+        traceback.print_exc()
+    finally:
+        if shopee:
+            print("\nClosing browser...")
+            shopee.close_browser()
+        report_index.close()
+        timer.print_summary()
+        export_run_metrics(config, timer, manifest.run_id)
+        if resource_filter:
+            resource_filter.print_summary()
+
+def run_upload(config, resume=False, report_file='shopee_report.xlsx', screenshots_folder='screenshots',
+               summary=None):
+    """
+    Upload stage: upload the screenshots recorded by "capture" for the last
+    run in the manifest and grant link access. No browser is started, so
+    Playwright is not loaded.
+    
+    Args and return value as run_workflow(); the stage always continues the
+    last run, so resume makes no difference.
+    """
+    summary = {} if summary is None else summary
+    summary.update(orders=0, reported=0, missing=0, report_file=None, error=None)
+    print("\n" + "="*70)
+    print("SHOPEE AUTOMATION - UPLOAD")
+    print("="*70)
+    
+    share_mode = config.get('GOOGLE_DRIVE', 'SHARE_MODE', fallback='file').strip().lower()
+    if share_mode not in ('file', 'batch', 'folder'):
+        print(f"⚠ Unknown SHARE_MODE '{share_mode}', using 'file'")
+        share_mode = 'file'
+    manifest_path = config.get('UPLOAD', 'MANIFEST', fallback='upload_manifest.jsonl')
+    manifest = UploadManifest(manifest_path)
+    run = manifest.resume_run()
+    if not run:
+        print(f"\n✗ Nothing to upload: no run recorded in {manifest_path}")
+        summary['error'] = "no run to upload"
+        return
+    
+    order_numbers = run['orders']
+    captures = {}
+    for order_number in order_numbers:
+        entry = manifest.run_capture(order_number)
+        if not entry or manifest.run_upload(order_number) or order_number in run['reported']:
+            continue
+        if os.path.exists(entry['file_path']):
+            captures[order_number] = entry['file_path']
+        else:
+            print(f"  ✗ Screenshot of order {order_number} is missing: {entry['file_path']}")
+    print(f"\nRun {run['run_id']}: {len(captures)} screenshots to upload")
+    
+    timer = StepTimer()
+    storage = token_refresher = None
+    try:
+        print("\nConnecting to storage...")
+        with timer.step('drive_connect'):
+            storage = make_storage_backend(config, timer)
+        if isinstance(storage, DriveStorage):
+            token_refresher = TokenRefresher(storage.creds).start()
+        print(f"✓ Storage ready: {storage.name}")
+        share_mode = apply_share_mode(storage, share_mode)
+        
+        upload = make_uploader(
+            storage, manifest=manifest,
+            check_existing=config.getboolean('STORAGE', 'CHECK_EXISTING', fallback=False),
+            timer=timer,
+        )
+        pipeline = UploadPipeline(
+            upload,
+            workers=config.getint('UPLOAD', 'WORKERS', fallback=3),
+            queue_size=config.getint('UPLOAD', 'QUEUE_SIZE', fallback=10),
+        ).start()
+        try:
+            for order_number, file_path in captures.items():
+                pipeline.submit(order_number, file_path)
+        finally:
+            with timer.step('upload_wait'):
+                uploads = pipeline.join()
+        for upload in uploads:
+            if not upload['result']:
+                error = f": {upload['error']}" if upload['error'] else ""
+                print(f"  ✗ Failed to upload screenshot for order {upload['order_number']}{error}")
+        
+        share_errors = {}
+        if share_mode != 'folder':
+            share_errors = share_unshared_uploads(storage, manifest, order_numbers, timer)
+        for order_number, error in share_errors.items():
+            print(f"  ✗ Failed to share screenshot for order {order_number}: {error}")
+        
+        uploaded = [o for o in order_numbers if manifest.run_upload(o)]
+        summary.update(
+            orders=len(order_numbers),
+            missing=len([o for o in order_numbers if o not in uploaded and o not in run['reported']]),
+        )
+        print(f"\n✓ {len(uploaded)} of {len(order_numbers)} orders uploaded to {storage.name}")
+        print("  Write the report with: python shopee_automation.py report")
+    except KeyboardInterrupt:
+        print("\n\n⚠ Process interrupted by user.")
+        print("  Finished uploads are kept in the manifest, run upload again to continue.")
+        summary['error'] = "interrupted"
+    except Exception as e:
+        print(f"\n✗ Error during upload: {e}")
+        summary['error'] = str(e)
+        import traceback
+        traceback.print_exc()
+    finally:
+        if token_refresher:
+            token_refresher.stop()
+        if storage:
+            storage.close()
+        timer.print_summary()
+        export_run_metrics(config, timer, manifest.run_id)
 
+def run_report(config, resume=False, report_file='shopee_report.xlsx', screenshots_folder='screenshots',
+               summary=None):
+    """
+    Report stage: write the uploads of the last run in the manifest that are
+    not in the report yet. Only openpyxl is loaded: no browser, no storage.
+    
+    Args and return value as run_workflow(); the stage always continues the
+    last run, so resume makes no difference.
+    """
+    summary = {} if summary is None else summary
+    summary.update(orders=0, reported=0, missing=0, report_file=None, error=None)
+    print("\n" + "="*70)
+    print("SHOPEE AUTOMATION - REPORT")
+    print("="*70)
+    
+    share_mode = config.get('GOOGLE_DRIVE', 'SHARE_MODE', fallback='file').strip().lower()
+    manifest_path = config.get('UPLOAD', 'MANIFEST', fallback='upload_manifest.jsonl')
+    manifest = UploadManifest(manifest_path)
+    run = manifest.resume_run()
+    if not run:
+        print(f"\n✗ Nothing to report: no run recorded in {manifest_path}")
+        summary['error'] = "no run to report"
+        return
+    
+    order_numbers = run['orders']
+    # Files not viewable by link yet (batch sharing failed or was cut off)
+    # stay out of the report until "upload" has shared them
+    share_errors = {}
+    if share_mode != 'folder':
+        for order_number in order_numbers:
+            entry = manifest.run_upload(order_number)
+            if entry and not entry['shared']:
+                share_errors[order_number] = "not shared yet, run upload again"
+    
+    timer = StepTimer()
+    report_index = ReportIndex(report_file)
+    try:
+        order_data = report_rows(manifest, order_numbers, run['reported'], share_errors)
+        excel_file = None
+        if order_data:
+            with timer.step('report', rows=len(order_data)):
+                excel_file = create_excel_report(order_data, report_file, report_index,
+                                                 config.getint('REPORT', 'MAX_ROWS', fallback=DEFAULT_MAX_ROWS))
+            manifest.mark_reported(report_file, [data['order_number'] for data in order_data])
+            print(f"\n✓ Excel report created: {excel_file}")
+        else:
+            print("\n⚠ No new orders to report.")
+        missing = len(order_numbers) - len(order_data) - len(run['reported'])
+        summary.update(orders=len(order_numbers), reported=len(order_data), missing=missing, report_file=excel_file)
+        if missing:
+            print(f"  - Missing: {missing} orders (not captured or uploaded yet)")
+    finally:
+        report_index.close()
+        export_run_metrics(config, timer, manifest.run_id)
+
+# Subcommands of main() and the function running each one for one shop
+COMMANDS = {
+    'run-all': run_workflow,
+    'capture': run_capture,
+    'upload': run_upload,
+    'report': run_report,
+}
+
+def main(argv=None):
+    """Command line entry point: run one stage, or all of them (the default)"""
+    # Accepted before and after the subcommand (unset unless given, so the
+    # subcommand's parser does not overwrite a value given before it)
+    options = argparse.ArgumentParser(add_help=False)
+    options.add_argument(
+        '--resume', action='store_true', default=argparse.SUPPRESS,
+        help="continue the last interrupted run from the upload manifest"
+    )
+    options.add_argument(
+        '--shop', metavar='NAME', default=argparse.SUPPRESS,
+        help="process only the shop of the [SHOP NAME] section, in this process "
+             "(the browser may prompt, e.g. to log in to that shop once)"
+    )
+    parser = argparse.ArgumentParser(description="Shopee chat screenshot automation", parents=[options])
+    commands = parser.add_subparsers(dest='command', metavar='COMMAND')
+    for name, help_text in (
+        ('run-all', "capture, upload and report in one run (default)"),
+        ('capture', "take the screenshots and record them in the manifest (browser only)"),
+        ('upload', "upload the screenshots of the last capture (no browser)"),
+        ('report', "write the Excel report of the last upload (no browser, no Google libraries)"),
+    ):
+        commands.add_parser(name, parents=[options], help=help_text, description=help_text)
+    args = parser.parse_args(argv)
+    command = args.command or 'run-all'
+    workflow = COMMANDS[command]
+    resume = getattr(args, 'resume', False)
+    shop = getattr(args, 'shop', None)
+    
+    # Load configuration
+    config = load_config()
+    shops = shop_names(config)
+    if shop:
+        if shop not in shops:
+            print(f"\n✗ No [SHOP {shop}] section in config.ini")
+            return 1
+        return workflow(shop_config(config, shop), resume, **shop_outputs(config, shop))
+    if shops:
+        return run_all_shops(config, shops, resume=resume, command=command)
+    return workflow(config, resume)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
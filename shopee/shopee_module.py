@@ -2,26 +2,181 @@
 Shopee Seller Centre Automation Module
 Handles login, order extraction, and chat screenshot capture
 """
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeout
-import time
+from playwright.sync_api import sync_playwright, Error as PlaywrightError, TimeoutError as PlaywrightTimeout
 import os
+import re
+import time
 from datetime import datetime
+from urllib.parse import urlparse
+from order_extraction import (
+    DEFAULT_API_PATTERN,
+    extract_order_sns_from_text,
+    extract_orders_from_json,
+    filter_orders,
+)
+from session_cache import (
+    DEFAULT_PROBE_URL,
+    DEFAULT_SESSION_COOKIES,
+    SESSION_CACHE_FILE,
+    SessionCache,
+    session_cookie_expiry,
+)
+from timing import StepTimer
+
+LOGIN_URL = 'https://accounts.shopee.co.id/seller/login?next=https%3A%2F%2Fseller.shopee.co.id%2F'
+
+ORDERS_TO_SHIP_URL = 'https://seller.shopee.co.id/portal/sale/order?type=toship&source=processed&sort_by=confirmed_date_asc'
+
+# Order detail page, and the order list filtered by order number (used to
+# look up the order ID when it was not seen in the "Perlu Dikirim" list)
+ORDER_DETAIL_URL = 'https://seller.shopee.co.id/portal/sale/order/{order_id}'
+ORDER_SEARCH_URL = 'https://seller.shopee.co.id/portal/sale/order?type=all&keyword={order_sn}'
+
+# Button on the order detail page that opens the chat with the buyer
+DEFAULT_CHAT_BUTTON_SELECTOR = 'button:has-text("Chat"), a:has-text("Chat")'
+
+# "Next page" button of the Seller Centre order list pager
+DEFAULT_NEXT_PAGE_SELECTOR = '.shopee-pager__button-next:not([disabled]), .eds-pager__button-next:not([disabled])'
+
+# Wait timeouts in milliseconds
+DEFAULT_TIMEOUTS = {
+    'navigation': 60000,      # page.goto
+    'login_redirect': 15000,  # login page either redirects (valid session) or shows its form
+    'network_idle': 10000,    # no network activity after a page load or click
+    'page_settled': 10000,    # page loaded again after the operator pressed Enter
+    'order_chat': 15000,      # each step of opening an order's detail page and chat
+}
+
+# Page size used for captures, the same headed and headless
+DEFAULT_VIEWPORT = {'width': 1920, 'height': 1080}
+
+
+class InteractionRequired(RuntimeError):
+    """Raised in headless mode where the operator would have been prompted"""
+
+
+def persistent_context_options(user_data_dir, headless=False, viewport=None, device_scale_factor=1):
+    """
+    Keyword arguments for launch_persistent_context, shared by the sync and async engines
+    
+    Args:
+        user_data_dir: Folder holding the browser session
+        headless: Run without a browser window
+        viewport: Dict with 'width' and 'height' (DEFAULT_VIEWPORT if None)
+        device_scale_factor: Screenshot pixels per CSS pixel
+    
+    Returns:
+        dict: Options for chromium.launch_persistent_context
+    """
+    args = ['--disable-blink-features=AutomationControlled']
+    if not headless:
+        args.insert(0, '--start-maximized')
+    return {
+        'user_data_dir': user_data_dir,
+        'headless': headless,
+        'args': args,
+        'viewport': dict(viewport or DEFAULT_VIEWPORT),
+        'device_scale_factor': device_scale_factor,
+        'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+    }
+
+
+def default_user_data_dir():
+    """Folder holding the persistent browser session (cookies, local storage)"""
+    return os.path.join(os.getcwd(), 'browser_data')
+
 
 class ShopeeAutomation:
-    def __init__(self, username, password, headless=False, chrome_profile="Default"):
+    def __init__(self, username, password, headless=False, chrome_profile="Default",
+                 chat_panel_selector=None, capture_mode="ask", order_header_selector=None,
+                 order_api_pattern=DEFAULT_API_PATTERN, next_page_selector=DEFAULT_NEXT_PAGE_SELECTOR,
+                 auto_navigate=False, chat_button_selector=DEFAULT_CHAT_BUTTON_SELECTOR,
+                 timeouts=None, timer=None, resource_filter=None,
+                 viewport=None, device_scale_factor=1, cdp_url=None, user_data_dir=None,
+                 crop_to_chat_panel=False):
         """
         Initialize Shopee automation
         
         Args:
             username: Shopee seller username/email/phone
             password: Shopee seller password
-            headless: Run browser in headless mode (True/False)
+            headless: Run browser in headless mode (True/False). Needs a
+                session already stored in browser_data: nothing prompts the
+                operator, login() raises InteractionRequired instead, and
+                orders that cannot be opened automatically are skipped
             chrome_profile: Chrome profile name (e.g., "Default", "Profile 1", "Profile 2")
+            chat_panel_selector: CSS selector of the chat panel (waited for
+                when navigating, captured in "elements" mode)
+            capture_mode: "ask" (prompt every order), "visible", "full", or
+                "elements" (capture only the order header and chat panel
+                elements and stitch them into one image)
+            order_header_selector: CSS selector of the element showing the
+                order number, used by the "elements" capture mode
+            order_api_pattern: Regex of the order list XHR URLs whose JSON
+                responses are read by get_orders_to_ship
+            next_page_selector: CSS selector of the order list "next page"
+                button. Without a visible button the list is scrolled instead
+            auto_navigate: Open each order's detail page and chat automatically
+                (see navigate_to_order_chat); the manual steps are only shown
+                when that fails
+            chat_button_selector: CSS selector of the "Chat" button on the
+                order detail page
+            timeouts: Dict overriding DEFAULT_TIMEOUTS (milliseconds)
+            timer: StepTimer collecting per-step durations (a new one if None)
+            resource_filter: Optional ResourceFilter installed on the browser
+                context. Images/fonts are blocked on the login redirect, the
+                order list and order search, and allowed again before the
+                page to capture is opened or the operator is prompted
+            viewport: Dict with 'width' and 'height' (DEFAULT_VIEWPORT if None)
+            device_scale_factor: Screenshot pixels per CSS pixel
+            cdp_url: Remote debugging endpoint of an already running Chrome
+                (e.g. http://127.0.0.1:9222, see start_chrome.py). Its
+                context and tabs are reused instead of launching a browser;
+                close_browser() only disconnects
+            user_data_dir: Folder holding the browser session (cookies,
+                session cache); default_user_data_dir() if None. One per
+                Shopee account
+            crop_to_chat_panel: Record the chat panel's position after every
+                screenshot so the image can be cropped to it (see
+                last_capture_box). Off by default: the crop drops the order
+                header from the evidence
         """
         self.username = username
         self.password = password
         self.headless = headless
         self.chrome_profile = chrome_profile
+        self.chat_panel_selector = chat_panel_selector
+        self.crop_to_chat_panel = crop_to_chat_panel
+        self.capture_mode = capture_mode
+        self.order_header_selector = order_header_selector
+        self.order_api_pattern = re.compile(order_api_pattern)
+        self.next_page_selector = next_page_selector
+        self.order_ids = {}
+        self.orders_url = ORDERS_TO_SHIP_URL
+        self.order_detail_url = ORDER_DETAIL_URL
+        self.order_search_url = ORDER_SEARCH_URL
+        self.auto_navigate = auto_navigate
+        self.chat_button_selector = chat_button_selector
+        self.timeouts = {**DEFAULT_TIMEOUTS, **(timeouts or {})}
+        self.timer = timer or StepTimer()
+        self.resource_filter = resource_filter
+        self.viewport = dict(viewport or DEFAULT_VIEWPORT)
+        self.device_scale_factor = device_scale_factor
+        self.cdp_url = cdp_url
+        self.cdp_browser = None
+        self.user_data_dir = user_data_dir or default_user_data_dir()
+        if headless:
+            if capture_mode == "ask":
+                print("⚠ Headless: CAPTURE_MODE 'ask' needs the operator, using 'visible'")
+                self.capture_mode = "visible"
+            if not auto_navigate:
+                print("⚠ Headless: manual navigation is not possible, using AUTO_NAVIGATE")
+                self.auto_navigate = True
+        self.login_url = LOGIN_URL
+        self.session_probe_url = DEFAULT_PROBE_URL
+        self.session_cookies = DEFAULT_SESSION_COOKIES
+        self.session_cache = SessionCache(os.path.join(self.user_data_dir, SESSION_CACHE_FILE))
+        self.last_capture_box = None
         self.browser = None
         self.context = None
         self.page = None
@@ -29,11 +184,19 @@ class ShopeeAutomation:
         
     def start_browser(self):
         """Start the browser and create a new page"""
+        with self.timer.step('start_browser'):
+            self._start_browser()
+    
+    def _start_browser(self):
         print("Starting browser...")
         self.playwright = sync_playwright().start()
         
+        if self.cdp_url and self._connect_over_cdp():
+            print("✓ Browser ready")
+            return
+        
         # Use persistent context to save login state
-        user_data_dir = os.path.join(os.getcwd(), 'browser_data')
+        user_data_dir = self.user_data_dir
         os.makedirs(user_data_dir, exist_ok=True)
         
         print(f"Using persistent browser session...")
@@ -41,15 +204,15 @@ class ShopeeAutomation:
         
         try:
             self.browser = self.playwright.chromium.launch_persistent_context(
-                user_data_dir=user_data_dir,
-                headless=False,
-                args=[
-                    '--start-maximized',
-                    '--disable-blink-features=AutomationControlled'
-                ],
-                viewport={'width': 1920, 'height': 1080},
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+                **persistent_context_options(
+                    user_data_dir,
+                    headless=self.headless,
+                    viewport=self.viewport,
+                    device_scale_factor=self.device_scale_factor,
+                )
             )
+            if self.resource_filter:
+                self.resource_filter.install(self.browser)
             self.page = self.browser.pages[0] if self.browser.pages else self.browser.new_page()
             print("✓ Browser started with saved session")
             print("✓ Login state akan disimpan untuk run berikutnya")
@@ -59,8 +222,126 @@ class ShopeeAutomation:
         
         print("✓ Browser ready")
         
+    def _connect_over_cdp(self):
+        """Attach to the running Chrome at cdp_url, returns False if it is not reachable"""
+        from check_chrome import get_debugging_info
+        
+        if not get_debugging_info(self.cdp_url):
+            print(f"⚠ Chrome debugging endpoint {self.cdp_url} tidak aktif, membuka browser sendiri")
+            return False
+        try:
+            self.cdp_browser = self.playwright.chromium.connect_over_cdp(self.cdp_url)
+        except PlaywrightError as e:
+            print(f"⚠ Could not connect to {self.cdp_url}: {str(e).splitlines()[0]}")
+            return False
+        
+        self.browser = self.cdp_browser.contexts[0] if self.cdp_browser.contexts else self.cdp_browser.new_context()
+        if self.resource_filter:
+            self.resource_filter.install(self.browser)
+        # Prefer a tab that is already on the Seller Centre
+        pages = self.browser.pages
+        shopee_pages = [p for p in pages if 'seller.shopee.co.id' in p.url]
+        if shopee_pages:
+            self.page = shopee_pages[0]
+        elif pages:
+            self.page = pages[0]
+        else:
+            self.page = self.browser.new_page()
+        self.page.set_viewport_size(self.viewport)
+        print(f"✓ Connected to running Chrome at {self.cdp_url} ({len(pages)} tab(s))")
+        return True
+    
     def login(self):
         """Login to Shopee Seller Centre"""
+        with self.timer.step('login'):
+            if self.session_is_warm():
+                print("✓ Sesi masih valid, halaman login dilewati")
+                return True
+            if self.headless:
+                if not self.check_session():
+                    raise InteractionRequired(
+                        "Sesi Shopee di browser_data tidak valid (login/verifikasi diperlukan). "
+                        "Jalankan sekali dengan HEADLESS=false untuk login."
+                    )
+                print("✓ Already logged in!")
+                self._remember_session()
+                return True
+            logged_in = self._login()
+            if logged_in:
+                self._remember_session()
+            return logged_in
+    
+    def session_is_warm(self):
+        """
+        Check the stored session without opening the login page
+        
+        The session cookies must be present and unexpired. If the session
+        was confirmed recently (see SessionCache) that is enough; otherwise
+        one authenticated API request (session_probe_url) is made through
+        the browser context, sharing its cookies.
+        
+        Returns:
+            bool: True if logged in; False means the full login flow is needed
+        """
+        context = self.page.context
+        expires = session_cookie_expiry(context.cookies(), self.session_cookies)
+        if expires is None or expires <= time.time():
+            return False
+        if self.session_cache.is_fresh(expires):
+            return True
+        if self._probe_session(context):
+            self.session_cache.record(expires)
+            return True
+        self.session_cache.clear()
+        return False
+    
+    def _probe_session(self, context):
+        try:
+            response = context.request.get(
+                self.session_probe_url,
+                timeout=self.timeouts['network_idle'],
+                max_redirects=0,
+            )
+            if not response.ok:
+                return False
+            payload = response.json()
+        except (PlaywrightError, ValueError):
+            return False
+        # Only the API's success envelope counts: lists, strings or a missing
+        # code are what an interstitial or error page returns
+        return isinstance(payload, dict) and payload.get('code') == 0
+    
+    def _remember_session(self):
+        """Record a confirmed login so the next run can skip the login page"""
+        expires = session_cookie_expiry(self.page.context.cookies(), self.session_cookies)
+        if expires is not None:
+            self.session_cache.record(expires)
+    
+    def check_session(self):
+        """
+        Check whether the stored session is still logged in, without prompting
+        
+        Opens the login page, which redirects to the Seller Centre when the
+        session is valid and shows its form (or a traffic check) otherwise.
+        
+        Returns:
+            bool: True if logged in
+        """
+        try:
+            self.page.goto(self.login_url, timeout=self.timeouts['navigation'])
+        except PlaywrightError as e:
+            print(f"✗ Login page tidak bisa dibuka: {str(e).splitlines()[0]}")
+            return False
+        self._wait_for_login_page()
+        return self._is_logged_in(self.page.url)
+    
+    @staticmethod
+    def _is_logged_in(url):
+        if 'verify/traffic' in url:
+            return False
+        return 'portal' in url or 'seller.shopee.co.id' in url and 'login' not in url
+    
+    def _login(self):
         print("\n" + "="*70)
         print("LOGGING IN TO SHOPEE SELLER CENTRE")
         print("="*70)
@@ -68,25 +349,26 @@ class ShopeeAutomation:
         try:
             # Navigate to Shopee Seller Centre login page for Indonesia
             print("Navigating to Shopee Seller Centre...")
-            self.page.goto('https://accounts.shopee.co.id/seller/login?next=https%3A%2F%2Fseller.shopee.co.id%2F', timeout=60000)
-            time.sleep(3)
+            self.page.goto(self.login_url, timeout=self.timeouts['navigation'])
+            self._wait_for_login_page()
             
             # Check if traffic verification appears
             if 'verify/traffic' in self.page.url:
+                self._block_resources(False, reload=True)
                 print("\n⚠ VERIFIKASI TRAFFIC DIPERLUKAN")
                 print("="*70)
                 print("Shopee meminta verifikasi traffic.")
                 print("Silakan selesaikan verifikasi di browser (puzzle/CAPTCHA).")
                 print("="*70)
-                input("\nTekan Enter setelah verifikasi selesai...")
-                time.sleep(2)
+                self._input("\nTekan Enter setelah verifikasi selesai...")
+                self._wait_for_page_settled()
             
             # Check if already logged in
-            current_url = self.page.url
-            if 'portal' in current_url or 'seller.shopee.co.id' in current_url and 'login' not in current_url:
+            if self._is_logged_in(self.page.url):
                 print("✓ Already logged in!")
                 return True
             
+            self._block_resources(False, reload=True)
             print("\n⚠ MANUAL LOGIN REQUIRED")
             print("="*70)
             print("Silakan login secara manual di browser yang terbuka.")
@@ -94,17 +376,17 @@ class ShopeeAutomation:
             print("Setelah berhasil login dan masuk ke dashboard,")
             print("tekan Enter di sini untuk melanjutkan.")
             print("="*70)
-            input("\nTekan Enter setelah Anda berhasil login...")
+            self._input("\nTekan Enter setelah Anda berhasil login...")
             
-            # Wait a bit for page to stabilize
-            time.sleep(2)
+            # Wait for the page to stabilize
+            self._wait_for_page_settled()
             
             # Check again for traffic verification after login
             if 'verify/traffic' in self.page.url:
                 print("\n⚠ Verifikasi traffic muncul lagi setelah login.")
                 print("Silakan selesaikan verifikasi di browser.")
-                input("Tekan Enter setelah verifikasi selesai...")
-                time.sleep(2)
+                self._input("Tekan Enter setelah verifikasi selesai...")
+                self._wait_for_page_settled()
             
             # Verify login successful
             current_url = self.page.url
@@ -114,69 +396,190 @@ class ShopeeAutomation:
             else:
                 print(f"⚠ Current URL: {current_url}")
                 print("Login mungkin belum selesai. Pastikan Anda sudah di dashboard.")
-                retry = input("Sudah login? (y/n): ").strip().lower()
+                retry = self._input("Sudah login? (y/n): ").strip().lower()
                 return retry == 'y'
                 
         except Exception as e:
             print(f"✗ Login error: {e}")
             print("\n⚠ Silakan login secara manual di browser.")
-            input("Tekan Enter setelah login berhasil...")
+            self._input("Tekan Enter setelah login berhasil...")
             return True
     
-    def get_orders_to_ship(self):
+    def _wait_for_login_page(self):
+        """Wait until the login page redirects away (valid session) or renders its login form"""
+        login_path = urlparse(self.page.url).path
+        try:
+            self.page.wait_for_function(
+                "path => location.pathname !== path || !!document.querySelector('input[type=password]')",
+                arg=login_path,
+                timeout=self.timeouts['login_redirect']
+            )
+        except PlaywrightError:
+            # Timed out, or the redirect replaced the page mid-check
+            pass
+        self._wait_for_page_settled()
+    
+    def _wait_for_page_settled(self):
+        """Wait for the current page's DOM to be loaded"""
+        try:
+            self.page.wait_for_load_state('domcontentloaded', timeout=self.timeouts['page_settled'])
+        except PlaywrightError:
+            pass
+    
+    def _block_resources(self, block, reload=False):
+        """
+        Switch image/font blocking of the resource filter on or off
+        
+        Args:
+            block: True to abort non-essential resources again
+            reload: Reload the current page after unblocking, so the operator
+                sees it complete (e.g. a CAPTCHA image)
+        """
+        if not self.resource_filter or self.resource_filter.blocking == block:
+            return
+        self.resource_filter.blocking = block
+        if reload and not block:
+            try:
+                self.page.reload(timeout=self.timeouts['navigation'], wait_until='domcontentloaded')
+            except PlaywrightError:
+                pass
+    
+    def _input(self, message=""):
+        """input() that counts the time spent waiting for the operator"""
+        if self.headless:
+            raise InteractionRequired(f"Headless: input diperlukan ({message.strip()})")
+        with self.timer.step('operator_input'):
+            return input(message)
+    
+    def get_orders_to_ship(self, auto=True, date_from=None, date_to=None, max_pages=50):
         """
         Get list of orders with status 'Perlu Dikirim' (Ready to Ship)
         
+        Args:
+            auto: Read order numbers from the page. If False, or nothing was
+                found, the operator is asked to paste them
+            date_from: Only orders created on/after this datetime.date
+            date_to: Only orders created on/before this datetime.date
+            max_pages: Maximum number of list pages (or scroll steps) to load
+        
         Returns:
             list: List of order numbers
         """
+        with self.timer.step('get_orders_to_ship'):
+            return self._get_orders_to_ship(auto, date_from, date_to, max_pages)
+    
+    def _get_orders_to_ship(self, auto, date_from, date_to, max_pages):
         print("\n" + "="*70)
         print("GETTING ORDERS WITH STATUS 'PERLU DIKIRIM'")
         print("="*70)
         
+        self._block_resources(True)
+        captured = []
+        
+        def on_response(response):
+            if not self.order_api_pattern.search(response.url):
+                return
+            if 'json' not in response.headers.get('content-type', ''):
+                return
+            try:
+                captured.extend(extract_orders_from_json(response.json()))
+            except Exception:
+                pass
+        
         try:
+            if auto:
+                self.page.on("response", on_response)
+            
             # Navigate to orders page with correct URL
-            url = 'https://seller.shopee.co.id/portal/sale/order?type=toship&source=processed&sort_by=confirmed_date_asc'
             print(f"Navigating to orders page...")
-            self.page.goto(url, timeout=30000, wait_until='domcontentloaded')
-            time.sleep(5)
+            self.page.goto(self.orders_url, timeout=self.timeouts['navigation'], wait_until='domcontentloaded')
+            self._wait_for_network_idle()
             
             print(f"✓ Berhasil akses halaman pesanan")
             print(f"Current URL: {self.page.url}")
             
-            # Ask user to manually provide order numbers since structure may vary
-            print("\n" + "="*70)
-            print("INPUT NOMOR PESANAN")
-            print("="*70)
-            print("\nSilakan salin nomor pesanan dari halaman Shopee")
-            print("dan paste di sini (satu nomor per baris).")
-            print("Tekan Enter dua kali (kosong) jika sudah selesai.\n")
-            
-            order_numbers = []
-            while True:
-                order = input("Nomor pesanan: ").strip()
-                if not order:
-                    break
-                order_numbers.append(order)
-                print(f"  ✓ Ditambahkan: {order}")
-            
-            if order_numbers:
-                print(f"\n✓ Total {len(order_numbers)} pesanan akan diproses")
-            else:
-                print("\n⚠ Tidak ada nomor pesanan yang diinput")
+            if auto:
+                order_numbers = self._read_order_list(captured, date_from, date_to, max_pages)
+                if order_numbers:
+                    print(f"\n✓ Total {len(order_numbers)} pesanan ditemukan otomatis")
+                    return order_numbers
+                print("\n⚠ Nomor pesanan tidak ditemukan otomatis")
             
-            return order_numbers
+            if self.headless:
+                return []
+            return self._ask_order_numbers()
             
         except Exception as e:
             print(f"✗ Error: {e}")
+            if self.headless:
+                return []
             print("\nSilakan input nomor pesanan secara manual:")
             order_numbers = []
             while True:
-                order = input("Nomor pesanan (Enter kosong untuk selesai): ").strip()
+                order = self._input("Nomor pesanan (Enter kosong untuk selesai): ").strip()
                 if not order:
                     break
                 order_numbers.append(order)
             return order_numbers
+        finally:
+            if auto:
+                self.page.remove_listener("response", on_response)
+    
+    def _read_order_list(self, captured, date_from, date_to, max_pages):
+        """Walk the order list pages and collect the orders seen in its XHR responses"""
+        for page_number in range(1, max_pages):
+            seen = len(filter_orders(captured))
+            print(f"  → Halaman {page_number}: {seen} pesanan")
+            
+            next_button = self.page.locator(self.next_page_selector).first if self.next_page_selector else None
+            if next_button is not None and next_button.count() and next_button.is_visible():
+                next_button.click()
+            else:
+                # Infinite scroll: load more by scrolling to the bottom
+                self.page.mouse.wheel(0, 20000)
+            self._wait_for_network_idle()
+            
+            if len(filter_orders(captured)) == seen:
+                break
+        
+        orders = filter_orders(captured, date_from, date_to)
+        if not orders and not captured:
+            # No JSON captured: read order numbers from the rendered list
+            print("  → Tidak ada respons API pesanan, membaca teks halaman...")
+            return extract_order_sns_from_text(self.page.inner_text('body'))
+        
+        self.order_ids.update({o['order_sn']: o['order_id'] for o in orders if o.get('order_id')})
+        return [o['order_sn'] for o in orders]
+    
+    def _wait_for_network_idle(self, timeout=None):
+        try:
+            self.page.wait_for_load_state('networkidle', timeout=timeout or self.timeouts['network_idle'])
+        except PlaywrightTimeout:
+            pass
+    
+    def _ask_order_numbers(self):
+        """Ask the operator to paste order numbers from the page"""
+        print("\n" + "="*70)
+        print("INPUT NOMOR PESANAN")
+        print("="*70)
+        print("\nSilakan salin nomor pesanan dari halaman Shopee")
+        print("dan paste di sini (satu nomor per baris).")
+        print("Tekan Enter dua kali (kosong) jika sudah selesai.\n")
+        
+        order_numbers = []
+        while True:
+            order = self._input("Nomor pesanan: ").strip()
+            if not order:
+                break
+            order_numbers.append(order)
+            print(f"  ✓ Ditambahkan: {order}")
+        
+        if order_numbers:
+            print(f"\n✓ Total {len(order_numbers)} pesanan akan diproses")
+        else:
+            print("\n⚠ Tidak ada nomor pesanan yang diinput")
+        
+        return order_numbers
     
     def take_chat_screenshot(self, order_number, output_folder='screenshots'):
         """
@@ -195,41 +598,34 @@ class ShopeeAutomation:
             
             print(f"\nProcessing order: {order_number}")
             
-            # Ask user to navigate to the chat
-            print(f"\n" + "="*50)
-            print(f"MANUAL NAVIGATION REQUIRED")
-            print("="*50)
-            print(f"\nDi browser yang terbuka:")
-            print(f"1. Cari pesanan dengan nomor: {order_number}")
-            print(f"2. Buka detail pesanan tersebut")
-            print(f"3. Klik tab/tombol 'Chat' (biasanya di pojok kanan)")
-            print(f"4. Pastikan chat dengan pembeli terlihat di layar")
-            print(f"5. Scroll ke bagian chat yang menunjukkan konfirmasi pembeli")
-            print(f"6. Tekan Enter di sini untuk mengambil screenshot")
-            print("="*50)
-            print("\nTips: Screenshot akan mengambil seluruh halaman yang terlihat")
-            print("Pastikan informasi penting (nomor pesanan + chat) terlihat!")
-            
-            input("\nTekan Enter setelah chat terbuka dan siap di-screenshot...")
+            with self.timer.step('navigate', order=order_number):
+                navigated = self.auto_navigate and self.navigate_to_order_chat(order_number)
+            if navigated:
+                print(f"  ✓ Chat pesanan {order_number} terbuka otomatis")
+            elif self.headless:
+                print(f"  ✗ Pesanan {order_number} dilewati (headless, navigasi otomatis gagal)")
+                return None
+            else:
+                self._ask_manual_navigation(order_number)
             
             # Take screenshot
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             screenshot_filename = f"{order_number}_{timestamp}.png"
             screenshot_path = os.path.join(output_folder, screenshot_filename)
             
-            # Give user option for screenshot type
-            print("\nPilih tipe screenshot:")
-            print("1. Full page (seluruh halaman)")
-            print("2. Visible area only (hanya area yang terlihat - RECOMMENDED)")
-            choice = input("Pilih (1/2) [default: 2]: ").strip() or "2"
+            mode = self.capture_mode
+            if mode == "ask":
+                # Give user option for screenshot type
+                print("\nPilih tipe screenshot:")
+                print("1. Full page (seluruh halaman)")
+                print("2. Visible area only (hanya area yang terlihat - RECOMMENDED)")
+                choice = self._input("Pilih (1/2) [default: 2]: ").strip() or "2"
+                mode = "full" if choice == "1" else "visible"
             
             print(f"  → Taking screenshot...")
-            if choice == "1":
-                self.page.screenshot(path=screenshot_path, full_page=True)
-                print(f"  ✓ Full page screenshot saved")
-            else:
-                self.page.screenshot(path=screenshot_path, full_page=False)
-                print(f"  ✓ Visible area screenshot saved")
+            with self.timer.step('capture', order=order_number) as span:
+                mode = self._capture(screenshot_path, mode)
+                span.update(mode=mode, bytes=os.path.getsize(screenshot_path))
             
             print(f"  ✓ Screenshot saved: {screenshot_filename}")
             
@@ -238,11 +634,195 @@ class ShopeeAutomation:
         except Exception as e:
             print(f"  ✗ Error taking screenshot for {order_number}: {e}")
             return None
+        finally:
+            # The next order starts with a search page again
+            self._block_resources(True)
+    
+    def _capture(self, screenshot_path, mode):
+        """Take the screenshot in the given mode, returns the mode actually used"""
+        self.last_capture_box = None
+        if mode == "elements":
+            selectors = [s for s in (self.order_header_selector, self.chat_panel_selector) if s]
+            if self.capture_elements(screenshot_path, selectors):
+                print(f"  ✓ Order header + chat screenshot saved")
+            else:
+                print(f"  ⚠ Elements not found, taking visible area instead")
+                mode = "visible"
+        if mode == "full":
+            self.page.screenshot(path=screenshot_path, full_page=True)
+            print(f"  ✓ Full page screenshot saved")
+        elif mode == "visible":
+            self.page.screenshot(path=screenshot_path, full_page=False)
+            print(f"  ✓ Visible area screenshot saved")
+        
+        if mode != "elements" and self.crop_to_chat_panel and self.chat_panel_selector:
+            self.last_capture_box = self.get_element_box(self.chat_panel_selector, full_page=(mode == "full"))
+        return mode
+    
+    def _ask_manual_navigation(self, order_number):
+        """Ask the operator to open the order chat in the browser"""
+        self._block_resources(False)
+        print(f"\n" + "="*50)
+        print(f"MANUAL NAVIGATION REQUIRED")
+        print("="*50)
+        print(f"\nDi browser yang terbuka:")
+        print(f"1. Cari pesanan dengan nomor: {order_number}")
+        print(f"2. Buka detail pesanan tersebut")
+        print(f"3. Klik tab/tombol 'Chat' (biasanya di pojok kanan)")
+        print(f"4. Pastikan chat dengan pembeli terlihat di layar")
+        print(f"5. Scroll ke bagian chat yang menunjukkan konfirmasi pembeli")
+        print(f"6. Tekan Enter di sini untuk mengambil screenshot")
+        print("="*50)
+        print("\nTips: Screenshot akan mengambil seluruh halaman yang terlihat")
+        print("Pastikan informasi penting (nomor pesanan + chat) terlihat!")
+        
+        self._input("\nTekan Enter setelah chat terbuka dan siap di-screenshot...")
+    
+    def navigate_to_order_chat(self, order_number, timeout=None):
+        """
+        Open the order detail page and the chat with the buyer, without the operator
+        
+        The order ID comes from the "Perlu Dikirim" list (get_orders_to_ship)
+        or, if unknown, from the order search results. Every step waits for a
+        concrete condition (URL loaded, order number visible, chat panel
+        visible) instead of a fixed delay.
+        
+        Args:
+            order_number: Order number (OrderSN)
+            timeout: Milliseconds to wait for each step ([TIMEOUTS]
+                ORDER_CHAT if None)
+            
+        Returns:
+            bool: True if the chat is open, False if manual navigation is needed
+        """
+        timeout = timeout or self.timeouts['order_chat']
+        try:
+            order_id = self.order_ids.get(order_number) or self._lookup_order_id(order_number, timeout)
+            if not order_id:
+                print(f"  ⚠ Order ID untuk {order_number} tidak ditemukan")
+                return False
+            
+            # The detail page is captured: load it complete
+            self._block_resources(False)
+            url = self.order_detail_url.format(order_id=order_id, order_sn=order_number)
+            self.page.goto(url, timeout=timeout, wait_until='domcontentloaded')
+            self.page.get_by_text(order_number).first.wait_for(state='visible', timeout=timeout)
+            
+            if self.chat_button_selector:
+                self.page.locator(self.chat_button_selector).first.click(timeout=timeout)
+            if self.chat_panel_selector:
+                self.page.locator(self.chat_panel_selector).first.wait_for(state='visible', timeout=timeout)
+            self._wait_for_network_idle(timeout)
+            return True
+        except PlaywrightError as e:
+            print(f"  ⚠ Navigasi otomatis gagal: {str(e).splitlines()[0]}")
+            return False
+    
+    def _lookup_order_id(self, order_number, timeout):
+        """Search the order list for an order number and read its ID from the XHR response"""
+        found = []
+        
+        def on_response(response):
+            if self.order_api_pattern.search(response.url) and 'json' in response.headers.get('content-type', ''):
+                try:
+                    found.extend(extract_orders_from_json(response.json()))
+                except Exception:
+                    pass
+        
+        self.page.on("response", on_response)
+        try:
+            url = self.order_search_url.format(order_sn=order_number)
+            self.page.goto(url, timeout=timeout, wait_until='domcontentloaded')
+            self._wait_for_network_idle(timeout)
+        finally:
+            self.page.remove_listener("response", on_response)
+        
+        for order in found:
+            if order['order_id']:
+                self.order_ids.setdefault(order['order_sn'], order['order_id'])
+        return self.order_ids.get(order_number)
+    
+    def capture_elements(self, screenshot_path, selectors, timeout=5000):
+        """
+        Screenshot only the given elements and stitch them into one image
+        
+        Args:
+            screenshot_path: Where to save the PNG
+            selectors: CSS selectors, captured top to bottom in this order
+            timeout: Milliseconds to wait for each element to be visible
+            
+        Returns:
+            bool: True if all elements were captured
+        """
+        if not selectors:
+            return False
+        
+        locators = [self.page.locator(selector).first for selector in selectors]
+        try:
+            for locator in locators:
+                locator.wait_for(state='visible', timeout=timeout)
+        except PlaywrightTimeout:
+            return False
+        
+        try:
+            import PIL  # noqa: F401
+            from image_pipeline import stitch_images
+        except ImportError:
+            stitch_images = None
+        
+        if len(locators) == 1:
+            locators[0].screenshot(path=screenshot_path, timeout=timeout, animations='disabled')
+        elif stitch_images:
+            shots = [locator.screenshot(timeout=timeout, animations='disabled') for locator in locators]
+            stitch_images(shots, screenshot_path)
+        else:
+            # Without Pillow: one clip rectangle around all elements
+            boxes = [locator.bounding_box() for locator in locators]
+            left = min(b['x'] for b in boxes)
+            top = min(b['y'] for b in boxes)
+            right = max(b['x'] + b['width'] for b in boxes)
+            bottom = max(b['y'] + b['height'] for b in boxes)
+            self.page.screenshot(
+                path=screenshot_path,
+                clip={'x': left, 'y': top, 'width': right - left, 'height': bottom - top}
+            )
+        return True
+    
+    def get_element_box(self, selector, full_page=False):
+        """
+        Get the position of an element in screenshot pixels
+        
+        Args:
+            selector: CSS selector of the element
+            full_page: Whether the screenshot covers the whole page (adds scroll offset)
+            
+        Returns:
+            tuple: (left, top, right, bottom), or None if the element is not visible
+        """
+        try:
+            box = self.page.locator(selector).first.bounding_box(timeout=2000)
+        except PlaywrightTimeout:
+            return None
+        if not box:
+            return None
+        
+        left, top = box['x'], box['y']
+        if full_page:
+            scroll_x, scroll_y = self.page.evaluate('[window.scrollX, window.scrollY]')
+            left, top = left + scroll_x, top + scroll_y
+        scale = self.page.evaluate('window.devicePixelRatio') or 1
+        return (left * scale, top * scale, (left + box['width']) * scale, (top + box['height']) * scale)
     
     def close_browser(self):
-        """Close the browser"""
-        if self.browser:
+        """Close the browser (or only disconnect from a Chrome reused over CDP); no-op once closed"""
+        if not self.playwright:
+            return
+        if self.cdp_browser:
+            if self.resource_filter:
+                self.browser.unroute('**/*')
+            self.cdp_browser.close()
+        elif self.browser:
             self.browser.close()
-        if self.playwright:
-            self.playwright.stop()
+        self.playwright.stop()
+        self.playwright = self.browser = self.cdp_browser = None
         print("\n✓ Browser closed")
@@ -2,36 +2,62 @@
 Helper script to start Chrome with remote debugging enabled
 Run this first before running shopee_automation.py
 """
+import shutil
 import subprocess
 import os
 import time
 import sys
 
+from check_chrome import DEBUGGING_PORT, find_debugging_endpoint
+
+# Process names of Chrome/Chromium on Windows and Linux
+CHROME_PROCESS_NAMES = ('chrome.exe', 'chrome', 'google-chrome', 'chromium', 'chromium-browser')
+
+# Executables looked up on PATH (Linux)
+LINUX_CHROME_COMMANDS = ('google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser')
+
+
 def check_chrome_running():
     """Check if Chrome is already running"""
     import psutil
     for proc in psutil.process_iter(['name']):
-        if 'chrome.exe' in proc.info['name'].lower():
+        if (proc.info['name'] or '').lower() in CHROME_PROCESS_NAMES:
             return True
     return False
 
-def start_chrome_with_debugging():
-    """Start Chrome with remote debugging port"""
-    
-    chrome_paths = [
-        r"C:\Program Files\Google\Chrome\Application\chrome.exe",
-        r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
-        os.path.expanduser(r"~\AppData\Local\Google\Chrome\Application\chrome.exe")
-    ]
+
+def find_chrome():
+    """Path of the Chrome executable, or None if not found"""
+    if sys.platform == 'win32':
+        chrome_paths = [
+            r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+            r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
+            os.path.expanduser(r"~\AppData\Local\Google\Chrome\Application\chrome.exe")
+        ]
+    else:
+        chrome_paths = [shutil.which(command) for command in LINUX_CHROME_COMMANDS]
     
-    chrome_path = None
     for path in chrome_paths:
-        if os.path.exists(path):
-            chrome_path = path
-            break
+        if path and os.path.exists(path):
+            return path
+    return None
+
+
+def default_chrome_user_data():
+    """Chrome's own profile folder, so the debugging Chrome keeps your logins"""
+    if sys.platform == 'win32':
+        return os.path.expanduser(r"~\AppData\Local\Google\Chrome\User Data")
+    return os.path.expanduser("~/.config/google-chrome")
+
+
+def start_chrome_with_debugging():
+    """Start Chrome with remote debugging port"""
     
+    chrome_path = find_chrome()
     if not chrome_path:
         print("✗ Chrome not found!")
+        if sys.platform != 'win32':
+            print("  Install google-chrome or chromium, or put it on PATH.")
         return
     
     print("="*70)
@@ -54,27 +80,38 @@ def start_chrome_with_debugging():
         input("Press Enter to continue...")
     
     print("\nStarting Chrome with debugging enabled...")
-    print("Remote debugging port: 9222")
+    print(f"Remote debugging port: {DEBUGGING_PORT}")
     print("\nIMPORTANT: Keep this Chrome window open!")
     print("="*70)
     
     # Start Chrome with remote debugging
-    user_data = os.path.expanduser(r"~\AppData\Local\Google\Chrome\User Data")
+    user_data = default_chrome_user_data()
     
     cmd = [
         chrome_path,
-        f'--remote-debugging-port=9222',
+        f'--remote-debugging-port={DEBUGGING_PORT}',
         f'--user-data-dir={user_data}',
         '--remote-allow-origins=*'
     ]
     
     try:
         process = subprocess.Popen(cmd, shell=False)
-        time.sleep(3)  # Wait for Chrome to start
+        
+        # Wait until the debugging endpoint answers
+        endpoint = None
+        deadline = time.monotonic() + 30
+        while not endpoint and process.poll() is None and time.monotonic() < deadline:
+            endpoint = find_debugging_endpoint(timeout=0.5)
+            if not endpoint:
+                time.sleep(0.2)
+        if not endpoint:
+            print("✗ Chrome did not open the debugging port (already running with this profile?)")
+            return
         
         print("\n✓ Chrome started!")
         print(f"✓ Process ID: {process.pid}")
-        print(f"✓ Debugging port: 9222")
+        print(f"✓ Debugging endpoint: {endpoint}")
+        print(f"  Set CDP_URL={endpoint} in [BROWSER] of config.ini")
         print("\nYou can now run in another terminal:")
         print("  python shopee_automation.py")
         print("\n⚠ Don't close this Chrome window until automation is done!")
@@ -0,0 +1,510 @@
+"""
+Evidence stores for the uploaded screenshots.
+
+StorageBackend is the interface the upload path works against: upload a file
+and get a shareable link, find an earlier upload by content hash, and share
+files. DriveStorage (Google Drive, the default), LocalStorage and S3Storage
+implement it. The Google client libraries are only imported once Drive is used.
+
+Local and S3 objects are stored under "<sha256>/<file name>", so the content
+hash doubles as the lookup key and an identical screenshot is stored once.
+"""
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import quote
+
+from drive_service import LazyDriveService
+from retry import AdaptiveRateLimiter, Retrier, is_retryable, retry_after_seconds
+from upload_manifest import file_sha256
+
+MB = 1024 * 1024
+
+# S3 multipart limits: parts are at least 5 MB (except the last one)
+S3_MIN_PART_SIZE = 5 * MB
+DEFAULT_MULTIPART_THRESHOLD = 8 * MB
+DEFAULT_MULTIPART_CHUNK = 8 * MB
+DEFAULT_MULTIPART_CONCURRENCY = 4
+
+# Presigned links are valid for at most 7 days
+DEFAULT_LINK_EXPIRY = 7 * 24 * 3600
+
+# Anyone with the link can view the file
+ANYONE_WITH_LINK = {
+    'type': 'anyone',
+    'role': 'reader'
+}
+
+# Google's batch endpoint accepts at most 100 calls per request
+DRIVE_BATCH_LIMIT = 100
+
+# Files up to this size are sent in one multipart request (metadata and
+# content together); larger ones use a resumable upload session, which costs
+# an extra round trip to open but can continue after a failed chunk
+SIMPLE_UPLOAD_MAX_SIZE = 2 * MB
+
+# Bytes per request of a resumable upload (a multiple of 256 KB); a failed
+# chunk is sent again, the chunks before it are not
+UPLOAD_CHUNK_SIZE = 16 * MB
+
+
+class StorageBackend:
+    """
+    Base class of the evidence stores.
+
+    upload() and find_by_hash() return the same metadata dict as the Drive
+    API ({'id': ..., 'webViewLink': ...}), which is what UploadManifest records.
+    """
+    name = 'storage'
+    # True if links only work after share() (Drive); False if they work right away
+    share_required = False
+    # upload() makes the link viewable (DriveStorage: unless sharing is batched)
+    share_on_upload = True
+
+    def upload(self, file_path, sha256=None):
+        """
+        Store a file
+
+        Args:
+            file_path: File to upload
+            sha256: Hex SHA-256 of the file, computed if not given
+
+        Returns:
+            dict: 'id' and 'webViewLink' of the stored file, or None if it failed
+        """
+        raise NotImplementedError
+
+    def find_by_hash(self, sha256):
+        """Metadata of a file stored earlier with this SHA-256, or None"""
+        return None
+
+    def share(self, file_ids):
+        """
+        Make stored files viewable by anyone with the link
+
+        Args:
+            file_ids: Dict mapping a key (e.g. order number) to a file 'id'
+
+        Returns:
+            dict: Key -> error message for every file that could not be shared
+        """
+        return {}
+
+    def close(self):
+        """Release connections held by the backend (called when a run ends)"""
+
+
+class LocalStorage(StorageBackend):
+    name = 'local'
+
+    def __init__(self, root='evidence', base_url=None):
+        """
+        Store screenshots in a local folder, optionally served over HTTP
+
+        Args:
+            root: Folder the files are copied to
+            base_url: URL the folder is served at (e.g. by nginx or
+                "python -m http.server --directory evidence"). Links are
+                file:// URIs when not given.
+        """
+        self.root = Path(root)
+        self.base_url = base_url.rstrip('/') if base_url else None
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _metadata(self, file_id):
+        if self.base_url:
+            link = f"{self.base_url}/{quote(file_id)}"
+        else:
+            link = (self.root / file_id).resolve().as_uri()
+        return {'id': file_id, 'webViewLink': link}
+
+    def upload(self, file_path, sha256=None):
+        sha256 = sha256 or file_sha256(file_path)
+        file_id = f"{sha256}/{os.path.basename(file_path)}"
+        target = self.root / file_id
+        if not target.exists():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            # Copy next to the target and rename, so a crash never leaves half a file
+            fd, tmp_path = tempfile.mkstemp(dir=target.parent, suffix='.part')
+            try:
+                with os.fdopen(fd, 'wb') as tmp, open(file_path, 'rb') as src:
+                    shutil.copyfileobj(src, tmp, 1 * MB)
+                os.replace(tmp_path, target)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        print(f"✓ Stored: {file_id}")
+        return self._metadata(file_id)
+
+    def find_by_hash(self, sha256):
+        folder = self.root / sha256
+        if not folder.is_dir():
+            return None
+        for path in sorted(folder.iterdir()):
+            if path.is_file() and not path.name.endswith('.part'):
+                return self._metadata(f"{sha256}/{path.name}")
+        return None
+
+
+class S3Storage(StorageBackend):
+    name = 's3'
+
+    def __init__(self, bucket, prefix='', client=None, endpoint_url=None, region=None,
+                 access_key=None, secret_key=None, public_base_url=None,
+                 link_expiry=DEFAULT_LINK_EXPIRY,
+                 multipart_threshold=DEFAULT_MULTIPART_THRESHOLD,
+                 multipart_chunk=DEFAULT_MULTIPART_CHUNK,
+                 multipart_concurrency=DEFAULT_MULTIPART_CONCURRENCY):
+        """
+        Store screenshots in an S3-compatible bucket (AWS S3, MinIO, R2, ...)
+
+        Args:
+            bucket: Bucket name
+            prefix: Key prefix, e.g. "shopee/"
+            client: boto3 S3 client (or a compatible stand-in). Created from
+                the remaining arguments if not given; boto3 is only needed then.
+            endpoint_url: Endpoint of an S3-compatible server, e.g. http://127.0.0.1:9000
+            region: Bucket region
+            access_key: Access key (default: the usual AWS credential chain)
+            secret_key: Secret key
+            public_base_url: URL the bucket is publicly readable at. Links
+                are presigned GET URLs valid for link_expiry seconds when not given.
+            link_expiry: Lifetime of presigned links in seconds (max 7 days)
+            multipart_threshold: Files from this size up are uploaded in parts
+            multipart_chunk: Part size (at least 5 MB)
+            multipart_concurrency: Parts uploaded at the same time per file
+        """
+        self._owns_client = client is None
+        if client is None:
+            try:
+                import boto3
+            except ImportError:
+                raise RuntimeError("boto3 is not installed (pip install boto3), needed for [STORAGE] BACKEND=s3")
+            client = boto3.client(
+                's3', endpoint_url=endpoint_url, region_name=region,
+                aws_access_key_id=access_key, aws_secret_access_key=secret_key,
+            )
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+        self.public_base_url = public_base_url.rstrip('/') if public_base_url else None
+        self.link_expiry = min(int(link_expiry), DEFAULT_LINK_EXPIRY)
+        self.multipart_threshold = max(int(multipart_threshold), S3_MIN_PART_SIZE)
+        self.multipart_chunk = max(int(multipart_chunk), S3_MIN_PART_SIZE)
+        self.multipart_concurrency = max(1, int(multipart_concurrency))
+
+    def close(self):
+        # A client passed in belongs to the caller
+        if self._owns_client and hasattr(self.client, 'close'):
+            self.client.close()
+
+    def _metadata(self, key):
+        if self.public_base_url:
+            link = f"{self.public_base_url}/{quote(key)}"
+        else:
+            link = self.client.generate_presigned_url(
+                'get_object', Params={'Bucket': self.bucket, 'Key': key}, ExpiresIn=self.link_expiry
+            )
+        return {'id': key, 'webViewLink': link}
+
+    def upload(self, file_path, sha256=None):
+        sha256 = sha256 or file_sha256(file_path)
+        key = f"{self.prefix}{sha256}/{os.path.basename(file_path)}"
+        size = os.path.getsize(file_path)
+        if size < self.multipart_threshold:
+            with open(file_path, 'rb') as f:
+                self.client.put_object(Bucket=self.bucket, Key=key, Body=f.read(), Metadata={'sha256': sha256})
+        else:
+            self._upload_multipart(file_path, key, size, sha256)
+        print(f"✓ Uploaded: {key}")
+        return self._metadata(key)
+
+    def _upload_multipart(self, file_path, key, size, sha256):
+        upload_id = self.client.create_multipart_upload(
+            Bucket=self.bucket, Key=key, Metadata={'sha256': sha256}
+        )['UploadId']
+
+        def upload_part(part_number):
+            # Every part opens its own handle, so parts are read in parallel
+            with open(file_path, 'rb') as f:
+                f.seek((part_number - 1) * self.multipart_chunk)
+                body = f.read(self.multipart_chunk)
+            response = self.client.upload_part(
+                Bucket=self.bucket, Key=key, UploadId=upload_id, PartNumber=part_number, Body=body
+            )
+            return {'PartNumber': part_number, 'ETag': response['ETag']}
+
+        part_count = -(-size // self.multipart_chunk)
+        try:
+            with ThreadPoolExecutor(max_workers=min(self.multipart_concurrency, part_count)) as executor:
+                parts = list(executor.map(upload_part, range(1, part_count + 1)))
+            self.client.complete_multipart_upload(
+                Bucket=self.bucket, Key=key, UploadId=upload_id, MultipartUpload={'Parts': parts}
+            )
+        except BaseException:
+            # Unfinished parts are billed until the upload is aborted
+            self.client.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+            raise
+
+    def find_by_hash(self, sha256):
+        response = self.client.list_objects_v2(Bucket=self.bucket, Prefix=f"{self.prefix}{sha256}/", MaxKeys=1)
+        contents = response.get('Contents') or []
+        return self._metadata(contents[0]['Key']) if contents else None
+
+
+def drive_errors():
+    """Errors of a Drive call that are reported instead of ending the run"""
+    from googleapiclient.errors import HttpError
+    return (HttpError, ConnectionError, TimeoutError)
+
+
+def upload_file_to_gdrive(service, file_path, folder_id, share=True, properties=None, retrier=None,
+                          simple_upload_max=None, chunk_size=None, timer=None):
+    """
+    Uploads a file to Google Drive and returns its metadata.
+
+    Args:
+        service: Google Drive API service object
+        file_path: Path to the file to upload
+        folder_id: ID of the Google Drive folder to upload to
+        share: Grant "anyone with the link" access right away. Pass False
+            when permissions are granted later with share_gdrive_files_batch()
+        properties: Optional appProperties stored with the file (e.g. its SHA-256)
+        retrier: Retrier for transient errors (default: Retrier())
+        simple_upload_max: Largest file in bytes sent as a single multipart
+            request (default: SIMPLE_UPLOAD_MAX_SIZE)
+        chunk_size: Bytes per request of a resumable upload (default: UPLOAD_CHUNK_SIZE)
+        timer: Optional StepTimer ('upload_multipart' / 'upload_resumable' steps)
+
+    Returns:
+        dict: File metadata with 'id' and 'webViewLink', or None if upload fails
+    """
+    from googleapiclient.http import MediaFileUpload
+
+    retrier = retrier or Retrier()
+    if simple_upload_max is None:
+        simple_upload_max = SIMPLE_UPLOAD_MAX_SIZE
+    try:
+        file_name = os.path.basename(file_path)
+        file_metadata = {
+            'name': file_name,
+            'parents': [folder_id]
+        }
+        if properties:
+            file_metadata['appProperties'] = properties
+
+        resumable = os.path.getsize(file_path) > simple_upload_max
+        if resumable:
+            media = MediaFileUpload(file_path, chunksize=chunk_size or UPLOAD_CHUNK_SIZE, resumable=True)
+        else:
+            media = MediaFileUpload(file_path, resumable=False)
+        request = service.files().create(
+            body=file_metadata,
+            media_body=media,
+            fields='id, webViewLink'
+        )
+        start = time.perf_counter()
+        if resumable:
+            # Retrying next_chunk() on the same request continues the upload
+            # from the last byte Drive acknowledged instead of starting over
+            file = None
+            while file is None:
+                _, file = retrier.call(request.next_chunk)
+        else:
+            file = retrier.call(request.execute)
+        if timer:
+            timer.record('upload_resumable' if resumable else 'upload_multipart', time.perf_counter() - start)
+
+        # Make the file accessible to anyone with the link
+        if share:
+            retrier.call(service.permissions().create(
+                fileId=file.get('id'),
+                body=ANYONE_WITH_LINK
+            ).execute)
+
+        print(f"✓ Uploaded: {file_name}")
+        return file
+
+    except drive_errors() as error:
+        print(f"✗ Error uploading {file_path}: {error}")
+        return None
+
+
+def share_gdrive_files_batch(service, file_ids, batch_size=DRIVE_BATCH_LIMIT, retrier=None):
+    """
+    Makes files accessible to anyone with the link using batch requests.
+
+    Args:
+        service: Google Drive API service object
+        file_ids: Dict mapping a key (e.g. order number) to a Drive file ID
+        batch_size: Number of permission calls per batch request (max 100)
+        retrier: Retrier for transient errors (default: Retrier()). Calls of
+            a batch that fail with a rate limit or server error are sent
+            again in a later batch.
+
+    Returns:
+        dict: Key -> error message for every file that could not be shared.
+            Empty if all permissions were granted.
+    """
+    batch_size = max(1, min(int(batch_size), DRIVE_BATCH_LIMIT))
+    retrier = retrier or Retrier()
+    pending = list(file_ids)
+    errors = {}
+
+    for attempt in range(retrier.max_attempts):
+        keys = pending
+        retry = {}
+
+        def callback(request_id, response, exception):
+            if exception is None:
+                return
+            key = keys[int(request_id)]
+            if is_retryable(exception):
+                retry[key] = exception
+            errors[key] = str(exception)
+
+        for start in range(0, len(keys), batch_size):
+            batch = service.new_batch_http_request(callback=callback)
+            for index in range(start, min(start + batch_size, len(keys))):
+                batch.add(
+                    service.permissions().create(
+                        fileId=file_ids[keys[index]],
+                        body=ANYONE_WITH_LINK
+                    ),
+                    request_id=str(index)
+                )
+            try:
+                retrier.call(batch.execute)
+            except drive_errors() as error:
+                # The whole batch request failed, none of its calls were applied
+                for index in range(start, min(start + batch_size, len(keys))):
+                    errors.setdefault(keys[index], str(error))
+
+        pending = list(retry)
+        if not pending or attempt + 1 == retrier.max_attempts:
+            break
+        for key in pending:
+            del errors[key]
+        # Wait as long as the most demanding Retry-After of the failed calls
+        slowest = max(retry.values(), key=lambda error: retry_after_seconds(error) or 0)
+        retrier.wait(attempt, slowest)
+
+    return errors
+
+
+def is_folder_shared_by_link(service, folder_id, retrier=None):
+    """
+    Checks whether a Google Drive folder is viewable by anyone with the link.
+    Files uploaded into such a folder inherit its sharing.
+
+    Args:
+        service: Google Drive API service object
+        folder_id: ID of the Google Drive folder
+        retrier: Retrier for transient errors (default: Retrier())
+
+    Returns:
+        bool: True if the folder has an "anyone" permission
+    """
+    retrier = retrier or Retrier()
+    try:
+        result = retrier.call(service.permissions().list(
+            fileId=folder_id,
+            fields='permissions(type, role)'
+        ).execute)
+    except drive_errors() as error:
+        print(f"✗ Error checking sharing of folder {folder_id}: {error}")
+        return False
+
+    return any(
+        permission.get('type') == 'anyone'
+        and permission.get('role') in ('reader', 'commenter', 'writer')
+        for permission in result.get('permissions', [])
+    )
+
+
+class DriveStorage(StorageBackend):
+    name = 'drive'
+    share_required = True
+
+    def __init__(self, creds, folder_id, share=True, discovery_path=None, retrier=None,
+                 simple_upload_max=SIMPLE_UPLOAD_MAX_SIZE, chunk_size=UPLOAD_CHUNK_SIZE, timer=None):
+        """
+        Google Drive as evidence store
+
+        The Drive service object is not thread-safe, so every thread builds
+        its own service from the shared credentials on first use.
+
+        Args:
+            creds: Credentials from get_gdrive_credentials()
+            folder_id: ID of the Google Drive folder to upload to
+            share: Grant link access per file on upload (see upload_file_to_gdrive)
+            discovery_path: Optional local Drive v3 discovery document
+            retrier: Retrier shared by all threads, so they share one rate
+                limit (default: Retrier with an AdaptiveRateLimiter)
+            simple_upload_max: Largest file in bytes uploaded in a single
+                request; larger files use a resumable session
+            chunk_size: Bytes per request of a resumable upload
+            timer: Optional StepTimer recording upload time per strategy
+        """
+        self.creds = creds
+        self.folder_id = folder_id
+        self.share_on_upload = share
+        self.discovery_path = discovery_path
+        self.retrier = retrier or Retrier(limiter=AdaptiveRateLimiter())
+        self.simple_upload_max = simple_upload_max
+        self.chunk_size = chunk_size
+        self.timer = timer
+        self._local = threading.local()
+        self._services = []
+        self._services_lock = threading.Lock()
+
+    @property
+    def service(self):
+        service = getattr(self._local, 'service', None)
+        if service is None:
+            service = self._local.service = LazyDriveService(self.creds, self.discovery_path)
+            with self._services_lock:
+                self._services.append(service)
+        return service
+
+    def close(self):
+        # Every thread that uploaded holds its own HTTP connection
+        with self._services_lock:
+            services, self._services = self._services, []
+        for service in services:
+            service.close()
+        self._local = threading.local()
+
+    def upload(self, file_path, sha256=None):
+        sha256 = sha256 or file_sha256(file_path)
+        return upload_file_to_gdrive(
+            self.service, file_path, self.folder_id, share=self.share_on_upload,
+            properties={'sha256': sha256}, retrier=self.retrier,
+            simple_upload_max=self.simple_upload_max, chunk_size=self.chunk_size, timer=self.timer
+        )
+
+    def find_by_hash(self, sha256):
+        query = (
+            f"'{self.folder_id}' in parents and trashed = false and "
+            f"appProperties has {{ key='sha256' and value='{sha256}' }}"
+        )
+        try:
+            result = self.retrier.call(
+                self.service.files().list(q=query, fields='files(id, webViewLink)', pageSize=1).execute
+            )
+        except drive_errors() as error:
+            print(f"✗ Error searching Google Drive for {sha256[:12]}: {error}")
+            return None
+        files = result.get('files', [])
+        return files[0] if files else None
+
+    def share(self, file_ids):
+        return share_gdrive_files_batch(self.service, file_ids, retrier=self.retrier)
+
+    def folder_is_shared(self):
+        """True if the upload folder is viewable by anyone with the link"""
+        return is_folder_shared_by_link(self.service, self.folder_id, retrier=self.retrier)
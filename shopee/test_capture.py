@@ -0,0 +1,51 @@
+"""
+Tests untuk screenshot elemen (header pesanan + panel chat) pada fixture HTML lokal
+"""
+import pytest
+
+from conftest import fixture_url
+from shopee_module import ShopeeAutomation
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def _shopee(page, **kwargs):
+    shopee = ShopeeAutomation("user", "pass", **kwargs)
+    shopee.page = page
+    return shopee
+
+
+def test_elements_mode_stitches_header_and_chat(page, tmp_path, monkeypatch):
+    page.goto(fixture_url("order_chat.html"))
+    shopee = _shopee(
+        page,
+        capture_mode="elements",
+        order_header_selector="[data-testid=order-header]",
+        chat_panel_selector="[data-testid=chat-panel]",
+    )
+    monkeypatch.setattr("builtins.input", lambda *args: "")
+
+    path = shopee.take_chat_screenshot("2504226A23B55PX", str(tmp_path))
+
+    with Image.open(path) as image:
+        # 600px wide header, 90px + 8px gap + 560px chat panel
+        assert image.size == (600, 90 + 8 + 560)
+
+
+def test_elements_mode_falls_back_to_visible_area(page, tmp_path, monkeypatch):
+    page.goto(fixture_url("order_chat.html"))
+    shopee = _shopee(page, capture_mode="elements", chat_panel_selector="#missing")
+    monkeypatch.setattr(ShopeeAutomation, "capture_elements",
+                        lambda self, path, selectors, timeout=5000: False)
+    monkeypatch.setattr("builtins.input", lambda *args: "")
+
+    path = shopee.take_chat_screenshot("2504226A23B55PX", str(tmp_path))
+
+    with Image.open(path) as image:
+        assert image.size == (1280, 720)
+
+
+def test_capture_elements_times_out_on_missing_selector(page, tmp_path):
+    page.goto(fixture_url("order_chat.html"))
+    shopee = _shopee(page)
+    assert not shopee.capture_elements(str(tmp_path / "x.png"), ["#missing"], timeout=200)
@@ -0,0 +1,55 @@
+"""
+Tests untuk mode CDP: deteksi endpoint debugging, lokasi Chrome di Linux dan
+Chrome CDP yang dipakai ulang oleh tab bersamaan
+"""
+import os
+import stat
+
+from check_chrome import find_debugging_endpoint, get_debugging_info
+import start_chrome
+
+
+def test_debugging_info_from_endpoint(fixture_server):
+    info = get_debugging_info(fixture_server + "/")
+
+    assert info["webSocketDebuggerUrl"].startswith("ws://")
+
+
+def test_unreachable_endpoint():
+    assert get_debugging_info("http://127.0.0.1:9", timeout=0.5) is None
+    assert find_debugging_endpoint(port=9, timeout=0.5) is None
+
+
+def test_finds_chrome_on_path_on_linux(tmp_path, monkeypatch):
+    chrome = tmp_path / "chromium"
+    chrome.write_text("#!/bin/sh\n")
+    chrome.chmod(chrome.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setattr(start_chrome.sys, "platform", "linux")
+    monkeypatch.setenv("PATH", str(tmp_path))
+
+    assert start_chrome.find_chrome() == str(chrome)
+    assert start_chrome.default_chrome_user_data().endswith(os.path.join(".config", "google-chrome"))
+
+
+def test_concurrent_tabs_reuse_cdp_chrome(tmp_path, monkeypatch):
+    import configparser
+    from unittest import mock
+
+    import shopee_async
+    import shopee_automation
+    from shopee_module import ShopeeAutomation
+    from timing import StepTimer
+
+    shopee = ShopeeAutomation('u', 'p', headless=True, auto_navigate=True, capture_mode='visible',
+                              cdp_url='http://127.0.0.1:9222', user_data_dir=str(tmp_path / 'profil'))
+    # Seperti setelah start_browser() tersambung lewat CDP
+    shopee.playwright, shopee.cdp_browser, shopee.browser = mock.Mock(), mock.Mock(), mock.Mock()
+    capture = mock.Mock(return_value=[None])
+    monkeypatch.setattr(shopee_async, 'capture_orders_concurrently', capture)
+    config = configparser.ConfigParser()
+    config.read_string("[NAVIGATION]\nCONCURRENT_TABS=3\n")
+
+    shopee_automation.capture_orders(config, shopee, ['A1'], str(tmp_path), lambda o, p: p, StepTimer())
+
+    assert shopee.cdp_browser is None
+    assert capture.call_args.kwargs['cdp_url'] == 'http://127.0.0.1:9222'
@@ -0,0 +1,138 @@
+"""
+Tests untuk subcommand CLI (capture, upload, report, run-all): tiap tahap
+melanjutkan dari manifest tahap sebelumnya, dan hanya meng-import dependency
+yang dipakai (diukur dengan python -X importtime)
+"""
+import os
+import subprocess
+import sys
+
+import shopee_automation
+from excel_report import iter_report_rows
+from upload_manifest import UploadManifest
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'shopee_automation.py')
+
+# Total import time allowed for "report" (interpreter startup, shopee_automation
+# and openpyxl). Loading Playwright or the Google libraries as well exceeds it.
+REPORT_IMPORT_BUDGET_SECONDS = 0.75
+
+HEAVY_MODULES = ('playwright', 'googleapiclient', 'google_auth_oauthlib', 'google.oauth2')
+
+CONFIG = """
+[SHOPEE]
+USERNAME=user
+PASSWORD=pass
+
+[GOOGLE_DRIVE]
+SHARE_MODE=file
+
+[STORAGE]
+BACKEND=local
+LOCAL_ROOT=evidence
+LOCAL_BASE_URL=https://bukti.example
+
+[UPLOAD]
+MANIFEST=upload_manifest.jsonl
+
+[METRICS]
+JSONL=run_metrics.jsonl
+"""
+
+
+def captured_run(workdir, orders):
+    """Workdir dengan manifest seperti setelah 'capture': satu run dan screenshot per pesanan"""
+    (workdir / 'config.ini').write_text(CONFIG)
+    (workdir / 'screenshots').mkdir()
+    manifest = UploadManifest(str(workdir / 'upload_manifest.jsonl'))
+    manifest.start_run(orders)
+    for order_number in orders:
+        path = workdir / 'screenshots' / f'{order_number}.png'
+        path.write_bytes(order_number.encode() * 100)
+        manifest.record_capture(order_number, os.path.join('screenshots', path.name))
+    return manifest
+
+
+def run_cli(workdir, *args):
+    """Jalankan shopee_automation.py dengan -X importtime di workdir"""
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(SCRIPT))
+    return subprocess.run(
+        [sys.executable, '-X', 'importtime', SCRIPT, *args],
+        cwd=workdir, env=env, stdin=subprocess.DEVNULL, capture_output=True, text=True, timeout=120,
+    )
+
+
+def import_times(stderr):
+    """Modul yang di-import -> waktu kumulatif (detik), dan total import top-level"""
+    modules = {}
+    total = 0.0
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        modules[name.strip()] = int(cumulative) / 1e6
+        if not name[1:].startswith(' '):
+            total += int(cumulative) / 1e6
+    return modules, total
+
+
+def test_upload_then_report_continue_from_the_manifest(tmp_path):
+    orders = ['251018A0000001', '251018A0000002']
+    captured_run(tmp_path, orders)
+
+    upload = run_cli(tmp_path, 'upload')
+    assert upload.returncode == 0, upload.stdout + upload.stderr
+    assert "2 of 2 orders uploaded to local" in upload.stdout
+    modules, _ = import_times(upload.stderr)
+    assert not [m for m in modules if m.startswith('playwright')]
+
+    manifest = UploadManifest(str(tmp_path / 'upload_manifest.jsonl'))
+    manifest.resume_run()
+    assert all(manifest.run_upload(o)['link'].startswith('https://bukti.example/') for o in orders)
+
+    report = run_cli(tmp_path, 'report')
+    assert report.returncode == 0, report.stdout + report.stderr
+    rows = list(iter_report_rows(str(tmp_path / 'shopee_report.xlsx')))
+    assert [row[1] for row in rows] == orders
+
+    # Tidak ada yang baru: laporan tidak bertambah
+    again = run_cli(tmp_path, 'report')
+    assert "No new orders to report" in again.stdout
+    assert len(list(iter_report_rows(str(tmp_path / 'shopee_report.xlsx')))) == 2
+
+
+def test_report_imports_only_what_it_needs(tmp_path):
+    manifest = captured_run(tmp_path, ['251018A0000001'])
+    manifest.record_upload('251018A0000001', 'abc', {'id': 'f1', 'webViewLink': 'https://bukti.example/f1'},
+                           'screenshots/251018A0000001.png', shared=True)
+
+    result = run_cli(tmp_path, 'report')
+    assert result.returncode == 0, result.stdout + result.stderr
+    modules, total = import_times(result.stderr)
+    assert 'openpyxl' in modules
+    assert not [m for m in modules if m.startswith(HEAVY_MODULES)]
+    assert total < REPORT_IMPORT_BUDGET_SECONDS, f"report imports took {total:.3f} s"
+
+
+def test_unshared_uploads_wait_for_upload_stage(tmp_path, monkeypatch, capsys):
+    manifest = captured_run(tmp_path, ['A1', 'A2'])
+    manifest.record_upload('A1', 'h1', {'id': 'f1', 'webViewLink': 'https://drive/f1'}, 'a1.png', shared=True)
+    manifest.record_upload('A2', 'h2', {'id': 'f2', 'webViewLink': 'https://drive/f2'}, 'a2.png', shared=False)
+    monkeypatch.chdir(tmp_path)
+
+    summary = {}
+    shopee_automation.run_report(shopee_automation.load_config(), summary=summary)
+    assert "A2: not shared yet" in capsys.readouterr().out
+    assert summary['reported'] == 1 and summary['missing'] == 1
+    assert [row[1] for row in iter_report_rows('shopee_report.xlsx')] == ['A1']
+
+
+def test_options_before_or_after_subcommand(tmp_path, monkeypatch, capsys):
+    (tmp_path / 'config.ini').write_text(CONFIG)
+    monkeypatch.chdir(tmp_path)
+
+    assert shopee_automation.main(['report', '--shop', 'toko_x']) == 1
+    assert shopee_automation.main(['--shop', 'toko_x', 'upload']) == 1
+    assert capsys.readouterr().out.count("No [SHOP toko_x] section") == 2
+    shopee_automation.main(['report', '--resume'])
+    assert "Nothing to report" in capsys.readouterr().out
@@ -0,0 +1,187 @@
+"""
+Tests untuk worker daemon: antrian SQLite, endpoint health/metrics, shutdown,
+export metrics saat berhenti dan batas percobaan batch yang gagal
+"""
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+import pytest
+
+import daemon as daemon_module
+from daemon import ShopeeBatchProcessor, ShopeeDaemon
+from job_queue import JobQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"))
+    yield queue
+    queue.close()
+
+
+def test_queue_claims_oldest_and_skips_pending_duplicates(queue):
+    assert queue.submit(["A", "B", "A", " ", "C"]) == 3
+    assert queue.submit(["B"]) == 0
+
+    jobs = queue.claim(2)
+    assert [order for _, order in jobs] == ["A", "B"]
+    assert queue.depth() == {"queued": 1, "running": 2, "done": 0, "failed": 0}
+
+    queue.finish(jobs[0][0], link="https://drive.google.com/a")
+    queue.finish(jobs[1][0], error="boom")
+    assert queue.submit(["A"]) == 1
+    assert queue.depth() == {"queued": 2, "running": 0, "done": 1, "failed": 1}
+
+
+def test_requeue_after_crash(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    first = JobQueue(path)
+    first.submit(["A", "B"])
+    first.claim(5)
+    first.close()
+
+    second = JobQueue(path)
+    assert second.requeue_running() == 2
+    assert [order for _, order in second.claim(5)] == ["A", "B"]
+    second.close()
+
+
+def _get(url):
+    with urllib.request.urlopen(url, timeout=5) as response:
+        return response.status, response.read().decode()
+
+
+def _wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_daemon_processes_submitted_orders(queue):
+    batches = []
+
+    def process(orders, stop_event):
+        batches.append(list(orders))
+        return {o: None if o == "BAD" else f"https://drive.google.com/{o}" for o in orders}
+
+    daemon = ShopeeDaemon(queue, process, batch_size=2, poll_interval=0.01, port=0)
+    thread = threading.Thread(target=daemon.run)
+    daemon.serve_http()
+    thread.start()
+    try:
+        base = f"http://127.0.0.1:{daemon.port}"
+        request = urllib.request.Request(
+            f"{base}/orders", data=json.dumps({"orders": ["A", "BAD", "C"]}).encode(), method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=5) as response:
+            assert json.load(response)["added"] == 3
+
+        _wait_for(lambda: queue.depth()["queued"] == 0 and daemon.current_batch == 0 and daemon.batches == 2)
+        status, body = _get(f"{base}/health")
+        assert status == 200
+        assert json.loads(body)["queue"] == {"queued": 0, "running": 0, "done": 2, "failed": 1}
+
+        status, metrics = _get(f"{base}/metrics")
+        assert 'shopee_jobs{status="done"} 2' in metrics
+        assert 'shopee_daemon_orders_total{result="failed"} 1' in metrics
+        assert batches == [["A", "BAD"], ["C"]]
+    finally:
+        daemon.stop()
+        thread.join(5)
+    assert not thread.is_alive()
+
+
+def test_stop_keeps_unstarted_orders_queued(queue):
+    queue.submit(["A", "B", "C"])
+    started = threading.Event()
+
+    def process(orders, stop_event):
+        started.set()
+        stop_event.wait(5)
+        # Only the first order was in progress when the stop arrived
+        return {orders[0]: "https://drive.google.com/A"}
+
+    daemon = ShopeeDaemon(queue, process, batch_size=3, poll_interval=0.01, port=0)
+    thread = threading.Thread(target=daemon.run)
+    thread.start()
+    started.wait(5)
+    daemon.stop()
+    thread.join(5)
+
+    assert queue.depth() == {"queued": 2, "running": 0, "done": 1, "failed": 0}
+
+
+def test_metrics_exported_on_shutdown(tmp_path, monkeypatch):
+    (tmp_path / "config.ini").write_text(
+        "[DAEMON]\nQUEUE=jobs.sqlite3\nPORT=0\n\n[METRICS]\nJSONL=run_metrics.jsonl\n"
+    )
+    monkeypatch.chdir(tmp_path)
+
+    def start(self):
+        import shopee_automation
+        self.app = shopee_automation
+        self.timer.record('login', 0.2)
+        self.ready = True
+
+    monkeypatch.setattr(ShopeeBatchProcessor, "start", start)
+    # Berhenti langsung, seperti setelah SIGTERM
+    monkeypatch.setattr(ShopeeDaemon, "run", lambda self: (self._server.shutdown(), self._server.server_close()))
+
+    assert daemon_module.main([]) == 0
+
+    spans = [json.loads(line) for line in (tmp_path / "run_metrics.jsonl").read_text().splitlines()]
+    assert [span["step"] for span in spans] == ["login"]
+
+
+def test_failing_batch_gives_up_after_max_attempts(queue):
+    queue.submit(["A", "B"])
+    attempts = []
+
+    def process(orders, stop_event):
+        attempts.append(list(orders))
+        raise RuntimeError("Drive unreachable")
+
+    daemon = ShopeeDaemon(queue, process, poll_interval=0.01, port=0, max_attempts=3)
+    for _ in range(5):
+        jobs = queue.claim(10)
+        if jobs:
+            daemon._run_batch(jobs)
+
+    assert attempts == [["A", "B"]] * 3
+    assert queue.depth() == {"queued": 0, "running": 0, "done": 0, "failed": 2}
+    assert daemon.processed["failed"] == 2
+
+
+def test_attempts_column_added_to_old_queue(tmp_path):
+    import sqlite3
+
+    path = str(tmp_path / "jobs.sqlite3")
+    db = sqlite3.connect(path)
+    db.execute("CREATE TABLE jobs (id INTEGER PRIMARY KEY AUTOINCREMENT, order_number TEXT NOT NULL, "
+               "status TEXT NOT NULL DEFAULT 'queued', submitted_at REAL NOT NULL, started_at REAL, "
+               "finished_at REAL, link TEXT, error TEXT)")
+    db.execute("INSERT INTO jobs (order_number, submitted_at) VALUES ('A', 0)")
+    db.commit()
+    db.close()
+
+    queue = JobQueue(path)
+    job_id, _ = queue.claim(1)[0]
+    assert queue.retry([job_id], "boom", max_attempts=1) == 1
+    queue.close()
+
+
+def test_submit_and_status_do_not_load_playwright(tmp_path):
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "daemon.py")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", script, "submit", "A1"],
+        cwd=tmp_path, capture_output=True, text=True, timeout=60,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "1 orders queued" in result.stdout
+    assert "playwright" not in result.stderr
@@ -0,0 +1,114 @@
+"""
+Tests untuk setup Google Drive tanpa network saat startup:
+discovery document lokal, service lazy dan refresh token di background
+"""
+import json
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from google.oauth2.credentials import Credentials
+
+import drive_service
+import shopee_automation
+from drive_service import LazyDriveService, TokenRefresher, build_drive_service, load_discovery_document
+from fake_drive import StubGoogleServer
+
+
+def make_creds(token_uri, token="old-token", expiry=None):
+    return Credentials(
+        token=token, refresh_token="refresh", token_uri=token_uri,
+        client_id="client", client_secret="secret", expiry=expiry,
+    )
+
+
+def test_discovery_document_is_parsed_once():
+    load_discovery_document.cache_clear()
+    first = load_discovery_document()
+    assert "files" in first["resources"]
+    assert load_discovery_document() is first
+
+
+def test_discovery_document_from_local_file(tmp_path):
+    path = tmp_path / "drive_v3.json"
+    path.write_text(json.dumps(load_discovery_document()))
+    service = build_drive_service(make_creds("http://127.0.0.1:9/token"), str(path))
+    assert hasattr(service.files(), "create")
+
+
+def test_service_is_built_on_first_use(monkeypatch):
+    built = []
+    monkeypatch.setattr(drive_service, "build_drive_service", lambda creds, path: built.append(creds) or "svc")
+
+    service = LazyDriveService("creds")
+    assert built == []
+    assert service.upper() == "SVC"
+    service.lower()
+    assert built == ["creds"]
+
+
+def test_closing_an_unused_service_builds_nothing(monkeypatch):
+    monkeypatch.setattr(drive_service, "build_drive_service", lambda creds, path: pytest.fail("built on close"))
+    LazyDriveService("creds").close()
+
+
+def test_get_credentials_does_not_refresh(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    expired = make_creds("http://127.0.0.1:9/token", expiry=datetime.utcnow() - timedelta(hours=1))
+    (tmp_path / "token.json").write_text(expired.to_json())
+
+    def no_network(self, request):
+        raise AssertionError("refreshed at startup")
+    monkeypatch.setattr(Credentials, "refresh", no_network)
+
+    creds = shopee_automation.get_gdrive_credentials()
+    assert creds.refresh_token == "refresh"
+    assert isinstance(shopee_automation.get_gdrive_service(creds), LazyDriveService)
+
+
+def test_seconds_until_refresh():
+    now = datetime(2025, 1, 1, 12, 0, 0)
+    creds = make_creds("unused", expiry=now + timedelta(minutes=30))
+    refresher = TokenRefresher(creds, margin=300)
+    assert refresher.seconds_until_refresh(now) == 25 * 60
+    assert refresher.seconds_until_refresh(now + timedelta(minutes=28)) == 0
+
+    creds.expiry = None
+    assert refresher.seconds_until_refresh(now) is None
+    creds.token = None
+    assert refresher.seconds_until_refresh(now) == 0
+
+
+def test_background_refresh_saves_token(tmp_path):
+    token_path = tmp_path / "token.json"
+    with StubGoogleServer() as stub:
+        creds = make_creds(stub.token_uri, expiry=datetime.utcnow() + timedelta(seconds=30))
+        refresher = TokenRefresher(creds, token_path=str(token_path), margin=300).start()
+        try:
+            deadline = time.monotonic() + 5
+            while refresher.refreshes == 0 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            # After one refresh the new token is valid for an hour, so the thread waits
+            assert refresher.refreshes == 1
+            assert refresher._thread.is_alive()
+        finally:
+            refresher.stop()
+
+    assert creds.token == "token-1"
+    assert stub.requests == ["/token"]
+    assert json.loads(token_path.read_text())["token"] == "token-1"
+
+
+def test_refresher_without_refresh_token_does_nothing():
+    creds = Credentials(token="only-access")
+    refresher = TokenRefresher(creds).start()
+    assert refresher._thread is None
+    refresher.stop()
+
+
+def test_refresh_now_without_saving():
+    with StubGoogleServer() as stub:
+        creds = make_creds(stub.token_uri)
+        TokenRefresher(creds, token_path=None).refresh_now()
+    assert creds.token == "token-1"
+    assert creds.expiry > datetime.utcnow()
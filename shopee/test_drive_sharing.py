@@ -0,0 +1,45 @@
+"""
+Tests untuk pemberian akses link Google Drive (per file dan batch)
+"""
+from fake_drive import FakeDriveService
+from storage import (
+    is_folder_shared_by_link,
+    share_gdrive_files_batch,
+    upload_file_to_gdrive,
+)
+
+
+def test_upload_without_share_skips_permission_call(tmp_path):
+    drive = FakeDriveService()
+    screenshot = tmp_path / "order.png"
+    screenshot.write_bytes(b"png")
+
+    file = upload_file_to_gdrive(drive, str(screenshot), 'folder', share=False)
+
+    assert file['webViewLink'].endswith(f"/{file['id']}/view")
+    assert [name for name, _ in drive.calls] == ['files.create']
+
+
+def test_batch_share_groups_calls_and_maps_errors():
+    drive = FakeDriveService()
+    file_ids = {f"ORDER{i}": f"file{i}" for i in range(250)}
+    drive.fail_permissions = {"file7", "file142"}
+
+    errors = share_gdrive_files_batch(drive, file_ids)
+
+    batches = [size for name, size in drive.calls if name == 'batch']
+    assert batches == [100, 100, 50]
+    assert set(errors) == {"ORDER7", "ORDER142"}
+    assert "403" in errors["ORDER7"]
+    assert len(drive.granted) == 248
+
+
+def test_folder_shared_by_link_check():
+    drive = FakeDriveService()
+    assert not is_folder_shared_by_link(drive, 'folder')
+
+    drive.granted['folder'] = [{'type': 'user', 'role': 'writer'}]
+    assert not is_folder_shared_by_link(drive, 'folder')
+
+    drive.granted['folder'].append({'type': 'anyone', 'role': 'reader'})
+    assert is_folder_shared_by_link(drive, 'folder')
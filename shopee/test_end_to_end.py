@@ -0,0 +1,44 @@
+"""
+Tests untuk fake Seller Centre dan benchmark end-to-end main() (offline)
+"""
+import json
+import pathlib
+import subprocess
+import sys
+from urllib.request import urlopen
+
+from fake_seller_centre import FakeSellerCentre
+from order_extraction import extract_orders_from_json, filter_orders
+
+BENCHMARK = pathlib.Path(__file__).parent / "benchmarks" / "bench_end_to_end.py"
+
+
+def _get(url):
+    with urlopen(url, timeout=5) as response:
+        return response.read().decode()
+
+
+def test_order_list_pages_match_the_seller_centre_format():
+    with FakeSellerCentre(orders=25, page_size=10) as seller_centre:
+        pages = [json.loads(_get(f"{seller_centre.url}/api/v3/order/list?page={page}")) for page in (1, 2, 3)]
+        search = json.loads(_get(f"{seller_centre.url}/api/v3/order/list?keyword=251018A0000007"))
+        detail = _get(seller_centre.order_detail_url.format(order_id=seller_centre.orders[7]['order_id']))
+
+    orders = filter_orders([order for page in pages for order in extract_orders_from_json(page)])
+    assert [order['order_sn'] for order in orders] == [order['order_sn'] for order in seller_centre.orders]
+    assert pages[2]['data']['pagination']['pages'] == 3
+    assert extract_orders_from_json(search)[0]['order_id'] == seller_centre.orders[7]['order_id']
+    assert "251018A0000007" in detail and 'data-testid="chat-panel"' in detail
+
+
+def test_main_runs_end_to_end_offline(chromium, tmp_path):
+    output = tmp_path / "results.jsonl"
+    subprocess.run(
+        [sys.executable, str(BENCHMARK), '--orders', '3', '--latency', '0', '--output', str(output)],
+        check=True, timeout=180,
+    )
+
+    result = json.loads(output.read_text())
+    assert result['orders_reported'] == 3
+    assert result['stages']['upload']['count'] == 3
+    assert result['peak_rss_mb'] > 0
@@ -0,0 +1,130 @@
+"""
+Tests untuk pembuatan dan append laporan Excel (template Shopee CS), termasuk
+laporan yang sudah diedit operator (nama sheet, kolom tambahan, style, sheet lain)
+dan laporan yang penuh dan dilanjutkan ke file part berikutnya
+"""
+import os
+
+import openpyxl
+
+from excel_report import HEADERS, create_excel_report, iter_report_rows
+from report_index import ReportIndex, part_path, report_parts
+
+
+def _orders(start, count):
+    return [
+        {'order_number': f"ORDER{i}", 'gdrive_link': f"https://drive.google.com/file/d/{i}/view"}
+        for i in range(start, start + count)
+    ]
+
+
+def test_create_then_append_keeps_template_and_numbering(tmp_path):
+    report = str(tmp_path / "report.xlsx")
+    create_excel_report(_orders(0, 3), report)
+    create_excel_report(_orders(3, 2), report)
+
+    ws = openpyxl.load_workbook(report).active
+    assert [ws.cell(1, c).value for c in (1, 2, 3)] == HEADERS
+    assert ws['A1'].font.bold
+    assert ws.column_dimensions['C'].width == 100
+    assert ws.row_dimensions[1].height == 80
+    assert [row for row in iter_report_rows(report)] == [
+        (i + 1, f"ORDER{i}", f"https://drive.google.com/file/d/{i}/view") for i in range(5)
+    ]
+
+
+def test_append_ignores_trailing_formatted_rows(tmp_path):
+    report = str(tmp_path / "report.xlsx")
+    create_excel_report(_orders(0, 2), report)
+
+    # Formatting empty rows bumps ws.max_row without adding data
+    wb = openpyxl.load_workbook(report)
+    ws = wb.active
+    for row in range(4, 20):
+        ws.cell(row, 2).font = openpyxl.styles.Font(italic=True)
+    wb.save(report)
+
+    create_excel_report(_orders(2, 1), report)
+    rows = list(iter_report_rows(report))
+    assert rows[-1] == (3, "ORDER2", "https://drive.google.com/file/d/2/view")
+    assert openpyxl.load_workbook(report).active.max_row == 4
+
+
+def test_append_keeps_sheet_name_extra_columns_and_styles(tmp_path):
+    report = str(tmp_path / "report.xlsx")
+    create_excel_report(_orders(0, 2), report)
+
+    wb = openpyxl.load_workbook(report)
+    ws = wb.active
+    ws.title = "Laporan"
+    ws['D1'] = "Catatan"
+    ws['D2'] = "cek ulang"
+    ws['B3'].fill = openpyxl.styles.PatternFill("solid", fgColor="FFFF00")
+    wb.save(report)
+
+    create_excel_report(_orders(2, 1), report)
+    ws = openpyxl.load_workbook(report).active
+    assert ws.title == "Laporan"
+    assert (ws['D1'].value, ws['D2'].value) == ("Catatan", "cek ulang")
+    assert ws['A1'].font.bold
+    assert ws['B3'].fill.fgColor.rgb == "00FFFF00"
+    assert [ws.cell(4, c).value for c in (1, 2, 4)] == [3, "ORDER2", None]
+
+
+def test_append_keeps_other_sheets(tmp_path):
+    report = str(tmp_path / "report.xlsx")
+    create_excel_report(_orders(0, 2), report)
+
+    wb = openpyxl.load_workbook(report)
+    wb.create_sheet("Rekap")['A1'] = "total"
+    wb.save(report)
+
+    create_excel_report(_orders(2, 2), report)
+    wb = openpyxl.load_workbook(report)
+    assert wb.sheetnames == ["Sheet1", "Rekap"]
+    assert wb["Rekap"]['A1'].value == "total"
+    assert list(iter_report_rows(report))[-2:] == [
+        (3, "ORDER2", "https://drive.google.com/file/d/2/view"),
+        (4, "ORDER3", "https://drive.google.com/file/d/3/view"),
+    ]
+
+
+def test_full_report_continues_in_next_part(tmp_path):
+    report = str(tmp_path / "report.xlsx")
+    create_excel_report(_orders(0, 3), report, max_rows=4)
+    mtime = os.stat(report).st_mtime_ns
+
+    written = create_excel_report(_orders(3, 6), report, max_rows=4)
+
+    assert written == str(tmp_path / "report_part3.xlsx")
+    assert report_parts(report) == [report, part_path(report, 2), part_path(report, 3)]
+    assert [row[1] for row in iter_report_rows(report)] == ["ORDER0", "ORDER1", "ORDER2", "ORDER3"]
+    # Setiap part punya header dan nomor urut sendiri
+    ws = openpyxl.load_workbook(part_path(report, 2)).active
+    assert [ws.cell(1, c).value for c in (1, 2, 3)] == HEADERS
+    assert [row[:2] for row in iter_report_rows(part_path(report, 2))] == [
+        (1, "ORDER4"), (2, "ORDER5"), (3, "ORDER6"), (4, "ORDER7"),
+    ]
+    assert list(iter_report_rows(written)) == [(1, "ORDER8", "https://drive.google.com/file/d/8/view")]
+
+    # Part yang sudah penuh tidak ditulis ulang, dan pesanan di part mana pun tidak ditulis dua kali
+    full = os.stat(report).st_mtime_ns
+    create_excel_report(_orders(0, 10), report, max_rows=4)
+    assert os.stat(report).st_mtime_ns == full != mtime
+    assert [row[1] for row in iter_report_rows(written)] == ["ORDER8", "ORDER9"]
+
+
+def test_oversized_report_is_not_rewritten(tmp_path):
+    report = str(tmp_path / "report.xlsx")
+    create_excel_report(_orders(0, 10), report)
+    mtime = os.stat(report).st_mtime_ns
+
+    # Laporan lama yang sudah lebih besar dari batas: data baru langsung ke part 2
+    create_excel_report(_orders(10, 1), report, max_rows=5)
+
+    assert os.stat(report).st_mtime_ns == mtime
+    assert list(iter_report_rows(part_path(report, 2))) == [(1, "ORDER10", "https://drive.google.com/file/d/10/view")]
+    index = ReportIndex(report)
+    assert index.part_rows() == [10, 1]
+    assert "ORDER3" in index and "ORDER10" in index
+    index.close()
@@ -0,0 +1,58 @@
+"""
+Tests untuk mode headless: opsi browser eksplisit dan cek sesi tanpa input()
+"""
+import pytest
+
+from shopee_module import (
+    DEFAULT_VIEWPORT,
+    InteractionRequired,
+    ShopeeAutomation,
+    persistent_context_options,
+)
+
+
+@pytest.fixture
+def no_input(monkeypatch):
+    monkeypatch.setattr("builtins.input", lambda message="": pytest.fail(f"unexpected prompt: {message}"))
+
+
+def test_context_options_honor_headless():
+    headed = persistent_context_options("data")
+    headless = persistent_context_options("data", headless=True, viewport={"width": 1280, "height": 800},
+                                          device_scale_factor=2)
+
+    assert headed["headless"] is False
+    assert "--start-maximized" in headed["args"]
+    assert headed["viewport"] == DEFAULT_VIEWPORT
+    assert headless["headless"] is True
+    assert "--start-maximized" not in headless["args"]
+    assert headless["viewport"] == {"width": 1280, "height": 800}
+    assert headless["device_scale_factor"] == 2
+
+
+def test_headless_never_prompts(no_input):
+    shopee = ShopeeAutomation("user", "pass", headless=True)
+
+    assert shopee.capture_mode == "visible"
+    assert shopee.auto_navigate
+    with pytest.raises(InteractionRequired):
+        shopee._input("Tekan Enter...")
+
+
+def test_session_probe_accepts_valid_session(page, fixture_server, no_input):
+    shopee = ShopeeAutomation("user", "pass", headless=True)
+    shopee.page = page
+    shopee.login_url = f"{fixture_server}/login.html"
+
+    assert shopee.check_session()
+    assert shopee.login()
+
+
+def test_expired_session_fails_fast(page, fixture_server, no_input):
+    shopee = ShopeeAutomation("user", "pass", headless=True, timeouts={"login_redirect": 2000})
+    shopee.page = page
+    shopee.login_url = f"{fixture_server}/login_expired.html"
+
+    assert not shopee.check_session()
+    with pytest.raises(InteractionRequired):
+        shopee.login()
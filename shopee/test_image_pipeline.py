@@ -0,0 +1,93 @@
+"""
+Tests untuk kompresi screenshot sebelum upload
+"""
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+import io  # noqa: E402
+
+from image_pipeline import ScreenshotCompressor, compress_screenshot, stitch_images  # noqa: E402
+
+
+def _screenshot(tmp_path, size=(1920, 1080)):
+    path = tmp_path / "order_20250101_120000.png"
+    image = Image.new("RGB", size, "white")
+    image.paste((30, 120, 200), (1400, 100, 1900, 1000))  # "chat panel"
+    image.save(path)
+    return str(path)
+
+
+def test_compress_crops_downscales_and_reencodes(tmp_path):
+    source = _screenshot(tmp_path)
+
+    output = compress_screenshot(source, 'webp', 80, max_width=250, crop_box=(1400, 100, 1900, 1000))
+
+    assert output.endswith(".webp")
+    with Image.open(output) as image:
+        assert image.format == "WEBP"
+        assert image.size == (250, 450)
+
+
+def test_png_output_does_not_overwrite_original(tmp_path):
+    source = _screenshot(tmp_path)
+    output = compress_screenshot(source, 'png')
+    assert output != source
+    assert output.endswith("_compressed.png")
+
+
+def test_compressor_runs_in_process_pool_and_can_be_disabled(tmp_path):
+    source = _screenshot(tmp_path)
+
+    compressor = ScreenshotCompressor(fmt='jpeg', quality=70, processes=1)
+    try:
+        output = compressor.process(source)
+    finally:
+        compressor.close()
+    assert output.endswith(".jpg")
+
+    assert ScreenshotCompressor(fmt='original').process(source) == source
+    assert ScreenshotCompressor(fmt='gif').process(source) == source
+
+
+def test_stitch_images_stacks_vertically(tmp_path):
+    parts = []
+    for size in ((600, 90), (360, 560)):
+        buffer = io.BytesIO()
+        Image.new("RGB", size, "red").save(buffer, "PNG")
+        parts.append(buffer.getvalue())
+
+    output = stitch_images(parts, str(tmp_path / "stitched.png"), gap=8)
+
+    with Image.open(output) as image:
+        assert image.size == (600, 90 + 8 + 560)
+        assert image.getpixel((500, 200)) == (255, 255, 255)
+
+
+def test_template_defaults_match_code_and_crop_is_opt_in(tmp_path):
+    import configparser
+    import os
+
+    from shopee_automation import make_screenshot_compressor, make_shopee_automation
+
+    template = configparser.ConfigParser()
+    template.read(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.ini.template'))
+    empty = configparser.ConfigParser()
+    empty.read_string("[SHOPEE]\nUSERNAME=u\nPASSWORD=p\n")
+    for config in (template, empty):
+        compressor = make_screenshot_compressor(config)
+        assert (compressor.fmt, compressor.max_width) == ('original', None)
+        compressor.close()
+
+    # Selector panel chat saja tidak memotong screenshot
+    empty.read_string("[SCREENSHOT]\nCHAT_PANEL_SELECTOR=.chat\n[BROWSER]\nUSER_DATA_DIR=" + str(tmp_path) + "\n")
+    shopee = make_shopee_automation(empty)
+    assert shopee.chat_panel_selector == '.chat' and not shopee.crop_to_chat_panel
+
+    class Page:
+        def screenshot(self, path, full_page=False):
+            open(path, 'wb').close()
+
+    shopee.page = Page()
+    assert shopee._capture(str(tmp_path / "a.png"), "visible") == "visible"
+    assert shopee.last_capture_box is None
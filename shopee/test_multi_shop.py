@@ -0,0 +1,144 @@
+"""
+Tests untuk mode multi-toko: config per toko dari section [SHOP <nama>],
+profil browser terpisah per akun, dan worker process paralel dengan
+ringkasan gabungan
+"""
+import configparser
+import os
+
+import shopee_automation
+from multi_shop import run_all_shops, shop_config, shop_names, shop_outputs
+from shopee_module import ShopeeAutomation
+
+CONFIG = """
+[SHOPEE]
+USERNAME=shared_user
+PASSWORD=shared_pass
+LOGIN_URL=https://accounts.example/login?next=https%%3A%%2F%%2Fseller
+
+[BROWSER]
+HEADLESS=false
+CDP_URL=http://127.0.0.1:9222
+
+[GOOGLE_DRIVE]
+FOLDER_ID=shared_folder
+
+[STORAGE]
+BACKEND=local
+
+[UPLOAD]
+WORKERS=3
+
+[METRICS]
+JSONL=run_metrics.jsonl
+PROMETHEUS_TEXTFILE=/var/lib/node_exporter/shopee.prom
+
+[SHOPS]
+PROCESSES=2
+
+[SHOP toko_a]
+USERNAME=user_a
+PASSWORD=pass_a
+FOLDER_ID=folder_a
+UPLOAD.WORKERS=1
+
+[SHOP toko_b]
+USERNAME=user_b
+PASSWORD=pass_b
+FOLDER_ID=folder_b
+USER_DATA_DIR=/data/profil_b
+REPORT=laporan_b.xlsx
+"""
+
+
+def load(text=CONFIG):
+    config = configparser.ConfigParser()
+    config.read_string(text)
+    return config
+
+
+def fake_worker(name, resume, command):
+    """Worker palsu (level modul agar bisa dipanggil di proses spawn)"""
+    if name == 'toko_rusak':
+        raise RuntimeError("browser crashed")
+    return {'shop': name, 'orders': 3, 'reported': 3, 'missing': 0, 'report_file': f'{name}.xlsx',
+            'error': None, 'exit_code': 0, 'seconds': 0.1, 'pid': os.getpid(), 'resume': resume,
+            'command': command}
+
+
+def test_shop_names_in_config_order():
+    assert shop_names(load()) == ['toko_a', 'toko_b']
+    assert shop_names(load("[SHOPEE]\nUSERNAME=x\n")) == []
+
+
+def test_shop_config_overrides_account_folder_and_per_shop_files():
+    config = load()
+    shop = shop_config(config, 'toko_a')
+
+    assert shop.get('SHOPEE', 'USERNAME') == 'user_a'
+    assert shop.get('SHOPEE', 'PASSWORD') == 'pass_a'
+    assert shop.get('GOOGLE_DRIVE', 'FOLDER_ID') == 'folder_a'
+    assert shop.getint('UPLOAD', 'WORKERS') == 1
+    assert shop.get('BROWSER', 'USER_DATA_DIR') == 'browser_data_toko_a'
+    assert shop.get('BROWSER', 'CDP_URL') == ''
+    assert shop.get('UPLOAD', 'MANIFEST') == 'upload_manifest_toko_a.jsonl'
+    assert shop.get('METRICS', 'JSONL') == 'run_metrics_toko_a.jsonl'
+    assert shop.get('METRICS', 'PROMETHEUS_TEXTFILE') == '/var/lib/node_exporter/shopee_toko_a.prom'
+    # Setting bersama ikut, %% tetap di-escape, section toko tidak ikut
+    assert shop.get('SHOPEE', 'LOGIN_URL') == 'https://accounts.example/login?next=https%3A%2F%2Fseller'
+    assert not any(section.startswith('SHOP ') for section in shop.sections())
+    # Config asli tidak berubah
+    assert config.get('SHOPEE', 'USERNAME') == 'shared_user'
+    assert config.getint('UPLOAD', 'WORKERS') == 3
+
+    assert shop_config(config, 'toko_b').get('BROWSER', 'USER_DATA_DIR') == '/data/profil_b'
+
+
+def test_shop_outputs():
+    config = load()
+    assert shop_outputs(config, 'toko_a') == {
+        'report_file': 'shopee_report_toko_a.xlsx',
+        'screenshots_folder': os.path.join('screenshots', 'toko_a'),
+    }
+    assert shop_outputs(config, 'toko_b')['report_file'] == 'laporan_b.xlsx'
+
+
+def test_user_data_dir_per_shop(tmp_path):
+    profile = tmp_path / 'browser_data_toko_a'
+    shopee = ShopeeAutomation('u', 'p', user_data_dir=str(profile))
+    assert shopee.user_data_dir == str(profile)
+    assert os.path.dirname(shopee.session_cache.path) == str(profile)
+
+    shop = shop_config(load(), 'toko_a')
+    assert shopee_automation.make_shopee_automation(shop).user_data_dir == 'browser_data_toko_a'
+
+
+def test_run_all_shops_uses_worker_processes(capsys):
+    config = load()
+    code = run_all_shops(config, ['toko_a', 'toko_b'], resume=True, worker=fake_worker)
+
+    assert code == 0
+    output = capsys.readouterr().out
+    assert "RUN-ALL: 2 SHOPS, 2 WORKER PROCESSES" in output
+    assert "MULTI-SHOP SUMMARY" in output
+    assert output.index('toko_a.xlsx') < output.index('toko_b.xlsx')
+    total = [line for line in output.splitlines() if line.startswith('Total')][0]
+    assert total.split()[1:4] == ['6', '6', '0']
+
+
+def test_run_all_shops_reports_failed_shop(capsys):
+    config = load(CONFIG + "\n[SHOP toko_rusak]\nUSERNAME=x\nPASSWORD=y\n")
+    code = run_all_shops(config, shop_names(config), worker=fake_worker)
+
+    assert code == 1
+    output = capsys.readouterr().out
+    assert "✗ toko_rusak failed: browser crashed" in output
+    assert "✓ toko_a finished: 3 orders reported" in output
+
+
+def test_main_rejects_unknown_shop(tmp_path, monkeypatch, capsys):
+    (tmp_path / 'config.ini').write_text(CONFIG)
+    monkeypatch.chdir(tmp_path)
+
+    assert shopee_automation.main(['--shop', 'toko_x']) == 1
+    assert "No [SHOP toko_x] section" in capsys.readouterr().out
@@ -0,0 +1,60 @@
+"""
+Tests untuk navigasi otomatis ke detail pesanan dan chat pada fixture HTML lokal
+"""
+import configparser
+
+import pytest
+
+from shopee_automation import make_shopee_automation
+from shopee_module import ShopeeAutomation
+
+
+@pytest.fixture
+def shopee(page, fixture_server):
+    shopee = ShopeeAutomation(
+        "user", "pass",
+        auto_navigate=True,
+        capture_mode="visible",
+        chat_panel_selector="[data-testid=chat-panel]",
+        chat_button_selector=".chat-button",
+    )
+    shopee.page = page
+    shopee.order_detail_url = f"{fixture_server}/order_detail.html?order_id={{order_id}}"
+    shopee.order_search_url = f"{fixture_server}/toship.html?keyword={{order_sn}}"
+    return shopee
+
+
+def test_navigates_with_known_order_id(shopee):
+    shopee.order_ids["250425D9M4P1SC"] = 180004
+
+    assert shopee.navigate_to_order_chat("250425D9M4P1SC", timeout=5000)
+    assert shopee.page.locator("[data-testid=chat-panel]").is_visible()
+
+
+def test_looks_up_order_id_from_search_results(shopee):
+    assert shopee.navigate_to_order_chat("250423B7K2M9QA", timeout=5000)
+    assert shopee.order_ids["250423B7K2M9QA"] == 180002
+
+
+def test_falls_back_to_manual_prompt(shopee, tmp_path, monkeypatch):
+    prompts = []
+    monkeypatch.setattr("builtins.input", lambda message="": prompts.append(message) or "")
+
+    path = shopee.take_chat_screenshot("251231ZZZZZZZZ", str(tmp_path))
+
+    assert path is not None
+    assert any("chat terbuka" in p for p in prompts)
+
+
+def test_no_prompt_when_navigation_succeeds(shopee, tmp_path, monkeypatch):
+    shopee.order_ids["2504226A23B55PX"] = 180001
+    monkeypatch.setattr("builtins.input", lambda message="": pytest.fail(f"unexpected prompt: {message}"))
+
+    assert shopee.take_chat_screenshot("2504226A23B55PX", str(tmp_path))
+
+
+def test_order_chat_timeout_from_config():
+    config = configparser.ConfigParser()
+    config.read_string("[SHOPEE]\nUSERNAME=u\nPASSWORD=p\n\n[TIMEOUTS]\nORDER_CHAT=4000\n")
+    assert make_shopee_automation(config).timeouts['order_chat'] == 4000
+    assert ShopeeAutomation("u", "p").timeouts['order_chat'] == 15000
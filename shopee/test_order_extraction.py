@@ -0,0 +1,45 @@
+"""
+Tests untuk pengambilan nomor pesanan otomatis dari halaman "Perlu Dikirim"
+"""
+from datetime import date
+
+from conftest import FIXTURES
+from order_extraction import (
+    extract_order_sns_from_text,
+    extract_orders_from_json,
+    filter_orders,
+    orders_from_har,
+)
+from shopee_module import ShopeeAutomation
+
+ALL_ORDERS = ["2504226A23B55PX", "250423B7K2M9QA", "250424C8L3N0RB", "250425D9M4P1SC", "250425E0N5Q2TD"]
+
+
+def test_orders_from_recorded_har_are_deduped_in_order():
+    orders = filter_orders(orders_from_har(str(FIXTURES / "toship_orders.har")))
+
+    assert [o['order_sn'] for o in orders] == ALL_ORDERS
+    assert orders[0]['order_id'] == 180001
+
+
+def test_date_range_filter():
+    orders = orders_from_har(str(FIXTURES / "toship_orders.har"))
+    filtered = filter_orders(orders, date_from=date(2025, 4, 23), date_to=date(2025, 4, 24))
+    assert [o['order_sn'] for o in filtered] == ["250423B7K2M9QA", "250424C8L3N0RB"]
+
+
+def test_single_order_payload_and_text_fallback():
+    assert extract_orders_from_json({'data': {'order_sn': '2504226A23B55PX', 'order_id': 1}}) == [
+        {'order_sn': '2504226A23B55PX', 'order_id': 1, 'create_time': None}
+    ]
+    text = "No. Pesanan 2504226A23B55PX\nResi SPXID0123\nNo. Pesanan 250423B7K2M9QA 2504226A23B55PX"
+    assert extract_order_sns_from_text(text) == ["2504226A23B55PX", "250423B7K2M9QA"]
+
+
+def test_get_orders_to_ship_follows_pagination(page, fixture_server):
+    shopee = ShopeeAutomation("user", "pass")
+    shopee.page = page
+    shopee.orders_url = f"{fixture_server}/toship.html"
+
+    assert shopee.get_orders_to_ship() == ALL_ORDERS
+    assert shopee.order_ids["250425E0N5Q2TD"] == 180005
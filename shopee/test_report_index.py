@@ -0,0 +1,186 @@
+"""
+Tests untuk index pesanan di laporan Excel: lookup tanpa membaca workbook,
+pesanan duplikat tidak ditulis ulang, index dibangun ulang jika laporan
+diubah di luar script, dan koneksi index ditutup di setiap jalur keluar
+"""
+import configparser
+import os
+import sqlite3
+
+import openpyxl
+import pytest
+
+import shopee_automation
+
+from excel_report import create_excel_report, iter_report_rows
+from report_index import LOOKUP_CHUNK, ReportIndex, index_path, part_path
+from upload_manifest import UploadManifest
+
+
+def _orders(start, count, link="https://drive.google.com/file/d/{}/view"):
+    return [{'order_number': f"ORDER{i}", 'gdrive_link': link.format(i)} for i in range(start, start + count)]
+
+
+def test_index_follows_every_write_without_rebuild(tmp_path):
+    report = str(tmp_path / "report.xlsx")
+    index = ReportIndex(report)
+    create_excel_report(_orders(0, 3), report, index)
+    create_excel_report(_orders(3, 2), report, index)
+
+    assert os.path.exists(index_path(report))
+    assert len(index) == 5
+    assert "ORDER4" in index and "ORDER5" not in index
+    assert index.known(["ORDER1", "ORDER9", "ORDER1"]) == {"ORDER1": "https://drive.google.com/file/d/1/view"}
+    # Hanya build awal (laporan belum ada), setelah itu index selalu sinkron
+    assert index.rebuilds == 1
+    index.close()
+
+
+def test_duplicate_orders_are_not_written_again(tmp_path, capsys):
+    report = str(tmp_path / "report.xlsx")
+    create_excel_report(_orders(0, 3), report)
+    mtime = os.stat(report).st_mtime_ns
+
+    # Semua sudah ada: file laporan tidak ditulis ulang
+    create_excel_report(_orders(1, 2, link="https://new/{}"), report)
+    assert os.stat(report).st_mtime_ns == mtime
+    assert "2 pesanan sudah ada di laporan" in capsys.readouterr().out
+
+    # Campuran: hanya yang baru (sekali, walau diulang di order_data) ditambahkan
+    create_excel_report(_orders(2, 3, link="https://new/{}") + _orders(4, 1, link="https://again/{}"), report)
+    assert list(iter_report_rows(report)) == [
+        (1, "ORDER0", "https://drive.google.com/file/d/0/view"),
+        (2, "ORDER1", "https://drive.google.com/file/d/1/view"),
+        (3, "ORDER2", "https://drive.google.com/file/d/2/view"),
+        (4, "ORDER3", "https://new/3"),
+        (5, "ORDER4", "https://new/4"),
+    ]
+
+
+def test_index_is_rebuilt_when_report_changes_elsewhere(tmp_path):
+    report = str(tmp_path / "report.xlsx")
+    create_excel_report(_orders(0, 2), report)
+
+    # Laporan diedit manual di Excel
+    wb = openpyxl.load_workbook(report)
+    wb.active.append([3, "MANUAL1", "https://manual/1"])
+    wb.save(report)
+
+    index = ReportIndex(report)
+    assert "MANUAL1" in index
+    assert index.rebuilds == 1
+    assert "ORDER0" in index
+    assert index.rebuilds == 1
+
+    # Laporan dihapus: index ikut kosong
+    os.remove(report)
+    assert len(index) == 0
+    index.close()
+
+
+def test_index_covers_every_part_and_notices_edits(tmp_path):
+    report = str(tmp_path / "report.xlsx")
+    index = ReportIndex(report)
+    create_excel_report(_orders(0, 5), report, index, max_rows=2)
+    assert index.part_rows() == [2, 2, 1]
+    assert index.rebuilds == 1
+
+    # Part kedua diedit manual: index dibangun ulang dari semua part
+    wb = openpyxl.load_workbook(part_path(report, 2))
+    wb.active.append([3, "MANUAL1", "https://manual/1"])
+    wb.save(part_path(report, 2))
+
+    assert index.known(["ORDER0", "MANUAL1", "ORDER4"]) == {
+        "ORDER0": "https://drive.google.com/file/d/0/view",
+        "MANUAL1": "https://manual/1",
+        "ORDER4": "https://drive.google.com/file/d/4/view",
+    }
+    assert index.part_rows() == [2, 3, 1]
+    assert index.rebuilds == 2
+    index.close()
+
+
+def test_index_without_row_counts_is_rebuilt(tmp_path):
+    report = str(tmp_path / "report.xlsx")
+    create_excel_report(_orders(0, 3), report)
+    # Index dari versi sebelum laporan dibagi per part
+    db = sqlite3.connect(index_path(report))
+    db.execute("DELETE FROM meta WHERE key = 'rows'")
+    db.commit()
+    db.close()
+
+    index = ReportIndex(report)
+    assert index.part_rows() == [3]
+    assert index.rebuilds == 1
+    index.close()
+
+
+def test_lookup_of_many_orders_is_chunked(tmp_path):
+    report = str(tmp_path / "report.xlsx")
+    create_excel_report(_orders(0, LOOKUP_CHUNK + 10), report)
+
+    index = ReportIndex(report)
+    numbers = [f"ORDER{i}" for i in range(0, 2 * LOOKUP_CHUNK, 2)]
+    assert sorted(index.known(numbers)) == sorted(numbers[:(LOOKUP_CHUNK + 10 + 1) // 2])
+    index.close()
+
+
+def _track_index(monkeypatch):
+    """Ganti ReportIndex dengan subclass yang mencatat apakah index ditutup"""
+    opened = []
+
+    class TrackedIndex(ReportIndex):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.closed = False
+            opened.append(self)
+
+        def close(self):
+            self.closed = True
+            super().close()
+
+    monkeypatch.setattr(shopee_automation, "ReportIndex", TrackedIndex)
+    return opened
+
+
+@pytest.mark.parametrize("completed", [False, True])
+def test_resume_without_work_closes_the_index(tmp_path, monkeypatch, completed):
+    monkeypatch.chdir(tmp_path)
+    if completed:
+        manifest = UploadManifest("upload_manifest.jsonl")
+        manifest.start_run(["ORDER0"])
+        manifest.mark_reported("shopee_report.xlsx", ["ORDER0"])
+    opened = _track_index(monkeypatch)
+    config = configparser.ConfigParser()
+    config.read_string("[SHOPEE]\nUSERNAME=user\nPASSWORD=pass\n")
+
+    assert shopee_automation.run_workflow(config, resume=True) is None
+    assert len(opened) == 1 and opened[0].closed
+
+
+def test_storage_error_is_reported_and_closes_the_index(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    opened = _track_index(monkeypatch)
+    config = configparser.ConfigParser()
+    # S3 tanpa S3_PUBLIC_BASE_URL ditolak oleh make_storage_backend()
+    config.read_string("[SHOPEE]\nUSERNAME=user\nPASSWORD=pass\n[STORAGE]\nBACKEND=s3\nS3_BUCKET=evidence\n")
+    summary = {}
+
+    shopee_automation.run_workflow(config, summary=summary)
+
+    assert "S3_PUBLIC_BASE_URL" in summary['error']
+    assert len(opened) == 1 and opened[0].closed
+    assert os.path.exists("run_metrics.jsonl")
+
+
+def test_upload_stage_reports_storage_error(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    UploadManifest("upload_manifest.jsonl").start_run(["ORDER0"])
+    config = configparser.ConfigParser()
+    config.read_string("[STORAGE]\nBACKEND=s3\nS3_BUCKET=evidence\n")
+    summary = {}
+
+    shopee_automation.run_upload(config, summary=summary)
+
+    assert "S3_PUBLIC_BASE_URL" in summary['error']
+    assert os.path.exists("run_metrics.jsonl")
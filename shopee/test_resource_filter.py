@@ -0,0 +1,58 @@
+"""
+Tests untuk filter request (gambar/font/tracker) pada halaman yang hanya dibaca
+"""
+from types import SimpleNamespace
+
+from resource_filter import ESTIMATED_BYTES, ResourceFilter
+
+
+def request(resource_type, url):
+    return SimpleNamespace(resource_type=resource_type, url=url)
+
+
+def test_blocks_configured_types_only_while_blocking():
+    rf = ResourceFilter()
+
+    assert rf.check(request("image", "https://cf.shopee.co.id/file/a.jpg"))
+    assert rf.check(request("font", "https://deo.shopeemobile.com/f.woff2"))
+    assert not rf.check(request("document", "https://seller.shopee.co.id/portal/sale/order"))
+    assert not rf.check(request("xhr", "https://seller.shopee.co.id/api/v3/order/get_package"))
+
+    rf.blocking = False
+    assert not rf.check(request("image", "https://cf.shopee.co.id/file/a.jpg"))
+    assert rf.blocked == {"image": 1, "font": 1}
+
+
+def test_trackers_blocked_even_when_resources_allowed():
+    rf = ResourceFilter()
+    rf.blocking = False
+
+    assert rf.check(request("script", "https://www.google-analytics.com/analytics.js"))
+    assert rf.check(request("xhr", "https://stats.g.doubleclick.net/collect"))
+    assert not rf.check(request("script", "https://notdoubleclick.net/x.js"))
+    assert rf.blocked == {"tracker": 2}
+
+
+def test_per_page_override_and_estimates():
+    rf = ResourceFilter(blocked_types=["image", " media "], tracker_domains=[])
+
+    assert not rf.check(request("image", "https://a/b.png"), blocking=False)
+    assert rf.check(request("image", "https://a/b.png"), blocking=True)
+    assert rf.check(request("media", "https://a/b.mp4"))
+    assert rf.blocked_count == 2
+    assert rf.estimated_bytes_saved == ESTIMATED_BYTES["image"] + ESTIMATED_BYTES["media"]
+
+
+def test_filters_page_requests(page, fixture_server):
+    rf = ResourceFilter()
+    rf.install(page.context)
+
+    page.goto(f"{fixture_server}/resources.html")
+    assert page.evaluate("document.getElementById('logo').naturalWidth") == 0
+    assert rf.blocked == {"image": 1, "tracker": 1}
+
+    rf.blocking = False
+    page.reload()
+    page.wait_for_function("document.getElementById('logo').complete")
+    assert page.evaluate("document.getElementById('logo').naturalWidth") == 40
+    assert rf.blocked == {"image": 1, "tracker": 2}
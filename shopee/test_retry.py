@@ -0,0 +1,174 @@
+"""
+Tests untuk retry (backoff + Retry-After), rate limiter adaptif dan
+upload resumable yang dilanjutkan, dengan fake Google Drive yang bisa gagal
+"""
+import pytest
+
+from fake_drive import FakeDriveService, make_http_error
+from retry import AdaptiveRateLimiter, Retrier, is_retryable, retry_after_seconds
+from shopee_automation import make_uploader
+from storage import DriveStorage, share_gdrive_files_batch, upload_file_to_gdrive
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def make_retrier(clock, **kwargs):
+    return Retrier(sleep=clock.sleep, rng=lambda: 1.0, **kwargs)
+
+
+def failing(*errors, result="ok"):
+    errors = list(errors)
+    calls = []
+
+    def fn():
+        calls.append(1)
+        if errors:
+            raise errors.pop(0)
+        return result
+    fn.calls = calls
+    return fn
+
+
+def test_backoff_doubles_and_is_capped():
+    clock = FakeClock()
+    retrier = make_retrier(clock, base_delay=1, max_delay=3)
+    fn = failing(make_http_error(503), make_http_error(500), ConnectionError("reset"))
+
+    assert retrier.call(fn) == "ok"
+    assert clock.sleeps == [1, 2, 3]
+    assert retrier.retries == 3
+
+
+def test_jitter_stays_within_the_backoff():
+    retrier = Retrier(base_delay=1, max_delay=60, rng=lambda: 0.25)
+    assert retrier.delay(3) == 2.0
+
+
+def test_retry_after_is_a_lower_bound():
+    clock = FakeClock()
+    retrier = make_retrier(clock, base_delay=1)
+    fn = failing(make_http_error(429, "rateLimitExceeded", retry_after=7))
+
+    assert retrier.call(fn) == "ok"
+    assert clock.sleeps == [7.0]
+
+
+def test_retry_after_http_date():
+    error = make_http_error(503, retry_after="Wed, 21 Oct 2015 07:28:30 GMT")
+    assert retry_after_seconds(error, now=1445412480) == 30
+
+
+def test_permanent_errors_are_not_retried():
+    assert not is_retryable(make_http_error(404, "notFound"))
+    assert not is_retryable(make_http_error(403, "insufficientFilePermissions"))
+    assert is_retryable(make_http_error(403, "userRateLimitExceeded"))
+
+    clock = FakeClock()
+    fn = failing(make_http_error(404, "notFound"))
+    with pytest.raises(Exception):
+        make_retrier(clock).call(fn)
+    assert len(fn.calls) == 1
+    assert clock.sleeps == []
+
+
+def test_gives_up_after_max_attempts():
+    clock = FakeClock()
+    fn = failing(*[make_http_error(503)] * 5)
+    with pytest.raises(Exception):
+        make_retrier(clock, max_attempts=3).call(fn)
+    assert len(fn.calls) == 3
+
+
+def test_limiter_backs_off_on_429_and_recovers():
+    clock = FakeClock()
+    limiter = AdaptiveRateLimiter(requests_per_second=8, max_concurrency=4, clock=clock, sleep=clock.sleep)
+    limiter.acquire()
+    limiter.release(throttled=True)
+    assert (limiter.rate, limiter.concurrency) == (4, 2)
+
+    for _ in range(20):
+        limiter.acquire()
+        limiter.release()
+    assert limiter.rate == 8
+    assert limiter.concurrency == 4
+    assert limiter.throttle_events == 1
+
+
+def test_limiter_spaces_requests_to_the_rate():
+    clock = FakeClock()
+    limiter = AdaptiveRateLimiter(requests_per_second=2, clock=clock, sleep=clock.sleep)
+    for _ in range(5):
+        limiter.acquire()
+        limiter.release()
+    # One token to start with, then one every half second (the rate stays capped at 2/s)
+    assert clock.now == pytest.approx(2.0)
+
+
+def test_resumable_upload_continues_from_last_chunk(tmp_path):
+    screenshot = tmp_path / "full_page.png"
+    screenshot.write_bytes(b"x" * (700 * 1024))
+    drive = FakeDriveService()
+    drive.inject('upload_chunk', None, make_http_error(503), ConnectionError("reset"))
+    clock = FakeClock()
+
+    file = upload_file_to_gdrive(drive, str(screenshot), 'folder', retrier=make_retrier(clock),
+                                 simple_upload_max=0, chunk_size=256 * 1024)
+
+    assert file['id'] in drive.stored_files
+    # Only the failed chunk was sent again, not the whole file
+    assert drive.bytes_received == 700 * 1024
+    assert drive.chunks == 3
+    assert len(clock.sleeps) == 2
+
+
+def test_transient_errors_do_not_drop_the_order(tmp_path, monkeypatch):
+    drive = FakeDriveService()
+    drive.inject('files.create', make_http_error(500), make_http_error(429, "rateLimitExceeded", retry_after=2))
+    drive.inject('permissions.create', make_http_error(503))
+    monkeypatch.setattr('drive_service.build_drive_service', lambda *args, **kwargs: drive)
+    clock = FakeClock()
+    limiter = AdaptiveRateLimiter(requests_per_second=100, max_concurrency=4, clock=clock, sleep=clock.sleep)
+    storage = DriveStorage(None, 'folder', retrier=make_retrier(clock, limiter=limiter))
+    files = {}
+    for order in ("A", "B"):
+        files[order] = tmp_path / f"{order}.png"
+        files[order].write_bytes(order.encode())
+
+    upload = make_uploader(storage)
+    results = {order: upload(order, str(path)) for order, path in files.items()}
+
+    assert all(results.values())
+    assert len(drive.granted) == 2
+    assert limiter.throttle_events == 1
+    assert 2.0 in clock.sleeps
+
+
+def test_batch_share_retries_only_failed_calls():
+    drive = FakeDriveService()
+    drive.inject('permissions.create', None, make_http_error(503))
+    clock = FakeClock()
+
+    errors = share_gdrive_files_batch(drive, {"A": "f1", "B": "f2", "C": "f3"}, retrier=make_retrier(clock))
+
+    assert errors == {}
+    assert sorted(drive.granted) == ["f1", "f2", "f3"]
+    assert [name for name, _ in drive.calls if name == 'batch'] == ['batch', 'batch']
+    assert len(clock.sleeps) == 1
+
+
+def test_batch_share_reports_calls_that_keep_failing():
+    drive = FakeDriveService()
+    drive.fail_permissions.add("f2")
+    errors = share_gdrive_files_batch(drive, {"A": "f1", "B": "f2"}, retrier=make_retrier(FakeClock()))
+    assert list(errors) == ["B"]
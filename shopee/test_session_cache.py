@@ -0,0 +1,100 @@
+"""
+Tests untuk cache sesi: login page dilewati saat sesi browser_data masih valid
+"""
+import time
+
+import pytest
+
+from session_cache import SessionCache, session_cookie_expiry
+from shopee_module import ShopeeAutomation
+
+COOKIES = ("SPC_SC_TK", "SPC_EC")
+
+
+def test_cookie_expiry_is_earliest_session_cookie():
+    cookies = [
+        {"name": "SPC_SC_TK", "expires": 2_000_000_000},
+        {"name": "SPC_EC", "expires": 1_900_000_000},
+        {"name": "_ga", "expires": 1_000},
+    ]
+
+    assert session_cookie_expiry(cookies, COOKIES) == 1_900_000_000
+    assert session_cookie_expiry(cookies[:1], COOKIES) is None
+    assert session_cookie_expiry([{"name": n, "expires": -1} for n in COOKIES], COOKIES) == float("inf")
+
+
+def test_cache_fresh_only_for_same_cookies_within_max_age(tmp_path):
+    cache = SessionCache(str(tmp_path / "state.json"), max_age=60)
+    now = time.time()
+
+    assert not cache.is_fresh(now + 3600)
+    cache.record(now + 3600)
+    assert cache.is_fresh(now + 3600)
+    assert not cache.is_fresh(now + 7200)
+    assert not cache.is_fresh(now + 3600, now=now + 120)
+    assert not cache.is_fresh(now - 1)
+
+    cache.record(float("inf"))
+    assert cache.is_fresh(float("inf"))
+    cache.clear()
+    assert not cache.is_fresh(float("inf"))
+
+
+@pytest.fixture
+def shopee(page, fixture_server, tmp_path):
+    shopee = ShopeeAutomation("user", "pass")
+    shopee.page = page
+    shopee.login_url = f"{fixture_server}/login_expired.html"
+    shopee.session_probe_url = f"{fixture_server}/api/shop_info.json"
+    shopee.session_cache = SessionCache(str(tmp_path / "session_state.json"))
+    page.context.add_cookies([
+        {"name": name, "value": "x", "url": fixture_server, "expires": time.time() + 3600}
+        for name in COOKIES
+    ])
+    return shopee
+
+
+def test_warm_start_skips_login_page(shopee, monkeypatch):
+    monkeypatch.setattr("builtins.input", lambda message="": pytest.fail(f"unexpected prompt: {message}"))
+    visited = []
+    shopee.page.on("request", lambda request: visited.append(request.url))
+
+    assert shopee.login()
+    assert not any("login" in url for url in visited)
+    assert shopee.session_cache.load()["checked_at"]
+
+    # Second run within max_age: not even the probe request
+    shopee.session_probe_url = "http://127.0.0.1:9/unreachable"
+    assert shopee.session_is_warm()
+
+
+def test_failed_probe_falls_back_to_login(shopee):
+    shopee.session_probe_url = shopee.session_probe_url.replace("shop_info", "shop_info_expired")
+
+    assert not shopee.session_is_warm()
+    assert shopee.session_cache.load() == {}
+
+
+@pytest.mark.parametrize("payload, valid", [
+    ({"code": 0, "data": {}}, True),
+    ({"code": 2, "message": "not login"}, False),
+    ({"data": {}}, False),
+    ([], False),
+    ("ok", False),
+    (None, False),
+])
+def test_probe_accepts_only_success_envelope(payload, valid):
+    class Response:
+        ok = True
+
+        def json(self):
+            return payload
+
+    class Request:
+        def get(self, url, **kwargs):
+            return Response()
+
+    class Context:
+        request = Request()
+
+    assert ShopeeAutomation("user", "pass")._probe_session(Context()) is valid
@@ -0,0 +1,186 @@
+"""
+Tests untuk engine async: urutan hasil, batas tab bersamaan, rate limit per host,
+dan kegagalan satu pesanan yang tidak menggagalkan pesanan lain
+"""
+import asyncio
+import os
+import random
+import threading
+import time
+
+import pytest
+from playwright.async_api import Error as PlaywrightError
+
+from shopee_async import AsyncShopeeAutomation, HostRateLimiter
+
+
+class FakeLocator:
+    @property
+    def first(self):
+        return self
+
+    async def screenshot(self, **kwargs):
+        raise PlaywrightError("Timeout 5000ms exceeded")
+
+
+class FakePage:
+    def __init__(self):
+        self.screenshots = []
+        self.closed = False
+
+    def locator(self, selector):
+        return FakeLocator()
+
+    async def screenshot(self, path, full_page=False):
+        self.screenshots.append(full_page)
+        with open(path, 'wb') as f:
+            f.write(b"png")
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeContext:
+    def __init__(self):
+        self.pages = []
+
+    async def new_page(self):
+        self.pages.append(FakePage())
+        return self.pages[-1]
+
+
+def test_results_in_input_order_and_concurrency_limited(tmp_path, monkeypatch):
+    engine = AsyncShopeeAutomation(concurrency=3, requests_per_second=0)
+    active, peak = 0, 0
+
+    async def fake_process(order_number, output_folder):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(random.uniform(0.001, 0.02))
+        active -= 1
+        return None if order_number == "O5" else f"{output_folder}/{order_number}.png"
+
+    monkeypatch.setattr(engine, "_process_order", fake_process)
+    captured = []
+    orders = [f"O{i}" for i in range(12)]
+
+    paths = asyncio.run(engine.process_orders(orders, str(tmp_path), on_capture=lambda o, p: captured.append(o)))
+
+    assert peak == 3
+    assert paths[5] is None
+    assert [p for p in paths if p] == [f"{tmp_path}/{o}.png" for o in orders if o != "O5"]
+    assert sorted(captured) == sorted(o for o in orders if o != "O5")
+
+
+def test_rate_limiter_spaces_requests_per_host():
+    limiter = HostRateLimiter(requests_per_second=20)
+
+    async def run():
+        start = time.monotonic()
+        await asyncio.gather(*(limiter.wait("https://seller.shopee.co.id/a") for _ in range(5)))
+        same_host = time.monotonic() - start
+        start = time.monotonic()
+        await limiter.wait("https://other.example/a")
+        return same_host, time.monotonic() - start
+
+    same_host, other_host = asyncio.run(run())
+
+    assert same_host >= 4 * 0.05 * 0.9
+    assert other_host < 0.05
+
+
+def test_captures_fixture_orders_concurrently(fixture_server, tmp_path):
+    from playwright.async_api import async_playwright, Error as PlaywrightError
+
+    async def run():
+        async with async_playwright() as p:
+            try:
+                browser = await p.chromium.launch()
+            except PlaywrightError as e:
+                pytest.skip(f"Chromium not available: {str(e).splitlines()[0]}")
+            engine = AsyncShopeeAutomation(
+                concurrency=2,
+                requests_per_second=0,
+                chat_panel_selector="[data-testid=chat-panel]",
+                chat_button_selector=".chat-button",
+                order_detail_url=f"{fixture_server}/order_detail.html?order_id={{order_id}}",
+                order_search_url=f"{fixture_server}/toship.html?keyword={{order_sn}}",
+                order_ids={"250425D9M4P1SC": 180004},
+            )
+            engine.context = await browser.new_context(viewport={"width": 1280, "height": 720})
+            try:
+                return await engine.process_orders(
+                    ["250425D9M4P1SC", "250423B7K2M9QA", "251231ZZZZZZZZ"], str(tmp_path)
+                )
+            finally:
+                await browser.close()
+
+    paths = asyncio.run(run())
+
+    assert paths[0] and paths[1]
+    assert paths[2] is None
+
+
+def test_elements_fall_back_to_visible_area_and_errors_stay_per_order(tmp_path):
+    engine = AsyncShopeeAutomation(requests_per_second=0, capture_mode="elements",
+                                   chat_panel_selector=".chat", order_header_selector=".header")
+    engine.context = FakeContext()
+
+    async def navigate(page, order_number, blocking):
+        if order_number == "RUSAK":
+            raise ValueError("unexpected page")
+        return True
+
+    engine._navigate_to_order_chat = navigate
+    paths = asyncio.run(engine.process_orders(["A1", "RUSAK", "A2"], str(tmp_path)))
+
+    assert paths[1] is None
+    assert all(os.path.exists(path) for path in (paths[0], paths[2]))
+    # Elemen tidak ditemukan: screenshot area terlihat, bukan full page
+    assert [page.screenshots for page in engine.context.pages if page.screenshots] == [[False], [False]]
+    assert all(page.closed for page in engine.context.pages)
+    assert [span['mode'] for span in engine.timer.spans() if span['step'] == 'capture'] == ["visible"] * 2
+
+
+def test_cdp_browser_without_context_gets_a_new_one(monkeypatch):
+    class Browser:
+        contexts = []
+
+        async def new_context(self):
+            return "new context"
+
+    class Chromium:
+        async def connect_over_cdp(self, url):
+            return Browser()
+
+    class Playwright:
+        chromium = Chromium()
+
+    class Starter:
+        async def start(self):
+            return Playwright()
+
+    monkeypatch.setattr("shopee_async.async_playwright", Starter)
+    engine = AsyncShopeeAutomation(cdp_url="http://127.0.0.1:9222")
+    asyncio.run(engine.start_browser())
+    assert engine.context == "new context"
+
+
+def test_stitching_runs_off_the_event_loop(tmp_path, monkeypatch):
+    class Locator:
+        first = property(lambda self: self)
+
+        async def screenshot(self, **kwargs):
+            return b"png"
+
+    class Page:
+        def locator(self, selector):
+            return Locator()
+
+    threads = []
+    monkeypatch.setattr("image_pipeline.stitch_images", lambda shots, path: threads.append(threading.current_thread()))
+    engine = AsyncShopeeAutomation(capture_mode="elements", chat_panel_selector=".chat", order_header_selector=".header")
+
+    assert asyncio.run(engine._capture(Page(), str(tmp_path / "a.png"))) == "elements"
+    assert threads and threads[0] is not threading.main_thread()
@@ -0,0 +1,167 @@
+"""
+Tests untuk storage backend (local, S3-compatible, Google Drive) tanpa network
+"""
+import configparser
+import os
+import threading
+
+import pytest
+
+from fake_drive import FakeDriveService
+from fake_s3 import FakeS3Client
+from shopee_automation import make_storage_backend, make_uploader
+from storage import MB, DriveStorage, LocalStorage, S3Storage
+from upload_manifest import UploadManifest, file_sha256
+
+
+@pytest.fixture
+def screenshot(tmp_path):
+    path = tmp_path / "250101AB12CD34.png"
+    path.write_bytes(b"chat screenshot bytes")
+    return str(path)
+
+
+def test_local_storage_stores_by_hash(tmp_path, screenshot):
+    storage = LocalStorage(str(tmp_path / "evidence"), base_url="http://evidence.local/shopee/")
+    digest = file_sha256(screenshot)
+
+    assert storage.find_by_hash(digest) is None
+    file = storage.upload(screenshot)
+    assert file['id'] == f"{digest}/250101AB12CD34.png"
+    assert file['webViewLink'] == f"http://evidence.local/shopee/{digest}/250101AB12CD34.png"
+    assert (tmp_path / "evidence" / digest / "250101AB12CD34.png").read_bytes() == b"chat screenshot bytes"
+    assert storage.find_by_hash(digest) == file
+    assert not storage.share_required
+
+
+def test_local_storage_file_links(tmp_path, screenshot):
+    file = LocalStorage(str(tmp_path / "evidence")).upload(screenshot)
+    assert file['webViewLink'].startswith("file://")
+    assert file['webViewLink'].endswith("/250101AB12CD34.png")
+
+
+def test_s3_small_file_is_a_single_put(screenshot):
+    client = FakeS3Client()
+    storage = S3Storage("evidence", prefix="shopee/", client=client)
+    digest = file_sha256(screenshot)
+
+    file = storage.upload(screenshot)
+
+    assert file['id'] == f"shopee/{digest}/250101AB12CD34.png"
+    assert "X-Amz-Expires=604800" in file['webViewLink']
+    assert [name for name, _ in client.calls] == ['put_object']
+    assert client.metadata[("evidence", file['id'])] == {'sha256': digest}
+    assert storage.find_by_hash(digest) == file
+
+
+def test_s3_large_file_uploads_parts_concurrently(tmp_path):
+    big = tmp_path / "full_page.png"
+    data = os.urandom(5 * MB) * 3 + b"tail"
+    big.write_bytes(data)
+    client = FakeS3Client(latency=0.05)
+    storage = S3Storage(
+        "evidence", client=client, public_base_url="https://cdn.example.com",
+        multipart_threshold=5 * MB, multipart_chunk=5 * MB, multipart_concurrency=4,
+    )
+
+    file = storage.upload(str(big))
+
+    assert client.objects[("evidence", file['id'])] == data
+    assert [name for name, _ in client.calls].count('upload_part') == 4
+    assert client.max_active_parts > 1
+    assert file['webViewLink'] == f"https://cdn.example.com/{file['id']}"
+
+
+def test_s3_failed_part_aborts_the_upload(tmp_path):
+    big = tmp_path / "full_page.png"
+    big.write_bytes(b"x" * (11 * MB))
+    client = FakeS3Client(fail_part=2)
+    storage = S3Storage("evidence", client=client, multipart_threshold=5 * MB, multipart_chunk=5 * MB)
+
+    with pytest.raises(ConnectionError):
+        storage.upload(str(big))
+    assert len(client.aborted) == 1
+    assert client.objects == {}
+
+
+def test_drive_storage_finds_upload_by_hash(monkeypatch, screenshot):
+    drive = FakeDriveService()
+    monkeypatch.setattr('drive_service.build_drive_service', lambda *args, **kwargs: drive)
+    storage = DriveStorage(None, 'folder', share=False)
+
+    file = storage.upload(screenshot)
+
+    assert storage.find_by_hash(file_sha256(screenshot)) == file
+    assert storage.find_by_hash("0" * 64) is None
+    assert [name for name, _ in drive.calls] == ['files.create', 'files.list', 'files.list']
+
+
+def test_drive_storage_close_closes_every_thread_service(monkeypatch):
+    built = []
+
+    class ClosableDrive(FakeDriveService):
+        closed = False
+
+        def close(self):
+            self.closed = True
+
+    def build(*args, **kwargs):
+        built.append(ClosableDrive())
+        return built[-1]
+
+    monkeypatch.setattr('drive_service.build_drive_service', build)
+    storage = DriveStorage(None, 'folder')
+    first = storage.service
+    assert built == []  # built on the first API call, not when the thread asks for it
+    for _ in range(2):
+        worker = threading.Thread(target=lambda: storage.service.files())
+        worker.start()
+        worker.join()
+
+    storage.close()
+
+    assert len(built) == 2 and all(drive.closed for drive in built)
+    assert storage.service is not first
+
+
+def test_s3_close_leaves_a_passed_in_client_open():
+    client = FakeS3Client()
+    client.close = lambda: pytest.fail("client passed in must not be closed")
+    S3Storage("evidence", client=client).close()
+
+
+def s3_config(**values):
+    config = configparser.ConfigParser()
+    config['STORAGE'] = {'BACKEND': 's3', 'S3_BUCKET': 'evidence', **values}
+    return config
+
+
+def test_s3_backend_requires_a_public_base_url():
+    with pytest.raises(RuntimeError, match="S3_PUBLIC_BASE_URL"):
+        make_storage_backend(s3_config())
+
+
+def test_s3_backend_warns_about_expiring_presigned_links(monkeypatch, capsys):
+    created = []
+    monkeypatch.setattr('shopee_automation.S3Storage', lambda bucket, **kwargs: created.append(kwargs))
+
+    make_storage_backend(s3_config(S3_PRESIGNED_LINKS='true'))
+    assert "EXPIRE" in capsys.readouterr().out
+    make_storage_backend(s3_config(S3_PUBLIC_BASE_URL='https://cdn.example.com/evidence'))
+
+    assert [kwargs['public_base_url'] for kwargs in created] == [None, 'https://cdn.example.com/evidence']
+
+
+def test_uploader_reuses_file_found_in_storage(tmp_path, screenshot):
+    storage = LocalStorage(str(tmp_path / "evidence"))
+    existing = storage.upload(screenshot)
+    manifest = UploadManifest(str(tmp_path / "manifest.jsonl"))
+    manifest.start_run(["A"])
+    calls = []
+    storage.upload = lambda *args: calls.append(args)
+
+    upload = make_uploader(storage, manifest=manifest, check_existing=True)
+
+    assert upload("A", screenshot) == existing
+    assert calls == []
+    assert manifest.run_upload("A")['shared'] is True
@@ -0,0 +1,128 @@
+"""
+Tests untuk timing per langkah, span per pesanan beserta export JSONL/Prometheus,
+dan waktu tunggu berbasis kondisi (bukan time.sleep)
+"""
+import json
+import time
+
+from fake_drive import FakeDriveService, make_http_error
+from retry import Retrier
+from shopee_automation import make_uploader
+from storage import DriveStorage
+from shopee_module import ShopeeAutomation
+from timing import StepTimer, percentile
+
+
+def test_step_timer_records_and_summarizes(capsys):
+    timer = StepTimer()
+    with timer.step('capture'):
+        time.sleep(0.01)
+    timer.record('capture', 0.5)
+    timer.record('upload', 2.0)
+
+    assert len(timer.durations('capture')) == 2
+    assert timer.total('upload') == 2.0
+
+    timer.print_summary()
+    output = capsys.readouterr().out
+    assert output.index('upload') < output.index('capture')
+
+
+def test_percentiles():
+    values = list(range(1, 101))
+    assert percentile(values, 0.5) == 50.5
+    assert percentile(values, 0.95) == 95.05
+    assert percentile([3.0], 0.95) == 3.0
+    assert percentile([], 0.5) == 0.0
+
+
+def test_spans_are_exported_as_jsonl_and_prometheus(tmp_path):
+    timer = StepTimer()
+    with timer.step('capture', order='A') as span:
+        span['bytes'] = 1000
+    timer.record('capture', 0.5, order='B', bytes=3000)
+    try:
+        with timer.step('navigate', order='C'):
+            raise TimeoutError()
+    except TimeoutError:
+        pass
+
+    assert [span['order'] for span in timer.spans()] == ['A', 'B', 'C']
+    assert timer.spans('C')[0]['error'] == 'TimeoutError'
+
+    jsonl = tmp_path / "run_metrics.jsonl"
+    timer.write_jsonl(jsonl, run_id='run1')
+    timer.write_jsonl(jsonl, run_id='run2')
+    lines = [json.loads(line) for line in jsonl.read_text().splitlines()]
+    assert len(lines) == 6
+    assert lines[1] == {**lines[1], 'run_id': 'run1', 'step': 'capture', 'order': 'B', 'bytes': 3000}
+
+    prom = tmp_path / "shopee.prom"
+    timer.write_prometheus(prom)
+    text = prom.read_text()
+    assert 'shopee_step_seconds{step="capture",quantile="0.5"}' in text
+    assert 'shopee_step_seconds_count{step="capture"} 2' in text
+    assert 'shopee_step_bytes_total{step="capture"} 4000' in text
+    assert sorted(tmp_path.iterdir()) == sorted([jsonl, prom])
+
+
+def test_upload_span_counts_bytes_and_retries(tmp_path, monkeypatch):
+    drive = FakeDriveService()
+    drive.inject('files.create', make_http_error(503))
+    monkeypatch.setattr('drive_service.build_drive_service', lambda *args, **kwargs: drive)
+    timer = StepTimer()
+    storage = DriveStorage(None, 'folder', retrier=Retrier(sleep=lambda seconds: None))
+    upload = make_uploader(storage, timer=timer)
+    screenshot = tmp_path / "A.png"
+    screenshot.write_bytes(b"x" * 2048)
+
+    assert upload('A', str(screenshot))
+
+    span, = timer.spans('A')
+    assert span['step'] == 'upload'
+    assert (span['bytes'], span['retries'], span['source'], span['ok']) == (2048, 1, 'upload', True)
+
+
+def test_login_waits_for_redirect_instead_of_fixed_sleep(page, fixture_server):
+    shopee = ShopeeAutomation("user", "pass")
+    shopee.page = page
+    shopee.login_url = f"{fixture_server}/login.html?delay=200"
+
+    start = time.perf_counter()
+    assert shopee.login()
+    elapsed = time.perf_counter() - start
+
+    # The old flow slept a fixed 3 s after the login page loaded
+    assert elapsed < 3
+    assert "/portal/" in page.url
+    assert shopee.timer.durations('login')
+
+
+def test_orders_page_waits_for_network_idle(page, fixture_server, monkeypatch):
+    shopee = ShopeeAutomation("user", "pass")
+    shopee.page = page
+    shopee.orders_url = f"{fixture_server}/toship.html?delay=300"
+    monkeypatch.setattr("builtins.input", lambda message="": "")
+
+    start = time.perf_counter()
+    assert shopee.get_orders_to_ship(auto=False) == []
+    elapsed = time.perf_counter() - start
+
+    # The old flow slept a fixed 5 s after the orders page loaded
+    assert elapsed < 5
+    assert shopee.timer.durations('operator_input')
+
+
+def test_bounded_timer_keeps_running_totals():
+    timer = StepTimer(max_spans=3)
+    for i in range(10):
+        timer.record('upload', 1.0, order=str(i), bytes=100, retries=1)
+
+    assert len(timer.spans()) == 3
+    assert len(timer.durations('upload')) == 3
+    assert timer.total('upload') == 10.0
+    lines = timer.prometheus_lines()
+    # Counter tidak turun walau span lama sudah dibuang
+    assert 'shopee_step_seconds_count{step="upload"} 10' in lines
+    assert 'shopee_step_bytes_total{step="upload"} 1000' in lines
+    assert 'shopee_step_retries_total{step="upload"} 10' in lines
@@ -0,0 +1,51 @@
+"""
+Tests untuk manifest upload (dedup berdasarkan hash dan resume)
+"""
+from fake_drive import FakeDriveService
+from shopee_automation import make_uploader
+from storage import DriveStorage
+from upload_manifest import UploadManifest, file_sha256
+
+
+def test_manifest_survives_reload_and_resumes_last_run(tmp_path):
+    path = str(tmp_path / "manifest.jsonl")
+    manifest = UploadManifest(path)
+    manifest.start_run(["A", "B", "C"])
+    manifest.record_upload("A", "hashA", {'id': 'f1', 'webViewLink': 'link1'}, "a.png", shared=True)
+    manifest.record_upload("B", "hashB", {'id': 'f2', 'webViewLink': 'link2'}, "b.png", shared=False)
+
+    # Simulate a crash in the middle of writing the next line
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"type": "upload", "order_n')
+
+    reloaded = UploadManifest(path)
+    run = reloaded.resume_run()
+    assert run['orders'] == ["A", "B", "C"]
+    assert run['reported'] == set()
+    assert reloaded.run_upload("A")['link'] == 'link1'
+    assert reloaded.run_upload("C") is None
+    assert reloaded.find("B", "hashB")['file_id'] == 'f2'
+
+    reloaded.mark_shared(["B"])
+    reloaded.mark_reported("report.xlsx", ["A", "B"])
+    run = UploadManifest(path).resume_run()
+    assert run['reported'] == {"A", "B"}
+    assert UploadManifest(path).find("B", "hashB")['shared'] is True
+
+
+def test_uploader_skips_files_already_in_manifest(tmp_path, monkeypatch):
+    drive = FakeDriveService()
+    monkeypatch.setattr('drive_service.build_drive_service', lambda *args, **kwargs: drive)
+    screenshot = tmp_path / "order.png"
+    screenshot.write_bytes(b"same screenshot bytes")
+
+    manifest = UploadManifest(str(tmp_path / "manifest.jsonl"))
+    manifest.start_run(["A"])
+    upload = make_uploader(DriveStorage(None, 'folder'), manifest=manifest)
+
+    first = upload("A", str(screenshot))
+    second = upload("A", str(screenshot))
+
+    assert first == second
+    assert len(drive.stored_files) == 1
+    assert manifest.run_upload("A")['sha256'] == file_sha256(str(screenshot))
@@ -0,0 +1,99 @@
+"""
+Tests untuk background upload pipeline dengan fake Google Drive (tanpa network)
+"""
+import threading
+import time
+
+from fake_drive import FakeDriveService
+from shopee_automation import upload_to_gdrive
+from upload_pipeline import UploadPipeline
+
+
+def _make_screenshots(tmp_path, count):
+    paths = []
+    for i in range(count):
+        path = tmp_path / f"order{i}.png"
+        path.write_bytes(b"fake png " * 100)
+        paths.append(str(path))
+    return paths
+
+
+def test_pipeline_overlaps_uploads_and_keeps_order(tmp_path):
+    drive = FakeDriveService(latency=0.05)
+    paths = _make_screenshots(tmp_path, 8)
+
+    start = time.perf_counter()
+    pipeline = UploadPipeline(lambda order, p: upload_to_gdrive(drive, p, 'folder'), workers=4, queue_size=4)
+    pipeline.start()
+    for i, path in enumerate(paths):
+        pipeline.submit(f"ORDER{i}", path)
+    results = pipeline.join()
+    elapsed = time.perf_counter() - start
+
+    # 8 files x 2 calls x 50 ms = 0.8 s serial; 4 workers should need ~0.2 s
+    assert elapsed < 0.6
+    assert [r['order_number'] for r in results] == [f"ORDER{i}" for i in range(8)]
+    assert all(r['result'].startswith("https://drive.google.com/") for r in results)
+    assert len(drive.stored_files) == 8
+    assert len(drive.granted) == 8
+
+
+def test_pipeline_applies_backpressure():
+    release = threading.Event()
+    started = []
+
+    def slow_upload(order_number, path):
+        started.append(path)
+        release.wait(5)
+        return f"link-{path}"
+
+    pipeline = UploadPipeline(slow_upload, workers=1, queue_size=1)
+    pipeline.start()
+    pipeline.submit("A", "a")  # picked up by the worker
+    time.sleep(0.05)
+    pipeline.submit("B", "b")  # fills the queue
+
+    blocked = threading.Thread(target=pipeline.submit, args=("C", "c"))
+    blocked.start()
+    blocked.join(0.2)
+    assert blocked.is_alive(), "submit() should block while the queue is full"
+
+    release.set()
+    blocked.join(5)
+    results = pipeline.join()
+    assert [r['result'] for r in results] == ["link-a", "link-b", "link-c"]
+
+
+def test_pipeline_records_errors():
+    def failing_upload(order_number, path):
+        raise RuntimeError("boom")
+
+    pipeline = UploadPipeline(failing_upload, workers=2, queue_size=2)
+    pipeline.start()
+    pipeline.submit("A", "a")
+    results = pipeline.join()
+    assert results[0]['result'] is None
+    assert results[0]['error'] == "boom"
+
+
+def test_drain_keeps_workers_between_batches(tmp_path):
+    paths = _make_screenshots(tmp_path, 6)
+    threads = set()
+
+    def upload(order, path):
+        threads.add(threading.get_ident())
+        return order
+
+    pipeline = UploadPipeline(upload, workers=2, queue_size=2)
+    pipeline.start()
+    for i, path in enumerate(paths[:3]):
+        pipeline.submit(f"A{i}", path)
+    first = pipeline.drain()
+    for i, path in enumerate(paths[3:]):
+        pipeline.submit(f"B{i}", path)
+    second = pipeline.drain()
+    pipeline.join()
+
+    assert [r['result'] for r in first] == ["A0", "A1", "A2"]
+    assert [r['result'] for r in second] == ["B0", "B1", "B2"]
+    assert len(threads) <= 2
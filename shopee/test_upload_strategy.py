@@ -0,0 +1,56 @@
+"""
+Tests untuk pemilihan upload multipart (file kecil) atau resumable per chunk
+(file besar), dengan fake Drive dan stub server Google lokal
+"""
+from fake_drive import FakeDriveService, StubGoogleServer
+from shopee_automation import upload_file_to_gdrive
+from timing import StepTimer
+
+KB = 1024
+
+
+def write_file(tmp_path, name, size):
+    path = tmp_path / name
+    path.write_bytes(b"x" * size)
+    return str(path)
+
+
+def test_small_files_are_uploaded_in_one_request(tmp_path):
+    drive = FakeDriveService()
+    timer = StepTimer()
+
+    file = upload_file_to_gdrive(drive, write_file(tmp_path, "order.png", 200 * KB), 'folder',
+                                 share=False, simple_upload_max=1024 * KB, timer=timer)
+
+    assert drive.stored_files[file['id']]['resumable'] is False
+    assert drive.chunks == 0
+    assert len(timer.durations('upload_multipart')) == 1
+    assert timer.durations('upload_resumable') == []
+
+
+def test_large_files_are_uploaded_in_chunks(tmp_path):
+    drive = FakeDriveService()
+    timer = StepTimer()
+
+    file = upload_file_to_gdrive(drive, write_file(tmp_path, "full_page.png", 1300 * KB), 'folder',
+                                 share=False, simple_upload_max=1024 * KB, chunk_size=512 * KB, timer=timer)
+
+    assert drive.stored_files[file['id']]['resumable'] is True
+    assert drive.chunks == 3
+    assert drive.bytes_received == 1300 * KB
+    assert len(timer.durations('upload_resumable')) == 1
+
+
+def test_upload_strategies_over_http(tmp_path):
+    with StubGoogleServer() as stub:
+        service = stub.drive_service()
+        small = upload_file_to_gdrive(service, write_file(tmp_path, "small.png", 100 * KB), 'folder',
+                                      share=False, simple_upload_max=512 * KB)
+        large = upload_file_to_gdrive(service, write_file(tmp_path, "large.png", 600 * KB), 'folder',
+                                      share=False, simple_upload_max=512 * KB, chunk_size=256 * KB)
+
+    assert small['id'] and large['id']
+    assert [upload_type for upload_type, _ in stub.uploads] == ['multipart', 'resumable']
+    assert stub.uploads[1][1] == 600 * KB
+    # multipart: one request; resumable: open the session, then three chunks
+    assert len(stub.requests) == 1 + 1 + 3
@@ -0,0 +1,204 @@
+"""
+Per-step wall-clock timing for the automation run.
+
+Every timed step is also kept as a span (step, order number, start, duration
+and extra fields such as bytes uploaded or retries), which can be exported as
+JSONL and as a Prometheus textfile-collector file after the run.
+"""
+import json
+import os
+import tempfile
+import collections
+import threading
+import time
+from contextlib import contextmanager
+
+# Quantiles exported to Prometheus and shown in the summary
+SUMMARY_QUANTILES = (0.5, 0.95)
+
+# Span fields added up per step and exported as Prometheus counters
+COUNTER_FIELDS = (('bytes', 'shopee_step_bytes_total'), ('retries', 'shopee_step_retries_total'))
+
+
+def percentile(values, q):
+    """
+    Percentile of a list of numbers, linear interpolation between ranks
+
+    Args:
+        values: Numbers (need not be sorted)
+        q: Quantile between 0 and 1 (0.95 = p95)
+
+    Returns:
+        float: The percentile, or 0.0 for an empty list
+    """
+    if not values:
+        return 0.0
+    values = sorted(values)
+    rank = (len(values) - 1) * q
+    low = int(rank)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (rank - low)
+
+
+class StepTimer:
+    def __init__(self, max_spans=None):
+        """
+        Collects durations per named step (thread-safe)
+
+        Count, sum, max and the bytes/retries totals of a step are kept as
+        running values, so they cover the whole life of the timer; the
+        percentiles are taken from the most recent durations.
+
+        Args:
+            max_spans: Keep only the most recent spans, and as many recent
+                durations per step (for long-lived processes); None keeps all
+        """
+        self.max_spans = max_spans
+        self._steps = {}
+        self._counters = {}
+        self._spans = collections.deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds, order=None, **fields):
+        """
+        Add one duration (in seconds) to a step
+
+        Args:
+            name: Step name
+            seconds: Duration
+            order: Order number the step worked on, if any
+            fields: Extra span fields (e.g. bytes=..., retries=...)
+        """
+        span = {'step': name, 'order': order, 'start': time.time() - seconds, 'seconds': seconds}
+        span.update(fields)
+        with self._lock:
+            step = self._steps.get(name)
+            if step is None:
+                step = self._steps[name] = {
+                    'count': 0, 'sum': 0.0, 'max': 0.0, 'recent': collections.deque(maxlen=self.max_spans),
+                }
+            step['count'] += 1
+            step['sum'] += seconds
+            step['max'] = max(step['max'], seconds)
+            step['recent'].append(seconds)
+            for field, _ in COUNTER_FIELDS:
+                if field in fields:
+                    key = (field, name)
+                    self._counters[key] = self._counters.get(key, 0) + fields[field]
+            self._spans.append(span)
+
+    @contextmanager
+    def step(self, name, order=None, **fields):
+        """
+        Time the body of a with-block as one run of a step
+
+        Yields a dict the body can add span fields to, e.g.
+        ``with timer.step('upload', order=n) as span: span['bytes'] = size``
+        """
+        fields = dict(fields)
+        start = time.perf_counter()
+        try:
+            yield fields
+        except BaseException as error:
+            fields['error'] = type(error).__name__
+            raise
+        finally:
+            self.record(name, time.perf_counter() - start, order, **fields)
+
+    def durations(self, name):
+        """Recorded durations of a step, in seconds (the most recent max_spans)"""
+        with self._lock:
+            step = self._steps.get(name)
+            return list(step['recent']) if step else []
+
+    def names(self):
+        """Names of all recorded steps"""
+        with self._lock:
+            return list(self._steps)
+
+    def total(self, name):
+        """Total seconds spent in a step"""
+        with self._lock:
+            step = self._steps.get(name)
+            return step['sum'] if step else 0.0
+
+    def _stats(self):
+        """Snapshot of every step: (name, count, sum, max, recent durations)"""
+        with self._lock:
+            return [(name, step['count'], step['sum'], step['max'], list(step['recent']))
+                    for name, step in self._steps.items()]
+
+    def spans(self, order=None):
+        """Recorded spans, in order of completion (only one order's if given)"""
+        with self._lock:
+            return [dict(span) for span in self._spans if order is None or span['order'] == order]
+
+    def print_summary(self):
+        """Print total, count, average, p50/p95 and max per step, slowest first"""
+        steps = self._stats()
+        if not steps:
+            return
+
+        print("\n" + "="*78)
+        print("TIMING SUMMARY")
+        print("="*78)
+        print(f"{'Step':<22}{'Count':>7}{'Total (s)':>11}{'Avg (s)':>9}{'p50 (s)':>9}{'p95 (s)':>9}{'Max (s)':>9}")
+        for name, count, total, longest, values in sorted(steps, key=lambda step: -step[2]):
+            print(f"{name:<22}{count:>7}{total:>11.2f}{total / count:>9.2f}"
+                  f"{percentile(values, 0.5):>9.2f}{percentile(values, 0.95):>9.2f}{longest:>9.2f}")
+
+    def write_jsonl(self, path, run_id=None):
+        """
+        Append every span as one JSON line (with the run id) to a file
+
+        Args:
+            path: JSONL file, created if missing
+            run_id: Identifier of the run stored with every span
+        """
+        with open(path, 'a', encoding='utf-8') as f:
+            for span in self.spans():
+                f.write(json.dumps({'run_id': run_id, **span}, default=str) + '\n')
+
+    def prometheus_lines(self):
+        """
+        Step durations as a Prometheus summary, plus bytes and retries totals
+        of the spans that carry them
+
+        _sum, _count and the _total counters never go down, however many
+        spans max_spans drops; the quantiles are of the recent durations.
+        """
+        lines = ['# TYPE shopee_step_seconds summary']
+        for name, count, total, _, values in self._stats():
+            for q in SUMMARY_QUANTILES:
+                lines.append(f'shopee_step_seconds{{step="{name}",quantile="{q}"}} {percentile(values, q):.3f}')
+            lines.append(f'shopee_step_seconds_sum{{step="{name}"}} {total:.3f}')
+            lines.append(f'shopee_step_seconds_count{{step="{name}"}} {count}')
+        with self._lock:
+            counters = dict(self._counters)
+        for field, metric in COUNTER_FIELDS:
+            totals = {name: value for (counted, name), value in counters.items() if counted == field}
+            if totals:
+                lines.append(f'# TYPE {metric} counter')
+                lines += [f'{metric}{{step="{name}"}} {value}' for name, value in totals.items()]
+        return lines
+
+    def write_prometheus(self, path):
+        """
+        Write prometheus_lines() for node_exporter's textfile collector
+
+        The file is written next to the target and renamed, so the collector
+        never reads half a file.
+        """
+        lines = self.prometheus_lines() + [
+            '# TYPE shopee_last_run_timestamp_seconds gauge',
+            f'shopee_last_run_timestamp_seconds {time.time():.0f}',
+        ]
+        folder = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=folder, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(lines) + '\n')
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
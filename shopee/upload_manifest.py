@@ -0,0 +1,178 @@
+"""
+Append-only JSONL manifest of uploaded screenshots.
+Survives crashes so a run can be resumed without uploading duplicates.
+"""
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+
+def file_sha256(file_path, chunk_size=1024 * 1024):
+    """Return the SHA-256 hex digest of a file"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class UploadManifest:
+    def __init__(self, path='upload_manifest.jsonl'):
+        """
+        Open (or create) the manifest and load its entries
+
+        Args:
+            path: Path to the JSONL manifest file
+        """
+        self.path = path
+        self.run_id = None
+        self._lock = threading.Lock()
+        self._by_hash = {}      # (order_number, sha256) -> upload entry
+        self._uploads = {}      # (run_id, order_number) -> latest upload entry
+        self._captures = {}     # (run_id, order_number) -> latest capture entry
+        self._runs = []         # run entries in file order
+        self._reported = {}     # run_id -> order numbers written to the report
+        self._torn_tail = False
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding='utf-8') as f:
+            raw = ''
+            for raw in f:
+                line = raw.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Last line may be cut off if the process was killed mid-write
+                    continue
+                self._apply(entry)
+        # Start the next entry on a fresh line after a torn write
+        self._torn_tail = bool(raw) and not raw.endswith('\n')
+
+    def _apply(self, entry):
+        kind = entry.get('type')
+        if kind == 'run':
+            self._runs.append(entry)
+        elif kind == 'upload':
+            self._by_hash[(entry['order_number'], entry['sha256'])] = entry
+            self._uploads[(entry['run_id'], entry['order_number'])] = entry
+        elif kind == 'capture':
+            self._captures[(entry['run_id'], entry['order_number'])] = entry
+        elif kind == 'shared':
+            for order_number in entry['order_numbers']:
+                upload = self._uploads.get((entry['run_id'], order_number))
+                if upload:
+                    upload['shared'] = True
+        elif kind == 'report':
+            self._reported.setdefault(entry['run_id'], set()).update(entry['order_numbers'])
+
+    def _append(self, entry):
+        entry.setdefault('time', datetime.now().isoformat(timespec='seconds'))
+        line = json.dumps(entry, ensure_ascii=False)
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                if self._torn_tail:
+                    f.write('\n')
+                    self._torn_tail = False
+                f.write(line + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            self._apply(entry)
+
+    def start_run(self, order_numbers):
+        """
+        Record the orders planned for a new run and make it the current run
+
+        Returns:
+            str: ID of the new run
+        """
+        self.run_id = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        self._append({'type': 'run', 'run_id': self.run_id, 'orders': list(order_numbers)})
+        return self.run_id
+
+    def resume_run(self):
+        """
+        Make the most recent run the current run again
+
+        Returns:
+            dict: The run entry with 'run_id', 'orders' and 'reported' (set of
+                order numbers already written to the Excel report), or None
+                if the manifest has no runs
+        """
+        if not self._runs:
+            return None
+        run = dict(self._runs[-1])
+        run['reported'] = set(self._reported.get(run['run_id'], ()))
+        self.run_id = run['run_id']
+        return run
+
+    def record_capture(self, order_number, file_path):
+        """
+        Record a screenshot taken for the current run and not uploaded yet
+        (the capture stage; the upload stage picks it up from here)
+
+        Args:
+            order_number: Order number the screenshot belongs to
+            file_path: Local path of the (compressed) screenshot
+        """
+        self._append({
+            'type': 'capture',
+            'run_id': self.run_id,
+            'order_number': order_number,
+            'file_path': file_path,
+        })
+
+    def record_upload(self, order_number, sha256, file, file_path, shared):
+        """
+        Record a finished upload for the current run
+
+        Args:
+            order_number: Order number the screenshot belongs to
+            sha256: SHA-256 of the uploaded file
+            file: Drive file metadata with 'id' and 'webViewLink'
+            file_path: Local path of the uploaded file
+            shared: Whether link access was already granted
+        """
+        self._append({
+            'type': 'upload',
+            'run_id': self.run_id,
+            'order_number': order_number,
+            'sha256': sha256,
+            'file_id': file['id'],
+            'link': file['webViewLink'],
+            'file_path': file_path,
+            'shared': bool(shared),
+        })
+
+    def mark_shared(self, order_numbers):
+        """Record that link access was granted for these orders in the current run"""
+        order_numbers = list(order_numbers)
+        if order_numbers:
+            self._append({'type': 'shared', 'run_id': self.run_id, 'order_numbers': order_numbers})
+
+    def mark_reported(self, report_file, order_numbers):
+        """Record which orders of the current run were written to the Excel report"""
+        self._append({
+            'type': 'report',
+            'run_id': self.run_id,
+            'file': report_file,
+            'order_numbers': list(order_numbers),
+        })
+
+    def find(self, order_number, sha256):
+        """Return the upload entry (from any run) for this order and file hash, or None"""
+        return self._by_hash.get((order_number, sha256))
+
+    def run_upload(self, order_number):
+        """Return the latest upload entry for an order in the current run, or None"""
+        return self._uploads.get((self.run_id, order_number))
+
+    def run_capture(self, order_number):
+        """Return the latest capture entry for an order in the current run, or None"""
+        return self._captures.get((self.run_id, order_number))
@@ -0,0 +1,103 @@
+"""
+Background upload stage for the Shopee automation workflow.
+Screenshot capture submits files, a bounded pool of worker threads uploads them.
+"""
+import queue
+import threading
+
+_STOP = object()
+
+
+class UploadPipeline:
+    def __init__(self, upload_fn, workers=3, queue_size=10):
+        """
+        Initialize the upload pipeline
+
+        Args:
+            upload_fn: Callable taking (order_number, file_path) and returning
+                the upload result (e.g. Drive file metadata), or None if the
+                upload failed
+            workers: Number of upload worker threads
+            queue_size: Maximum number of files waiting for upload. submit()
+                blocks while the queue is full (backpressure on capture)
+        """
+        self.upload_fn = upload_fn
+        self.workers = max(1, int(workers))
+        self.queue_size = max(1, int(queue_size))
+        self._queue = queue.Queue(maxsize=self.queue_size)
+        self._results = []
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def start(self):
+        """Start the worker threads"""
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"upload-{i + 1}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def submit(self, order_number, file_path):
+        """
+        Queue a file for upload. Blocks while the queue is full.
+
+        Args:
+            order_number: Order number the file belongs to
+            file_path: Path to the file to upload
+        """
+        if not self._threads:
+            raise RuntimeError("UploadPipeline.start() must be called before submit()")
+        with self._lock:
+            index = len(self._results)
+            self._results.append({
+                'order_number': order_number,
+                'file_path': file_path,
+                'result': None,
+                'error': None,
+            })
+        self._queue.put((index, order_number, file_path))
+
+    def drain(self):
+        """
+        Wait for all queued uploads to finish, keeping the workers running
+        (a long-lived pipeline keeps each worker's Drive service warm).
+
+        Returns:
+            list: Results submitted since start() or the last drain(), in the
+                same format as join()
+        """
+        self._queue.join()
+        with self._lock:
+            results, self._results = self._results, []
+        return results
+
+    def join(self):
+        """
+        Wait for all queued uploads to finish and stop the workers.
+
+        Returns:
+            list: One dict per submitted file, in submission order, with keys
+                'order_number', 'file_path', 'result' and 'error'
+        """
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        return list(self._results)
+
+    def _worker(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                return
+            index, order_number, file_path = item
+            with self._lock:
+                entry = self._results[index]
+            try:
+                entry['result'] = self.upload_fn(order_number, file_path)
+            except Exception as e:
+                entry['error'] = str(e)
+            finally:
+                self._queue.task_done()